@@ -0,0 +1,55 @@
+"""
+Profiles the extraction hot paths of the core-modules on a synthetic project.
+
+Usage:
+	python benchmarks/bench_extraction.py --stations 2000 --plcs 12 --blocks 1500 --tags 5000
+	python benchmarks/bench_extraction.py --stations 25000 --latency 0.0001 --profile
+"""
+
+import argparse
+import cProfile
+import pstats
+
+from harness import SYSTEM_BLOCK_EXPORT, openness, generate_project, load_project, measure
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--stations', type=int, default=1000)
+	parser.add_argument('--plcs', type=int, default=4)
+	parser.add_argument('--blocks', type=int, default=500, help='blocks per PLC')
+	parser.add_argument('--tags', type=int, default=2000, help='tags per PLC')
+	parser.add_argument('--library-types', type=int, default=100)
+	parser.add_argument('--workers', type=int, default=1, help='degree of parallelism of the scheduler')
+	parser.add_argument('--latency', type=float, default=0.0, help='simulated round-trip time of each Openness call (s)')
+	parser.add_argument('--profile', action='store_true', help='print the top 25 functions by cumulative time')
+	args = parser.parse_args()
+
+	myproject = measure('generate project', generate_project, stations=args.stations, plcs=args.plcs,
+		blocks_per_plc=args.blocks, tags_per_plc=args.tags, library_types=args.library_types,
+		system_block_export=SYSTEM_BLOCK_EXPORT)
+	openness.set_latency(args.latency)
+
+	profiler = cProfile.Profile()
+	profiler.enable()
+	project = measure('open project (core-modules)', load_project, myproject)
+	project.scheduler.set_settings({'workers': args.workers})
+	measure('hardware inventory (full rebuild)', project.hardware.get_inventory, reload=True)
+	measure('hardware inventory (refresh)', project.hardware.get_inventory, refresh=True)
+	measure('plc devices (reload)', project.hardware.get_plc_devices, reload=True)
+	measure('interface devices (reload)', project.hardware.get_interface_devices, reload=True)
+	measure('node list (reload)', project.nodes.getNodeList, reload=True)
+	measure('node table (reload)', project.nodes.getNodeTable, reload=True)
+	measure('graph data (reload)', project.nodes.graph_data, reload=True)
+	measure('project tree (reload)', project.file.projectTree, reload=True)
+	measure('tag tables (reload)', project.file.show_tagTables, reload=True)
+	measure('library content (reload)', project.library.get_library_content, reload=True)
+	measure('validate used blocks (reload)', project.library.validate_used_blocks, reload=True)
+	profiler.disable()
+
+	if args.profile:
+		pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+	main()
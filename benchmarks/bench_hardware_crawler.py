@@ -0,0 +1,45 @@
+"""
+Measures how the hardware crawl and the node/graph builders on top of it scale with the amount of workers.
+
+Every Openness call of the fake backend sleeps '--latency' seconds to simulate the round-trip through the bridge,
+the inventory of each run is compared with the sequential one to check that the order does not change.
+
+Usage:
+	python benchmarks/bench_hardware_crawler.py --stations 2000 --workers 1 2 4 8 --latency 0.0002
+"""
+
+import argparse
+
+from harness import SYSTEM_BLOCK_EXPORT, openness, generate_project, load_project, measure
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--stations', type=int, default=1000)
+	parser.add_argument('--plcs', type=int, default=4)
+	parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+	parser.add_argument('--latency', type=float, default=0.0002, help='simulated round-trip time of each Openness call (s)')
+	args = parser.parse_args()
+
+	myproject = measure('generate project', generate_project, stations=args.stations, plcs=args.plcs,
+		blocks_per_plc=10, tags_per_plc=10, library_types=5, system_block_export=SYSTEM_BLOCK_EXPORT)
+	project = measure('open project (core-modules)', load_project, myproject)
+	openness.set_latency(args.latency)
+
+	reference = None
+	for workers in args.workers:
+		print(f"--- workers: {workers}")
+		project.scheduler.set_settings({'workers': workers})
+		measure('inventory (full rebuild)', project.hardware.get_inventory, reload=True)
+		measure('node list (reload)', project.nodes.getNodeList, reload=True)
+		measure('graph data (reload)', project.nodes.graph_data, reload=True)
+
+		order = [item.Name for item in project.hardware.get_inventory().items]
+		if reference is None:
+			reference = order
+		elif order != reference:
+			raise AssertionError(f"Inventory order with '{workers}' workers differs from the sequential crawl")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,94 @@
+"""
+Measures the incremental hardware refresh against a full rebuild after a few stations were edited.
+
+A number of stations get an extra module, as many other stations get a new IP address, one station is rewired to
+another neighbour with a new cable length and one station is deleted. Then the inventory, the node list and the graph
+are refreshed. The result is compared with a full rebuild to check that the refresh did not miss a change.
+
+Usage:
+	python benchmarks/bench_hardware_refresh.py --stations 5000 --edits 10 --latency 0.0001
+"""
+
+import argparse
+
+from harness import SYSTEM_BLOCK_EXPORT, openness, generate_project, load_project, measure
+
+
+def get_interface(station):
+	# station / rack / head module / interface item, see the generator
+	interface_item = station._device_items[0]._device_items[0]._device_items[0]
+	return interface_item.services[openness.NetworkInterface]
+
+
+def disconnect(port):
+	for peer in list(port.ConnectedPorts):
+		peer.ConnectedPorts.remove(port)
+	port.ConnectedPorts.clear()
+
+
+def edit_stations(project, myproject, edits):
+	stations = project.hardware.get_inventory().stations
+	step = max(1, len(stations) // (2 * edits + 1))
+	for index in range(1, edits + 1):
+		rack = stations[index * step]._device_items[0]
+		module = openness.DeviceItem(f"DI 16x24VDC_{len(rack._device_items) + 1}", rack,
+			type_identifier='OrderNumber:6ES7 521-1BH00-0AB0/V1.0', order_number='6ES7 521-1BH00-0AB0', position=len(rack._device_items) + 1)
+		rack._device_items.append(module)
+
+	# address edits on other stations than the module edits
+	for index in range(edits + 1, 2 * edits + 1):
+		node = get_interface(stations[index * step]).Nodes[0]
+		node.Address = f"10.99.{index // 250}.{index % 250 + 1}"
+
+	# the second port of a station is connected to the first port of a station further down the line
+	source, target = get_interface(stations[step // 2]).Ports[1], get_interface(stations[step // 2 + 3]).Ports[0]
+	disconnect(source)
+	disconnect(target)
+	source.ConnectToPort(target)
+	target.CableLength = 'Length200m'
+	stations[-1].Delete()
+
+
+def snapshot(project):
+	inventory = project.hardware.get_inventory()
+	graph = project.nodes.graph_data()
+	return (
+		[item.Name for item in inventory.items],
+		sorted(graph.edges(data=True)),
+		{plc: (plc_info['Network'], plc_info['devices']) for plc, plc_info in project.nodes.getNodeList().items()}
+	)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--stations', type=int, default=2000)
+	parser.add_argument('--plcs', type=int, default=4)
+	parser.add_argument('--edits', type=int, default=10, help='amount of stations that get an extra module, and that get a new address')
+	parser.add_argument('--latency', type=float, default=0.0, help='simulated round-trip time of each Openness call (s)')
+	args = parser.parse_args()
+
+	myproject = measure('generate project', generate_project, stations=args.stations, plcs=args.plcs,
+		blocks_per_plc=10, tags_per_plc=10, library_types=5, system_block_export=SYSTEM_BLOCK_EXPORT)
+	project = measure('open project (core-modules)', load_project, myproject)
+	openness.set_latency(args.latency)
+	measure('node list', project.nodes.getNodeList)
+	measure('graph data', project.nodes.graph_data)
+
+	edit_stations(project, myproject, args.edits)
+	measure('refresh inventory', project.hardware.get_inventory, refresh=True)
+	changes = project.hardware.change_log[-1][1]
+	print(f"change set: added {len(changes['added'])}, changed {len(changes['changed'])}, removed {len(changes['removed'])}, groups {len(changes['groups'])}")
+	# the node list and graph were built before the edits, they get the change set of the refresh above
+	measure('refresh node list', project.nodes.getNodeList, refresh=True)
+	measure('refresh graph data', project.nodes.graph_data, refresh=True)
+	refreshed = snapshot(project)
+
+	measure('full rebuild inventory', project.hardware.get_inventory, reload=True)
+	measure('full rebuild node list', project.nodes.getNodeList, reload=True)
+	measure('full rebuild graph data', project.nodes.graph_data, reload=True)
+	if snapshot(project) != refreshed:
+		raise AssertionError('The refreshed inventory differs from the full rebuild')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,117 @@
+"""
+Measures the streaming SimaticML reader against the triple parse it replaced (ElementTree -> tostring -> xmltodict).
+
+The export of the system library block (FB2204.xlm) is read as is and enlarged by repeating its networks, the time and
+the peak of the traced memory are printed per size. Both readers have to find the same 'LVccLibVersion' value.
+
+Usage:
+	python benchmarks/bench_simaticml.py --repeat 1 --steps 4
+"""
+
+import argparse
+import os
+import re
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+import xmltodict
+
+from harness import SYSTEM_BLOCK_EXPORT
+from core.functionTypes import FUNC_INTERN_CON
+from utils.simaticML import read_simaticml
+
+PARAMETER = 'LVccLibVersion'
+
+
+def read_with_xmltodict(path):
+	tree = ET.parse(path)
+	xmlstr = ET.tostring(tree.getroot(), encoding='utf-8', method='xml')
+	doc = dict(xmltodict.parse(xmlstr))
+	NS = 0
+	while f'@xmlns:ns{NS}' in doc['Document'].keys():
+		NS += 1
+	return doc, NS
+
+
+def find_with_xmltodict(path):
+	doc, NS = read_with_xmltodict(path)
+	for network in doc['Document']['SW.Blocks.FB']['ObjectList']['SW.Blocks.CompileUnit']:
+		source = network['AttributeList'].get('NetworkSource') or {}
+		for ns in range(NS):
+			flgnet = source.get(f'ns{ns}:FlgNet') if isinstance(source, dict) else None
+			if not flgnet:
+				continue
+			accesses = flgnet[f'ns{ns}:Parts'].get(f'ns{ns}:Access', [])
+			accesses = accesses if isinstance(accesses, list) else [accesses]
+			wires = flgnet[f'ns{ns}:Wires'][f'ns{ns}:Wire']
+			uid = next((access['@UId'] for access in accesses if f'ns{ns}:Symbol' in access
+				and access[f'ns{ns}:Symbol'][f'ns{ns}:Component'] == {'@Name': PARAMETER}), None)
+			if uid is None:
+				continue
+			part = next(wire[f'ns{ns}:NameCon']['@UId'] for wire in wires if wire.get(f'ns{ns}:IdentCon', {}).get('@UId') == uid)
+			constant = next(wire[f'ns{ns}:IdentCon']['@UId'] for wire in wires
+				if wire.get(f'ns{ns}:NameCon', {}).get('@UId') == part and wire[f'ns{ns}:NameCon']['@Name'] == 'in')
+			return next(access[f'ns{ns}:Constant'][f'ns{ns}:ConstantValue'] for access in accesses if access['@UId'] == constant)
+	return None
+
+
+def find_with_simaticml(path):
+	block = read_simaticml(path)
+	for network, access in block.find_parameter(PARAMETER):
+		part, port = network.access_ports[access.uid][0]
+		linked_port = FUNC_INTERN_CON[network.parts[part].name.lower()][re.sub(r'\d+$', '', port)]
+		return network.get_wired_value(part, linked_port)
+	return None
+
+
+def enlarge(path, repeat):
+	"""
+	Writes a copy of the export with its networks repeated, next to the working directory of the harness.
+	"""
+	with open(path, encoding='utf-8-sig') as file:
+		text = file.read()
+	start = text.index('<SW.Blocks.CompileUnit')
+	end = text.rindex('</SW.Blocks.CompileUnit>') + len('</SW.Blocks.CompileUnit>')
+	enlarged = os.path.abspath(f"FB2204_x{repeat}.xml")
+	with open(enlarged, 'w', encoding='utf-8') as file:
+		file.write(text[:start] + text[start:end] * repeat + text[end:])
+	return enlarged
+
+
+def measure_reader(function, path):
+	# timed without tracing, tracemalloc slows down the allocations
+	start = time.perf_counter()
+	value = function(path)
+	elapsed = time.perf_counter() - start
+	tracemalloc.start()
+	function(path)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return value, elapsed, peak
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--repeat', type=int, default=1, help='amount of times the networks are repeated in the first step')
+	parser.add_argument('--steps', type=int, default=4, help='amount of doublings of the networks')
+	args = parser.parse_args()
+
+	print(f"{'size':>10}{'xmltodict':>14}{'peak':>10}{'simaticml':>14}{'peak':>10}{'value':>10}")
+	for step in range(args.steps):
+		repeat = args.repeat * 2 ** step
+		path = SYSTEM_BLOCK_EXPORT if repeat == 1 else enlarge(SYSTEM_BLOCK_EXPORT, repeat)
+		old_value, old_time, old_peak = measure_reader(find_with_xmltodict, path)
+		new_value, new_time, new_peak = measure_reader(find_with_simaticml, path)
+		if old_value != new_value:
+			raise AssertionError(f"Readers disagree on '{PARAMETER}': '{old_value}' and '{new_value}'")
+		print(
+			f"{os.path.getsize(path) / 1e6:>8.1f}MB"
+			f"{old_time:>12.3f} s{old_peak / 1e6:>8.1f}MB"
+			f"{new_time:>12.3f} s{new_peak / 1e6:>8.1f}MB"
+			f"{new_value:>10}"
+		)
+
+
+if __name__ == '__main__':
+	main()
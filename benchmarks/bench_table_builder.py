@@ -0,0 +1,81 @@
+"""
+Measures the columnar table builder against the per-row 'pd.concat' it replaced.
+
+Rows with the columns of the library table are accumulated at doubling sizes, the time per row stays flat for the
+builder (linear) and grows with the size for 'pd.concat' (quadratic). The library content of generated projects is
+timed at doubling amounts of library types as the end-to-end check.
+
+Usage:
+	python benchmarks/bench_table_builder.py --rows 1000 --steps 5 --concat-limit 8000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from harness import SYSTEM_BLOCK_EXPORT, generate_project, load_project, measure
+from core.library import LIBRARY_COLUMNS
+from utils.tableBuilder import TableBuilder
+
+
+def make_row(index):
+	return {
+		'Project': 'Project', 'Folder': f"Folder_{index % 20}", 'Name': f"Type_{index}", 'Version': '1.0.0',
+		'ModifiedDate': '01-01-2024 00:00:00', 'Author': 'VCC', 'LibraryState': 'Committed', 'Dependents': index % 3,
+		'InstanceCount': index % 7, 'VersionCount': 1, 'TypeComment': '', 'VersionComment': '', 'ReferenceObject': index
+	}
+
+
+def build_with_concat(rows):
+	table = pd.DataFrame()
+	for index in range(rows):
+		table = pd.concat([table, pd.DataFrame({column: [value] for column, value in make_row(index).items()})], ignore_index=True)
+	return table
+
+
+def build_with_builder(rows):
+	table = TableBuilder(LIBRARY_COLUMNS)
+	for index in range(rows):
+		table.append(make_row(index))
+	return table.to_frame()
+
+
+def time_build(function, rows):
+	start = time.perf_counter()
+	table = function(rows)
+	elapsed = time.perf_counter() - start
+	if len(table) != rows:
+		raise AssertionError(f"Built '{len(table)}' rows instead of '{rows}'")
+	return elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--rows', type=int, default=1000, help='amount of rows of the first step')
+	parser.add_argument('--steps', type=int, default=5, help='amount of doublings of the rows')
+	parser.add_argument('--concat-limit', type=int, default=8000, help='largest table built with pd.concat')
+	parser.add_argument('--library-types', type=int, default=100, help='amount of library types of the first project')
+	args = parser.parse_args()
+
+	print(f"{'rows':>10}{'builder':>14}{'us/row':>10}{'pd.concat':>14}{'us/row':>10}")
+	for step in range(args.steps):
+		rows = args.rows * 2 ** step
+		builder = time_build(build_with_builder, rows)
+		line = f"{rows:>10}{builder:>12.3f} s{builder / rows * 1e6:>10.1f}"
+		if rows <= args.concat_limit:
+			concat = time_build(build_with_concat, rows)
+			line += f"{concat:>12.3f} s{concat / rows * 1e6:>10.1f}"
+		print(line)
+
+	for step in range(2):
+		library_types = args.library_types * 2 ** step
+		myproject = generate_project(stations=10, plcs=2, blocks_per_plc=10, tags_per_plc=10,
+			library_types=library_types, system_block_export=SYSTEM_BLOCK_EXPORT)
+		project = load_project(myproject)
+		library = measure(f"library content ({library_types} types)", project.library.get_library_content)
+		print(f"{'':<45}{len(library):>10} rows")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,112 @@
+"""
+Shared harness for the benchmarks: runs the core-modules headless on the fake Openness backend.
+
+The core-modules are imported and initialized the same way as the app does it (see 'gui/main.py' and 'core/project.py'),
+only the loading screen is replaced by a no-op stand-in so no Tk window is needed.
+"""
+
+import importlib
+import inspect
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+DEMO_EXPORTS = os.path.join(ROOT, 'docs', 'TIA demo exports')
+SYSTEM_BLOCK_EXPORT = os.path.join(DEMO_EXPORTS, 'P712713A01', 'Blocks', 'FB2204.xlm')
+
+# the core-modules export blocks and write the log relative to the working directory, keep that out of the repo
+os.chdir(tempfile.mkdtemp(prefix='openness-bench-'))
+
+os.environ.setdefault('OPENNESS_BACKEND', 'fake')
+if SRC not in sys.path:
+	sys.path.insert(0, SRC)
+
+from core.fake import openness
+from core.fake.generator import generate_project
+
+
+class NullLoadingScreen:
+	def show_loading(self, text, progress=False):
+		pass
+
+	def update_progress(self, value):
+		pass
+
+	def set_loading_text(self, text):
+		pass
+
+	def hide_loading(self):
+		pass
+
+
+class HeadlessProject:
+	"""
+	Project without the Tk widgets, the core-classes get initialized and wired like in 'core.project.Project'.
+	"""
+	def __init__(self, myproject, myinterface=None):
+		self.master = None
+		self.content_frame = None
+		self.myproject = myproject
+		self.myinterface = myinterface
+		self.loading_screen = NullLoadingScreen()
+		self.module_map = {}
+		self.status_icon = None
+
+
+	def set_module_map(self, module_map):
+		self.module_map = module_map
+		for class_name, class_obj in self.core_classes():
+			setattr(self, class_name.lower(), class_obj(self))
+		for function_name in ('get_core_classes', 'get_core_functions'):
+			for class_name, class_obj in self.core_classes():
+				instance = getattr(self, class_name.lower())
+				if hasattr(instance, function_name):
+					getattr(instance, function_name)()
+
+
+	def core_classes(self):
+		for module in self.module_map.values():
+			for class_name, class_obj in inspect.getmembers(module, inspect.isclass):
+				if class_name.lower() == module.__name__.split('.')[-1].lower():
+					yield class_name, class_obj
+
+
+def load_project(myproject, exclude=('project',)):
+	"""
+	Imports and initializes all the core-modules for the given (fake) project.
+
+	Args:
+		myproject (Project): The (fake) TIA project.
+		exclude (tuple): The core-modules that should not be imported.
+
+	Returns:
+		HeadlessProject: The project with all the core-classes as attributes.
+	"""
+	core_dir = os.path.join(SRC, 'core')
+	module_map = {
+		file_name: importlib.import_module(f"core.{file_name.split('.')[0]}")
+		for file_name in sorted(os.listdir(core_dir))
+		if file_name.endswith('.py') and file_name.split('.')[0] not in exclude
+	}
+	project = HeadlessProject(myproject)
+	project.set_module_map(module_map)
+	return project
+
+
+def measure(label, function, *args, **kwargs):
+	"""
+	Runs the function once, prints the wall time and the amount of Openness calls it made.
+
+	Returns:
+		object: The return value of the function.
+	"""
+	openness.reset_calls()
+	start = time.perf_counter()
+	result = function(*args, **kwargs)
+	elapsed = time.perf_counter() - start
+	calls = sum(openness.CALLS.values())
+	print(f"{label:<45}{elapsed:>10.3f} s{calls:>12} calls")
+	return result
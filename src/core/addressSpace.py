@@ -0,0 +1,338 @@
+"""
+Interval index over the IO address space (I/Q/M bytes) of each PLC.
+
+The byte ranges of the hardware modules (the addresses of the device items in the hardware inventory) and of the PLC
+tags (their logical addresses) are kept per (PLC, area) as bit intervals sorted on their start. An interval that ends
+at or after bit 'a' starts at or after 'a - longest interval + 1', so the intervals that touch a byte range are found
+with two binary searches and a filter over that window, instead of a scan over all the tags.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+ADDRESS_ATTRIBUTES = ('StartAddress', 'Length', 'IoType')
+IO_AREAS = {'Input': 'I', 'Output': 'Q'}
+# %I12.3, %IX12.3, %IB12, %QW4, %MD100, %IW256:P
+LOGICAL_ADDRESS_PATTERN = r'^%(?P<Area>[IQM])(?P<Size>[XBWD]?)(?P<Byte>\d+)(?:\.(?P<Bit>\d+))?(?::P)?$'
+SIZE_BYTES = {'': 1, 'X': 1, 'B': 1, 'W': 2, 'D': 4}
+MODULE_COLUMNS = ['PLC', 'Area', 'Start', 'End', 'Station', 'Module', 'OrderNumber']
+TAG_COLUMNS = ['PLC', 'Area', 'Start', 'End', 'Bit', 'Table', 'Tag', 'LogAddr']
+
+
+def parse_logical_addresses(logical_addresses):
+	"""
+	Parses logical addresses into byte ranges.
+
+	Args:
+		logical_addresses (pandas.Series): The logical addresses, e.g. '%I12.3' or '%QW4'.
+
+	Returns:
+		pandas.DataFrame: The 'Area', 'Start' (byte), 'End' (last byte), 'Bit' (-1 if not a bit address) of each address,
+			the rows of the addresses that can not be parsed (e.g. '%DB1.DBX0.0') are NaN.
+	"""
+	parts = logical_addresses.fillna('').astype(str).str.strip().str.upper().str.extract(LOGICAL_ADDRESS_PATTERN)
+	start = pd.to_numeric(parts['Byte'], errors='coerce')
+	size = parts['Size'].map(SIZE_BYTES)
+	return pd.DataFrame({
+		'Area': parts['Area'],
+		'Start': start,
+		'End': start + size - 1,
+		'Bit': pd.to_numeric(parts['Bit'], errors='coerce').fillna(-1),
+	})
+
+
+def bit_ranges(table):
+	"""
+	Converts the byte ranges of a table to bit ranges, the rows with a 'Bit' (>= 0) are a single bit.
+	The indexes are on bits, so bit tags in the same byte (%I0.0 and %I0.1) do not overlap.
+
+	Returns:
+		tuple: The first and the last bit of each row.
+	"""
+	starts = table['Start'] * 8
+	ends = table['End'] * 8 + 7
+	if 'Bit' in table:
+		bits = table['Bit'] >= 0
+		starts = starts + table['Bit'].clip(lower=0)
+		ends = ends.where(~bits, starts)
+	return starts, ends
+
+
+class IntervalIndex:
+	"""
+	Closed intervals [start, end] (bits) sorted on their start, with the position of each interval in the source table.
+	"""
+
+	def __init__(self, starts, ends, positions):
+		starts = np.asarray(starts, dtype='int64')
+		order = np.argsort(starts, kind='stable')
+		self.starts = starts[order]
+		self.ends = np.asarray(ends, dtype='int64')[order]
+		self.positions = np.asarray(positions, dtype='int64')[order]
+		self.max_length = int((self.ends - self.starts).max()) + 1 if len(self.starts) else 0
+
+	def __len__(self):
+		return len(self.starts)
+
+	def query(self, start, end):
+		"""
+		Returns the positions of the intervals that share at least one byte with [start, end].
+		"""
+		first = np.searchsorted(self.starts, start - self.max_length + 1, side='left')
+		last = np.searchsorted(self.starts, end, side='right')
+		window = slice(first, last)
+		return self.positions[window][self.ends[window] >= start]
+
+	def overlaps(self):
+		"""
+		Returns the (position, position) pairs of the intervals that overlap each other.
+		"""
+		pairs = []
+		for i in range(len(self.starts)):
+			# only the next intervals that start before this one ends can overlap with it
+			last = np.searchsorted(self.starts, self.ends[i], side='right')
+			pairs.extend((self.positions[i], self.positions[j]) for j in range(i + 1, last))
+		return pairs
+
+	def coverage(self):
+		"""
+		Returns the merged (start, end) ranges covered by the intervals.
+		"""
+		merged = []
+		for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+			if merged and start <= merged[-1][1] + 1:
+				merged[-1][1] = max(merged[-1][1], end)
+			else:
+				merged.append([start, end])
+		return [tuple(interval) for interval in merged]
+
+
+class AddressSpace:
+	"""
+	Answers overlap, gap and 'who uses byte range X' queries on the IO address space of the PLC's.
+
+	Attributes:
+		indexes (dict): Maps (PLC, area) to a dict with the 'modules' and the 'tags' IntervalIndex.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.indexes = {}
+		self.index_sources = (None, None)
+		self.tag_source = None
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_core_classes(self):
+		self.hardware = self.project.hardware
+		self.attributes = self.project.attributes
+		self.file = self.project.file
+
+
+	def get_module_table(self, reload=False):
+		"""
+		Retrieves the IO byte ranges of all the hardware modules, rebuilt when the hardware inventory was refreshed.
+
+		Returns:
+			pandas.DataFrame: A row per module address with the MODULE_COLUMNS, 'PLC' is the controller of the address (None if it has none).
+		"""
+		if hasattr(self, 'module_table') and not reload and self.module_version == self.hardware.inventory_version:
+			logger.debug(f"Returning cached module address table: '{len(self.module_table)}' rows...")
+			return self.module_table
+
+		inventory = self.hardware.get_inventory(reload=reload)
+		owners, addresses = [], []
+		for item in inventory.items:
+			for address in item.Addresses:
+				owners.append(item)
+				addresses.append(address)
+		rows = self.attributes.read(addresses, ADDRESS_ATTRIBUTES)
+		owner_rows = self.attributes.read(owners, ('OrderNumber',))
+
+		def get_controller(address):
+			controllers = list(address.AddressControllers)
+			return controllers[0].Name if controllers else None
+
+		lengths = pd.Series([row['Length'] for row in rows], dtype='float64')
+		starts = pd.Series([row['StartAddress'] for row in rows], dtype='float64')
+		table = pd.DataFrame({
+			'PLC': [get_controller(address) for address in addresses],
+			'Area': [IO_AREAS.get(str(row['IoType'])) for row in rows],
+			'Start': starts,
+			# the length of an address is in bits
+			'End': starts + np.ceil(lengths / 8) - 1,
+			'Station': [inventory.get_station(item).Name for item in owners],
+			'Module': [item.Name for item in owners],
+			'OrderNumber': [row['OrderNumber'] for row in owner_rows],
+		}, columns=MODULE_COLUMNS)
+		table = table.dropna(subset=['Area', 'Start', 'End']).astype({'Start': 'int64', 'End': 'int64'}).reset_index(drop=True)
+
+		self.module_table = table
+		self.module_version = self.hardware.inventory_version
+		logger.debug(
+			f"Returning module address table {type(table)}: "
+			f"total entries: '{len(table)}', "
+			f"unassigned: '{int(table['PLC'].isna().sum())}'"
+		)
+		return table
+
+
+	def get_tag_table(self, reload=False):
+		"""
+		Retrieves the byte ranges of all the PLC tags with an I, Q or M address, again when the tags were extracted again.
+
+		Returns:
+			pandas.DataFrame: A row per tag with the TAG_COLUMNS.
+		"""
+		tags = self.file.show_tagTables(reload=reload)
+		if hasattr(self, 'tag_table') and tags is self.tag_source and not reload:
+			logger.debug(f"Returning cached tag address table: '{len(self.tag_table)}' rows...")
+			return self.tag_table
+
+		ranges = parse_logical_addresses(tags['LogAddr'])
+		table = pd.DataFrame({
+			'PLC': tags['plc'],
+			'Area': ranges['Area'],
+			'Start': ranges['Start'],
+			'End': ranges['End'],
+			'Bit': ranges['Bit'],
+			'Table': tags['Table'],
+			'Tag': tags['Tag'],
+			'LogAddr': tags['LogAddr'],
+		}, columns=TAG_COLUMNS)
+		table = table.dropna(subset=['Area', 'Start', 'End']).astype({'Start': 'int64', 'End': 'int64', 'Bit': 'int64'}).reset_index(drop=True)
+
+		self.tag_table = table
+		self.tag_source = tags
+		logger.debug(
+			f"Returning tag address table {type(table)}: "
+			f"total entries: '{len(table)}', "
+			f"tags without an IO address: '{len(tags) - len(table)}'"
+		)
+		return table
+
+
+	def get_indexes(self, reload=False):
+		"""
+		Builds the interval indexes of the modules and the tags per (PLC, area), again when the hardware inventory
+		or the tags changed.
+
+		Returns:
+			dict: Maps (PLC, area) to a dict with the 'modules' and the 'tags' IntervalIndex.
+		"""
+		modules = self.get_module_table(reload=reload)
+		tags = self.get_tag_table(reload=reload)
+		if self.indexes and not reload and self.index_sources[0] is modules and self.index_sources[1] is tags:
+			return self.indexes
+
+		indexes = {}
+		for kind, table in (('modules', modules), ('tags', tags)):
+			for key, positions in table.groupby(['PLC', 'Area'], sort=False).indices.items():
+				group = table.iloc[positions]
+				indexes.setdefault(key, {})[kind] = IntervalIndex(*bit_ranges(group), positions)
+		empty = IntervalIndex([], [], [])
+		for key in indexes:
+			indexes[key].setdefault('modules', empty)
+			indexes[key].setdefault('tags', empty)
+
+		self.indexes = indexes
+		self.index_sources = (modules, tags)
+		logger.debug(
+			f"Built the IO address indexes: "
+			f"(plc, area) keys: '{len(indexes)}', "
+			f"module ranges: '{len(modules)}', "
+			f"tag ranges: '{len(tags)}'"
+		)
+		return indexes
+
+
+	def find(self, plc, area, start, end=None, reload=False):
+		"""
+		Finds the modules and tags that use a byte range.
+
+		Args:
+			plc (str): The name of the PLC.
+			area (str): The address area: 'I', 'Q' or 'M'.
+			start (int): The first byte of the range.
+			end (int, optional): The last byte of the range, defaults to the start byte.
+
+		Returns:
+			tuple: The rows of the module table and of the tag table that share a byte with the range.
+		"""
+		end = start if end is None else end
+		indexes = self.get_indexes(reload=reload).get((plc, area))
+		if indexes is None:
+			return self.module_table.iloc[[]], self.tag_table.iloc[[]]
+		modules = self.module_table.iloc[np.sort(indexes['modules'].query(start * 8, end * 8 + 7))]
+		tags = self.tag_table.iloc[np.sort(indexes['tags'].query(start * 8, end * 8 + 7))]
+		return modules, tags
+
+
+	def get_overlaps(self, kind='modules', reload=False):
+		"""
+		Retrieves the overlapping address ranges within each PLC and area.
+
+		Args:
+			kind (str, optional): 'modules' for overlapping module addresses, 'tags' for tags that (partly) share bits. Defaults to 'modules'.
+
+		Returns:
+			pandas.DataFrame: A row per overlapping pair, the columns of the first range and of the second range ('_other' suffix).
+		"""
+		indexes = self.get_indexes(reload=reload)
+		table = self.module_table if kind == 'modules' else self.tag_table
+		pairs = [pair for key in indexes for pair in indexes[key][kind].overlaps()]
+		first = table.iloc[[i for i, _ in pairs]].reset_index(drop=True)
+		second = table.iloc[[j for _, j in pairs]].reset_index(drop=True)
+		overlaps = pd.concat([first, second.add_suffix('_other')], axis=1)
+		logger.debug(f"Returning overlapping '{kind}' address ranges: '{len(overlaps)}' pairs")
+		return overlaps
+
+
+	def get_gaps(self, plc, area, reload=False):
+		"""
+		Retrieves the unused byte ranges between the module addresses of a PLC, from byte 0 to the last used byte.
+
+		Returns:
+			list: The (first byte, last byte) of each gap.
+		"""
+		indexes = self.get_indexes(reload=reload).get((plc, area))
+		if indexes is None:
+			return []
+		gaps, next_free = [], 0
+		for start, end in indexes['modules'].coverage():
+			start, end = start // 8, end // 8
+			if start > next_free:
+				gaps.append((next_free, start - 1))
+			next_free = end + 1
+		return gaps
+
+
+	def get_unmapped_tags(self, reload=False):
+		"""
+		Retrieves the input and output tags with bytes that are not covered by a module address of their PLC.
+
+		Returns:
+			pandas.DataFrame: The rows of the tag table without a module.
+		"""
+		indexes = self.get_indexes(reload=reload)
+		unmapped = []
+		for (plc, area), index in indexes.items():
+			if area not in IO_AREAS.values():
+				continue
+			coverage = index['modules'].coverage()
+			covered_starts = np.array([start for start, _ in coverage], dtype='int64')
+			covered_ends = np.array([end for _, end in coverage], dtype='int64')
+			tags = index['tags']
+			# the merged coverage does not overlap, a tag is covered if the range starting before it also holds its last bit
+			slot = np.searchsorted(covered_starts, tags.starts, side='right') - 1
+			covered = (slot >= 0) & (covered_ends[np.clip(slot, 0, None)] >= tags.ends) if len(coverage) else np.zeros(len(tags), dtype=bool)
+			unmapped.extend(tags.positions[~covered].tolist())
+		return self.tag_table.iloc[sorted(unmapped)]
@@ -0,0 +1,176 @@
+"""
+Bulk attribute reader for the engineering objects of the project.
+
+Reading attributes one by one with 'GetAttribute' costs a round-trip per attribute, the reader fetches a declared set
+of attributes of an object with a single 'GetAttributes' call and returns plain python rows (dicts).
+Attributes an object type does not support are remembered per type, so the next objects of that type are read with
+a single call on the supported attributes only.
+"""
+
+import threading
+import pandas as pd
+
+from core import backend
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+DEVICE_ITEM_ATTRIBUTES = ('Name', 'TypeIdentifier', 'OrderNumber', 'FirmwareVersion', 'Classification', 'PositionNumber')
+BLOCK_ATTRIBUTES = ('Name', 'Number', 'IsConsistent', 'ModifiedDate', 'InstanceOfName', 'InstanceOfNumber')
+TYPE_ATTRIBUTES = ('Name', 'Number', 'IsConsistent', 'ModifiedDate')
+NODE_ATTRIBUTES = ('Name', 'Address', 'SubnetMask', 'RouterAddress')
+TAG_ATTRIBUTES = ('Name', 'LogicalAddress', 'DataTypeName')
+BATCH_SIZE = 500
+
+class Attributes:
+	"""
+	Reads a declared set of attributes for a batch of engineering objects.
+
+	Attributes:
+		unsupported (dict): Maps an object type name to the set of attribute names it does not support.
+		calls (int): Amount of GetAttributes/GetAttribute calls made through the reader.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.unsupported = {}
+		self.calls = 0
+		self.lock = threading.Lock()
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_core_classes(self):
+		self.hardware = self.project.hardware
+		self.scheduler = self.project.scheduler
+
+
+	def count_calls(self, amount=1):
+		with self.lock:
+			self.calls += amount
+
+
+	def read_object(self, engineering_object, names):
+		"""
+		Reads the attributes of one object, with one call if the object type supports all the attributes.
+
+		Args:
+			engineering_object (object): The object to read.
+			names (tuple): The attribute names.
+
+		Returns:
+			dict: Maps each attribute name to its value, None for the attributes the object does not support.
+		"""
+		type_name = engineering_object.GetType().Name
+		unsupported = self.unsupported.get(type_name, set())
+		supported = [name for name in names if name not in unsupported]
+
+		row = dict.fromkeys(names)
+		if not supported:
+			return row
+
+		try:
+			self.count_calls()
+			values = engineering_object.GetAttributes(backend.string_list(supported))
+			row.update(zip(supported, values))
+			return row
+		except Exception as e:
+			logger.debug(f"Bulk read of {supported} failed on '{type_name}', reading the attributes one by one: {str(e)}")
+
+		# find out which attributes the type does not support, the next objects of this type skip them
+		missing = set()
+		for name in supported:
+			try:
+				self.count_calls()
+				row[name] = engineering_object.GetAttribute(name)
+			except Exception:
+				missing.add(name)
+		if missing:
+			with self.lock:
+				self.unsupported.setdefault(type_name, set()).update(missing)
+			logger.debug(f"Attributes {sorted(missing)} are not supported by '{type_name}'")
+		return row
+
+
+	def read(self, objects, names, workers=None):
+		"""
+		Reads the attributes of a batch of objects. The batch is split in chunks that are read on the worker pool.
+
+		Args:
+			objects (list): The objects to read.
+			names (tuple): The attribute names.
+			workers (int, optional): Overrides the degree of parallelism of the scheduler.
+
+		Returns:
+			list: A dict per object (in the order of the objects), mapping each attribute name to its value.
+		"""
+		objects = list(objects)
+		names = tuple(names)
+		logger.debug(
+			f"Reading attributes {list(names)} of '{len(objects)}' objects: "
+			f"batch size: '{BATCH_SIZE}'"
+		)
+
+		def read_chunk(chunk):
+			return [self.read_object(engineering_object, names) for engineering_object in chunk]
+
+		chunks = [objects[i:i + BATCH_SIZE] for i in range(0, len(objects), BATCH_SIZE)]
+		rows = []
+		for chunk_rows in self.scheduler.map(read_chunk, chunks, workers=workers):
+			rows.extend(chunk_rows)
+		return rows
+
+
+	def to_plain(self, value):
+		"""
+		Converts an attribute value to a plain python value, objects and enums become their string representation.
+		"""
+		if value is None or isinstance(value, (bool, int, float, str)):
+			return value
+		return str(value)
+
+
+	def get_device_item_table(self, names=DEVICE_ITEM_ATTRIBUTES, reload=False):
+		"""
+		Retrieves the attributes of every device item in the project as a single table.
+		The cached table is rebuilt when the hardware inventory was refreshed in the meantime.
+
+		Args:
+			names (tuple, optional): The attribute names to read. Defaults to DEVICE_ITEM_ATTRIBUTES.
+
+		Returns:
+			pandas.DataFrame: A row per device item (inventory order) with the station, the parent and the attributes.
+		"""
+		if (hasattr(self, 'device_item_table') and self.device_item_names == tuple(names) and not reload
+				and self.device_item_version == self.hardware.inventory_version):
+			logger.debug(f"Returning cached device item table {type(self.device_item_table)}: '{len(self.device_item_table)}' rows...")
+			return self.device_item_table
+
+		inventory = self.hardware.get_inventory(reload=reload)
+		logger.debug(
+			f"Making the attribute table of all the device items: "
+			f"items: '{len(inventory)}', "
+			f"attributes: {list(names)}, "
+			f"reload: '{reload}'"
+		)
+
+		rows = self.read(inventory.items, names)
+		columns = {
+			'Station': [station.Name for station in map(inventory.get_station, inventory.items)],
+			'Parent': [parent.Name for parent in map(inventory.get_parent, inventory.items)],
+		}
+		for name in names:
+			columns[name] = [self.to_plain(row[name]) for row in rows]
+
+		self.device_item_table = pd.DataFrame(columns)
+		self.device_item_names = tuple(names)
+		self.device_item_version = self.hardware.inventory_version
+		logger.debug(
+			f"Returning device item table {type(self.device_item_table)}: "
+			f"total entries: '{len(self.device_item_table)}', "
+			f"columns: {list(self.device_item_table.columns)}"
+		)
+		return self.device_item_table
@@ -0,0 +1,86 @@
+"""
+Openness backend for the core package.
+Resolves the namespaces the core-modules use from the Openness API ('tia', 'hwf', 'System' and 'FileInfo'),
+either from the Siemens.Engineering.dll through pythonnet (default) or from the in-memory fake object model in 'core.fake'.
+The fake backend lets the core-modules run, be profiled and load-tested on any platform without TIA Portal.
+
+The backend is selected with the 'OPENNESS_BACKEND' environment variable ('tia' or 'fake'),
+or with 'use_backend' before the core-modules are imported.
+"""
+
+import os
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+DLL_PATH = "C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll"
+BACKENDS = ['tia', 'fake']
+
+backend_name = os.environ.get('OPENNESS_BACKEND', 'tia').lower()
+
+
+def use_backend(name):
+	"""
+	Selects the backend, has to be called before the core-modules are imported.
+
+	Args:
+		name (str): The name of the backend, 'tia' or 'fake'.
+	"""
+	global backend_name, tia, hwf, System, FileInfo
+	if name not in BACKENDS:
+		raise ValueError(f"Backend '{name}' not supported, please use one of {BACKENDS}")
+	backend_name = name
+	tia, hwf, System, FileInfo = load_backend(name)
+
+
+def get_backend_name():
+	return backend_name
+
+
+def load_backend(name):
+	"""
+	Loads the namespaces of the given backend.
+
+	Args:
+		name (str): The name of the backend, 'tia' or 'fake'.
+
+	Returns:
+		tuple: The 'Siemens.Engineering', 'Siemens.Engineering.HW.Features', 'System' and 'System.IO.FileInfo' namespaces.
+	"""
+	logger.debug(f"Loading Openness backend '{name}'")
+	if name == 'fake':
+		from core.fake import openness
+		return openness.tia, openness.hwf, openness.System, openness.FileInfo
+
+	import clr
+	# add the reference to the Siemens.Engineering.dll
+	clr.AddReference(DLL_PATH)
+	import System
+	import Siemens.Engineering as tia
+	import Siemens.Engineering.HW.Features as hwf
+	from System.IO import FileInfo
+	return tia, hwf, System, FileInfo
+
+
+def string_list(names):
+	"""
+	Converts the names to the IEnumerable<string> that Openness methods like 'GetAttributes' expect.
+
+	Args:
+		names (iterable): The names, e.g. attribute names.
+
+	Returns:
+		object: A .NET List<string>, or a python list for the fake backend.
+	"""
+	if backend_name == 'fake':
+		return list(names)
+
+	from System.Collections.Generic import List
+	net_names = List[System.String]()
+	for name in names:
+		net_names.Add(name)
+	return net_names
+
+
+tia, hwf, System, FileInfo = load_backend(backend_name)
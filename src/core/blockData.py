@@ -1,14 +1,12 @@
+import datetime
 import os
-import xml.etree.ElementTree as ET
-import xmltodict
-import Siemens.Engineering as tia
 import re
-import clr
-clr.AddReference("C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll")
 
-from System.IO import FileInfo
+from core.backend import tia, FileInfo
 from core.functionTypes import FUNC_INTERN_CON
+from utils.exportCache import ExportCache
 from utils.loggerConfig import get_logger
+from utils.simaticML import read_simaticml
 
 logger = get_logger(__name__)
 
@@ -29,6 +27,7 @@ class BlockData():
 		"""
 		self.software = self.project.software
 		self.hardware = self.project.hardware
+		self.catalog = self.project.catalog
 
 	def get_core_functions(self):
 		logger.debug(f"Accessing 'get_software_container' from the software object '{self.project.software}'...")
@@ -36,18 +35,56 @@ class BlockData():
 		logger.debug(f"Accessing 'get_plc_devices' from the hardware object '{self.project.hardware}'...")
 		self.plc_list = self.hardware.get_plc_devices()
 	
-	def export_block(self, block_name='LSystemVarS7-1500'): # for all the blocks
-		logger.debug(f"Exporting block '{block_name}'")
-		for plc in self.plc_list:
-			block = self.software.find_block(self.software_container[plc.Name].BlockGroup, block_name)
+	def get_export_cache(self):
+		if not hasattr(self, 'export_cache') or self.export_cache is None:
+			# a directory of its own, the eviction removes any export in it
+			cwd = os.getcwd() + f'\\docs\\TIA demo exports\\{self.myproject.Name}\\Blocks\\cache'
+			self.export_cache = ExportCache(cwd)
+		return self.export_cache
+
+
+	def export_block(self, block_name='LSystemVarS7-1500', plc_name=None, reload=False): # for all the blocks
+		"""
+		Exports a block to SimaticML, an earlier export is reused while the block is not modified (see 'utils.exportCache').
+		The block is looked up in the block catalog, its ModifiedDate is read from the block itself: the catalog can be
+		older than an edit of the block in TIA. A reused export costs that one Openness call.
 
-		block_type = block.GetType().Name
-		block_number = str(block.Number)
-		cwd = os.getcwd() + f'\\docs\\TIA demo exports\\{self.myproject.Name}\\Blocks'
-		path = os.path.join(cwd + f"\\{block_type}{block_number}.xlm")
+		Args:
+			block_name (str): The name of the block.
+			plc_name (str, optional): The PLC of the block, the first PLC that has the block when None.
+			reload (bool, optional): Reads the blocks of the PLC's into the catalog again. Defaults to False.
+
+		Returns:
+			str: The path of the export.
+		"""
+		logger.debug(f"Exporting block '{block_name}'")
+		plc_names = [plc_name] if plc_name is not None else [plc.Name for plc in self.plc_list]
+		rows = None
+		for plc_name in plc_names:
+			if reload:
+				self.catalog.get_plc_table(plc_name, reload=True)
+			rows = self.catalog.find(block_name, plc=plc_name)
+			if not rows.empty:
+				break
+		if rows is None or rows.empty:
+			raise ValueError(f"Block '{block_name}' not found in the project")
+
+		block = rows['ReferenceObject'].iat[0]
+		block_type = rows['Type'].iat[0]
+		block_number = str(rows['Number'].iat[0])
+		modified = block.ModifiedDate
+		# to the second, like the ModifiedDate of the catalog
+		modified_date = datetime.datetime(modified.Year, modified.Month, modified.Day, modified.Hour, modified.Minute, modified.Second)
+		export_cache = self.get_export_cache()
+		key = export_cache.get_key(self.myproject.Name, plc_name, block_type, block_number, modified_date)
+		path = export_cache.lookup(key)
+		if path is not None:
+			logger.debug(f"Block '{block_type}{block_number}' not modified since its export, reusing '{path}'")
+			return path
+		path = export_cache.get_path(key)
 
 		if os.path.exists(path):
-			logger.info(f"Block '{path}' already exists, removing and re-exporting...")
+			logger.info(f"Block '{path}' expired, removing and re-exporting...")
 			try:
 				os.remove(path)
 				logger.info(f"Block '{block_type}{block_number}.xml' removed successfully")
@@ -58,7 +95,7 @@ class BlockData():
 			block.Export(FileInfo(path), tia.ExportOptions.WithDefaults) 
 			logger.debug(f"Block '{block_type}{block_number}' exported successfully: '{path}'")
 		except: # one of the raison is that the block needs to be compiled
-			logger.error(f'Error in exporting blockdata {type}{block.Number}')
+			logger.error(f'Error in exporting blockdata {block_type}{block_number}')
 			logger.warning('Try to compile Block...')
 
 			result = block.GetService[tia.Compiler.ICompilable]().Compile() # compiling the block
@@ -70,177 +107,48 @@ class BlockData():
 				logger.info(f'Re-compiling solved the error')
 			except: # for some (safety) blocks the block can not be exported
 				raise ValueError('Error not solved by re-compiling')
+		export_cache.store(key)
 		return path
 
 
 	def read_block_xml(self, block_name):
+		"""
+		Exports a block and reads the export in one streaming pass, see 'utils.simaticML'.
+		The model of an export that was reused is read only once.
+
+		Returns:
+			SimaticBlock: The block with its networks, parts, accesses and wires.
+		"""
 		path = self.export_block(block_name)
 		logger.debug(f"Reading xml of '{block_name}'")
 
-		tree = ET.parse(path)
-		xml_date = tree.getroot()
-		xmlstr = ET.tostring(xml_date, encoding='utf-8', method='xml')
-		doc = dict(xmltodict.parse(xmlstr))
+		block = self.get_export_cache().get_model(path, read_simaticml)
 
 		logger.debug(f"Successfully read xml of '{block_name}'")
-		return doc
-
-
-	def search_part(self, network, ns, UId, portname=None):
-		if UId is None:
-			raise ValueError('UId is not given')
-		elif network is None:
-			raise ValueError('Please provide a network')
-		nwk_source = network['AttributeList']['NetworkSource']
-		nwk_part = nwk_source[f'ns{ns}:FlgNet'][f'ns{ns}:Parts'][f'ns{ns}:Part']
-
-		if f'ns{ns}:FlgNet' not in nwk_source.keys():
-			raise ValueError(f"'ns{ns}:FlgNet' not found in the network source")
-		
-		logger.debug(f"Searching for part with UId {UId} in the network, networkID: '{network['@ID']}'")
-		for part in nwk_part:
-			part_disabled = part['@DisabledENO']
-			part_name = part['@Name']
-			part_UId = part['@UId']
-			
-			if (part_UId == UId):
-				logger.debug(
-					f"Part with UId '{UId}' found in the network: "
-					f"part disabled: '{part_disabled}', "
-					f"part name: '{part_name}'"
-				)
-				return part
-			else:
-				raise ValueError(f"No part with UId {UId} found in the network")
-
-
-	def search_wire(self, network, ns, compUId=None, partUId=None, portname=None):
-		if compUId is None and partUId is None:
-			raise ValueError('Provide either a componentUId or a partUId')
-		elif network is None:
-			raise ValueError('Please provide a network')
-		nwk_source = network['AttributeList']['NetworkSource']
+		return block
 
-		if f'ns{ns}:FlgNet' not in nwk_source.keys():
-			raise ValueError(f"'ns{ns}:FlgNet' not found in the network source")
 
-		nwk_wires = nwk_source[f'ns{ns}:FlgNet'][f'ns{ns}:Wires']
-		target_ports = []
-
-		try:
-			for i, wire in enumerate(nwk_wires[f'ns{ns}:Wire']):
-				if f'ns{ns}:IdentCon' not in wire.keys():
-					continue
-				comp_UId = wire[f'ns{ns}:IdentCon']['@UId'] # get the source of the wire (value)
-				part_port = wire[f'ns{ns}:NameCon']['@Name'] # get the target/port where the wite is connected to
-				part_UId = wire[f'ns{ns}:NameCon']['@UId'] # get the target/part that the wire goes to
-				# the parameter that contains the libVersion should be connected to the input of the move block
-				# and the part is the same
-				if partUId and portname:
-					condition_met = (part_UId == partUId) and (part_port == portname)
-					if condition_met:
-						return comp_UId
-				elif partUId is None:
-					condition_met = (comp_UId == compUId)
-					if condition_met:
-						logger.debug(
-							f"Wire-target part found of wire-source '{comp_UId}': "
-							f"partUId: '{part_UId}', "
-							f"partPort: '{part_port}'"
-						)
-						return part_UId, part_port
-				else:
-					raise ValueError('The following is allowed (compUId) or (partUID) or (partUID and portname)')
-		except Exception as e:
-			raise ValueError(f"Error in searching for the wire: {str(e)}")
-		return target_ports
-
-
-	def search_component(self, network, ns, UId=None, comp_name=None):
-		if UId is None and comp_name is None:
-			raise ValueError('Provide either a UId or a component name')
-
-		nwk_source = network['AttributeList']['NetworkSource']
-		nwk_id = network['@ID']
-
-		if f'ns{ns}:FlgNet' not in nwk_source.keys():
-			return
-		
-		nwk_parts = nwk_source[f'ns{ns}:FlgNet'][f'ns{ns}:Parts']
-		nwk_parts_access = nwk_parts[f'ns{ns}:Access']
-		
-		try:
-			for access in nwk_parts_access:
-				if (f"ns{ns}:Symbol" in access.keys()):
-					component = access[f"ns{ns}:Symbol"][f"ns{ns}:Component"]
-				elif (f"ns{ns}:Constant" in access.keys()):
-					component = access[f'ns{ns}:Constant']
-				else:
-					continue
-				component_scope = access[f"@Scope"]
-				component_UId = access[f"@UId"]
-				
-				# always make it a list, even if there is only one component
-				if not isinstance(component, list):
-					component = [component] 
-
-				# check if a network contains the libVersion
-				# system lib version gets set by move block
-				for j, component in enumerate(component):
-					if f'ns{ns}:Part' not in nwk_parts.keys():
-						continue
-
-					if UId is None:
-						if component_scope != "LiteralConstant":
-							if component['@Name'] != comp_name:
-								continue
-						else:
-							continue
-					elif comp_name is None:
-						if component_UId != UId:
-							continue
-					else:
-						raise ValueError('Provide either a UId or a component name')
-
-					if component_scope == "LiteralConstant":
-						logger.debug(
-							f"Found component {'with name ' + comp_name if comp_name is not None else 'with UId ' + UId} in network '{self.i_network}': "
-							f"networkID: '{nwk_id}', "
-							f"componentScope: '{component_scope}', "
-							f"componentType: '{component[f'ns{ns}:ConstantType']}', "
-							f"componentValue: '{component[f'ns{ns}:ConstantValue']}' "
-						)
-						return access
-					else:
-						logger.debug(
-							f"Found component {'with name ' + comp_name if comp_name is not None else 'with UId ' + UId}: "
-							f"networkID: '{nwk_id}',"
-							f"componentScope: '{component_scope}',"
-							f"componentName: '{component['@Name']}',"
-							f"componentID: '{component_UId}'"
-						)
-						return access
-		except Exception as e:
-			raise ValueError(f"Error in searching for the component: {str(e)}")
-
-
-	def get_para_value(self, network, ns, UId, portname):
+	def get_para_value(self, network, UId, portname):
+		"""
+		Returns the constant that is wired to the port of a part linked to the given port, e.g. the 'in' of the 'Move'
+		that writes to the 'out1' port.
+		"""
 		if UId is None:
 			raise ValueError('UId is not given')
 		elif network is None:
 			raise ValueError('Please provide a network')
 		try:
-			part = self.search_part(network, ns, UId)
-			part_name = part['@Name'].lower()
+			part = network.parts.get(UId)
+			if part is None:
+				raise ValueError(f"No part with UId {UId} found in the network")
+			part_name = part.name.lower()
 
-			linked_port = FUNC_INTERN_CON.get(part_name).get(portname)
+			linked_ports = FUNC_INTERN_CON.get(part_name, {})
+			linked_port = linked_ports.get(portname)
 			if linked_port is None:
-				try:
-					stripped_portname = re.sub(r'\d+$', '', portname).lower()
-					linked_port = FUNC_INTERN_CON.get(part_name).get(stripped_portname)
-				except:
-					pass
-			linked_compUId = self.search_wire(network, ns, partUId=UId, portname=linked_port)
+				stripped_portname = re.sub(r'\d+$', '', portname).lower()
+				linked_port = linked_ports.get(stripped_portname)
+			linked_compUId = network.port_accesses.get((UId, linked_port))
 
 			logger.debug(
 				f"Getting linked port of function '{part_name}' and port '{portname}': "
@@ -248,11 +156,10 @@ class BlockData():
 				f"linked port: '{linked_port}', "
 				f"linked component UId: '{linked_compUId}'"
 			)
-			
-			logger.debug(f"Searing component (UId: '{linked_compUId}') to retrieve its value")
-			linked_comp = self.search_component(network, ns, UId=linked_compUId)
-			linked_compValue = linked_comp[f"ns{ns}:Constant"][f"ns{ns}:ConstantValue"]
-			
+
+			linked_compValue = network.get_wired_value(UId, linked_port)
+			if linked_compValue is None:
+				raise ValueError(f"No constant wired to port '{linked_port}' of part '{part_name}' (UId: '{UId}')")
 			return linked_compValue
 		except Exception as e:
 			raise ValueError(f"Failed to get the value of the parameter: {str(e)}")
@@ -263,44 +170,22 @@ class BlockData():
 			raise ValueError('Provide a block name and a parameter name')
 		
 		component_name = parameter
-		doc = self.read_block_xml(block_name)
+		block = self.read_block_xml(block_name)
 
-		if "SW.Blocks.CompileUnit" not in doc["Document"][f"SW.Blocks.FB"]["ObjectList"].keys():
+		if not block.networks:
 			raise ValueError("No networks found in block")
 
-		NS = 0
-		while True:
-			if f'@xmlns:ns{NS}' not in doc['Document'].keys():
-				break
-			NS += 1
-
-		Network_list = doc['Document']["SW.Blocks.FB"]['ObjectList']['SW.Blocks.CompileUnit']# get the list of all the networks
-
 		logger.debug(
-			f"Scanning namespaces in block '{block_name}': "
-			f"Total namespaces found: '{NS}', "
-			f"Total networks found: '{len(Network_list)}'"
+			f"Scanning networks of block '{block_name}' for component/parameter with name: '{component_name}': "
+			f"Total networks found: '{len(block.networks)}'"
 		)
-		logger.debug(
-			f"Scanning networks of block '{block_name}' for component/parameter with name: '{component_name}'"
-		)
-		for i, network in enumerate(Network_list):
-			self.i_network = i
-			for ns in range(NS):
-				try:
-					component = self.search_component(network, ns, comp_name=component_name)
-					if component is None:
-						continue
-					component_UId = component['@UId']
-
-					logger.debug(f"Searching wire-target of component '{component_name}' with UId: '{component_UId}'")
-					wire_target = self.search_wire(network, ns, compUId=component_UId)
-					if wire_target is None:
-						continue
-					part_UId, part_port = wire_target
-					
-					parameter_value = self.get_para_value(network, ns, part_UId, part_port)
-					logger.debug(f"Found value of parameter '{component_name}': '{parameter_value}'")
-					return parameter_value
-				except ValueError as e:
-					raise ValueError(f"Error in namespace '{ns}': {str(e)}")
+		for network, component in block.find_parameter(component_name):
+			logger.debug(f"Searching wire-target of component '{component_name}' with UId: '{component.uid}' in network '{network.id}'")
+			wire_targets = network.access_ports.get(component.uid)
+			if not wire_targets:
+				continue
+			part_UId, part_port = wire_targets[0]
+
+			parameter_value = self.get_para_value(network, part_UId, part_port)
+			logger.debug(f"Found value of parameter '{component_name}': '{parameter_value}'")
+			return parameter_value
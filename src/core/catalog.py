@@ -0,0 +1,582 @@
+"""
+Block catalog of the PLC software, shared by the software, file and library modules.
+
+The blocks of each PLC are read once (one bulk attribute read per block) into a columnar table, the lookups are
+answered from indexes on that table instead of walking the block groups again:
+	- (plc, name) and the case-insensitive name: find a block or a pasted list of blocks
+	- (plc, number space, number): find a block by number and check for number collisions
+	- the sorted names: prefix search
+	- the sorted modified dates: 'modified since' and date range queries
+
+The table of a PLC is rebuilt on reload, every rebuild bumps the 'version' of the catalog.
+"""
+
+import re
+import datetime
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from core.attributes import BLOCK_ATTRIBUTES
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+CATALOG_COLUMNS = ['PLC', 'Folder', 'Name', 'Type', 'Number', 'IsConsistent', 'ModifiedDate', 'InstanceOfName', 'InstanceOfNumber', 'System', 'Node', 'ReferenceObject']
+# data blocks share one number range in the PLC, the other block types have their own
+NUMBER_SPACES = {'GlobalDB': 'DB', 'InstanceDB': 'DB', 'ArrayDB': 'DB'}
+NAME_SEPARATORS = r'[\r\n\t,;]+'
+
+GROUP = 0
+BLOCK = 1
+
+def number_space(block_type):
+	return NUMBER_SPACES.get(block_type, block_type)
+
+
+class BlockTree:
+	"""
+	Flat, array-backed tree of the block groups and blocks of a PLC.
+
+	The nodes are numbered depth first (a group, its blocks, its subgroups), so the subtree of a node is the range
+	[node, ends[node]) and rendering the tree is a single pass over the arrays.
+
+	Attributes:
+		names (list): The name of each node.
+		kinds (numpy.ndarray): GROUP or BLOCK per node.
+		parents (numpy.ndarray): The parent node of each node, -1 for the root group.
+		depths (numpy.ndarray): The depth of each node, 0 for the root group.
+		system (numpy.ndarray): True for the nodes in a system block group.
+		ends (numpy.ndarray): The end (exclusive) of the subtree of each node.
+		child_offsets (numpy.ndarray): The children of node i are children[child_offsets[i]:child_offsets[i + 1]].
+		children (numpy.ndarray): The child nodes, grouped per parent.
+	"""
+
+	def __init__(self, names, kinds, parents, depths, system):
+		self.names = list(names)
+		self.kinds = np.asarray(kinds, dtype='int8')
+		self.parents = np.asarray(parents, dtype='int64')
+		self.depths = np.asarray(depths, dtype='int64')
+		self.system = np.asarray(system, dtype=bool)
+		size = len(self.names)
+
+		# a subtree ends at the next node that is not deeper than its root
+		self.ends = np.full(size, size, dtype='int64')
+		open_nodes = []
+		for node, depth in enumerate(self.depths.tolist()):
+			while open_nodes and self.depths[open_nodes[-1]] >= depth:
+				self.ends[open_nodes.pop()] = node
+			open_nodes.append(node)
+
+		child_nodes = np.flatnonzero(self.parents >= 0)
+		order = np.argsort(self.parents[child_nodes], kind='stable')
+		self.children = child_nodes[order]
+		self.child_offsets = np.searchsorted(self.parents[self.children], np.arange(size + 1), side='left')
+		self.block_counts = np.concatenate(([0], np.cumsum(self.kinds == BLOCK)))
+
+		# the folder path of each group, the path of a block is the path of its group
+		self.paths = [None] * size
+		for node in np.flatnonzero(self.kinds == GROUP).tolist():
+			parent = self.parents[node]
+			self.paths[node] = (self.paths[parent] if parent >= 0 else ()) + (self.names[node],)
+
+	def __len__(self):
+		return len(self.names)
+
+	def get_children(self, node):
+		return self.children[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+	def get_path(self, node):
+		"""
+		Returns the folder names from the root group to the node (a group) or to the group of the node (a block).
+		"""
+		if self.kinds[node] == BLOCK:
+			node = self.parents[node]
+		return list(self.paths[node])
+
+	def count_nodes(self, node=0):
+		return int(self.ends[node] - node)
+
+	def count_blocks(self, node=0):
+		return int(self.block_counts[self.ends[node]] - self.block_counts[node])
+
+	def get_depth(self, node=None):
+		"""
+		Returns the depth of a node, or the depth of the deepest node of the tree if no node is given.
+		"""
+		if node is None:
+			return int(self.depths.max()) if len(self.depths) else 0
+		return int(self.depths[node])
+
+	def render(self, space='  '):
+		"""
+		Renders the tree as indented text, the root group has an indent of one space.
+		"""
+		return ''.join(f"{space * (depth + 1)}{name}\n" for depth, name in zip(self.depths.tolist(), self.names))
+
+	def to_records(self):
+		"""
+		Returns a dict per node with the name and the level, the layout of the 'project tree' export.
+		"""
+		return [
+			{"GroupName": name, "GroupLevel": depth + 1} if kind == GROUP else {"Name": name, "GroupLevel": depth, "Indent": depth + 1}
+			for name, kind, depth in zip(self.names, self.kinds.tolist(), self.depths.tolist())
+		]
+
+
+class Catalog:
+	"""
+	Columnar table of all the blocks in the project, indexed for the block lookups.
+
+	Attributes:
+		plc_tables (dict): Maps a PLC name to the table of its blocks.
+		trees (dict): Maps a PLC name to the BlockTree of its block groups.
+		block_groups (dict): Maps the root block group of a PLC to the PLC name.
+		version (int): Incremented each time the catalog is rebuilt.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.plc_tables = {}
+		self.trees = {}
+		self.block_groups = {}
+		self.version = 0
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_core_classes(self):
+		self.software = self.project.software
+		self.attributes = self.project.attributes
+		self.scheduler = self.project.scheduler
+
+
+	def walk_block_group(self, block_group):
+		"""
+		Walks a root block group depth first: a group, its blocks, its subgroups and then its system block groups.
+		The blocks come in the order of 'Software.get_software_blocks'.
+
+		Returns:
+			tuple: A (block, folder name, system) tuple per block, and the (names, kinds, parents, depths, system) lists of the tree nodes.
+		"""
+		entries = []
+		names, kinds, parents, depths, systems = [], [], [], [], []
+		stack = [(block_group, -1, 0, False)]
+		while stack:
+			group, parent, depth, system = stack.pop()
+			node = len(names)
+			folder = group.Name
+			names.append(folder)
+			kinds.append(GROUP)
+			parents.append(parent)
+			depths.append(depth)
+			systems.append(system)
+			for block in group.Blocks:
+				entries.append((block, folder, system))
+				names.append(None)
+				kinds.append(BLOCK)
+				parents.append(node)
+				depths.append(depth + 1)
+				systems.append(system)
+			sub_groups = [(sub_group, False) for sub_group in group.Groups] if hasattr(group, 'Groups') else []
+			if hasattr(group, 'SystemBlockGroups'):
+				sub_groups += [(sub_group, True) for sub_group in group.SystemBlockGroups]
+			stack.extend((sub_group, node, depth + 1, system or is_system) for sub_group, is_system in reversed(sub_groups))
+		return entries, (names, kinds, parents, depths, systems)
+
+
+	def build_plc_table(self, plc_name, block_group):
+		"""
+		Reads the blocks of one PLC into a table, and the groups and blocks into the BlockTree of the PLC.
+
+		Args:
+			plc_name (str): The name of the PLC.
+			block_group (object): The root block group of the PLC software.
+
+		Returns:
+			pandas.DataFrame: A row per block with the CATALOG_COLUMNS.
+		"""
+		entries, nodes = self.walk_block_group(block_group)
+		blocks = [block for block, _, _ in entries]
+		rows = self.attributes.read(blocks, BLOCK_ATTRIBUTES)
+
+		# the block names of the tree come from the bulk read
+		names, kinds, parents, depths, systems = nodes
+		block_nodes = [node for node, kind in enumerate(kinds) if kind == BLOCK]
+		for node, row in zip(block_nodes, rows):
+			names[node] = row['Name']
+		self.trees[plc_name] = BlockTree(names, kinds, parents, depths, systems)
+
+		def to_datetime(date):
+			if date is None:
+				return None
+			return datetime.datetime(date.Year, date.Month, date.Day, date.Hour, date.Minute, date.Second)
+
+		table = pd.DataFrame({
+			'PLC': [plc_name] * len(blocks),
+			'Folder': [folder for _, folder, _ in entries],
+			'Name': [row['Name'] for row in rows],
+			'Type': [block.GetType().Name for block in blocks],
+			'Number': pd.Series([row['Number'] for row in rows], dtype=object),
+			'IsConsistent': [row['IsConsistent'] for row in rows],
+			'ModifiedDate': pd.to_datetime(pd.Series([to_datetime(row['ModifiedDate']) for row in rows], dtype=object)),
+			'InstanceOfName': pd.Series([self.attributes.to_plain(row['InstanceOfName']) for row in rows], dtype=object),
+			'InstanceOfNumber': pd.Series([row['InstanceOfNumber'] for row in rows], dtype=object),
+			'System': [system for _, _, system in entries],
+			'Node': pd.Series(block_nodes, dtype='int64'),
+			'ReferenceObject': pd.Series(blocks, dtype=object),
+		}, columns=CATALOG_COLUMNS)
+		logger.debug(
+			f"Cataloged the blocks of PLC '{plc_name}': "
+			f"total blocks: '{len(table)}', "
+			f"system blocks: '{int(table['System'].sum())}'"
+		)
+		return table
+
+
+	def get_plc_table(self, plc_name, reload=False):
+		"""
+		Retrieves the table of the blocks of one PLC, it is built on the first lookup.
+		A reload only reads the blocks of this PLC again, the tables of the other PLC's are kept.
+
+		Returns:
+			pandas.DataFrame: A row per block of the PLC with the CATALOG_COLUMNS.
+		"""
+		if plc_name in self.plc_tables and not reload:
+			return self.plc_tables[plc_name]
+		if plc_name not in self.plc_tables:
+			self.get_table(reload=reload)
+			if plc_name not in self.plc_tables:
+				raise ValueError(f"PLC '{plc_name}' not found in the project")
+			return self.plc_tables[plc_name]
+
+		logger.debug(f"Rebuilding the block catalog of PLC '{plc_name}'")
+		try:
+			self.plc_tables[plc_name] = self.build_plc_table(plc_name, self.get_block_group(plc_name))
+			tables = [table for table in self.plc_tables.values() if not table.empty]
+			self.table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=CATALOG_COLUMNS)
+		except Exception as e:
+			raise Exception(f'Failed to rebuild the block catalog of PLC {plc_name}: {str(e)}')
+
+		self.build_indexes()
+		self.version += 1
+		logger.debug(
+			f"Returning block catalog of PLC '{plc_name}' {type(self.plc_tables[plc_name])}: "
+			f"total entries: '{len(self.plc_tables[plc_name])}', "
+			f"version: '{self.version}'"
+		)
+		return self.plc_tables[plc_name]
+
+
+	def get_table(self, reload=False):
+		"""
+		Retrieves the catalog of all the blocks in the project and builds its indexes.
+
+		Returns:
+			pandas.DataFrame: A row per block with the CATALOG_COLUMNS, the PLC's in the order of the hardware.
+		"""
+		if hasattr(self, 'table') and not reload:
+			logger.debug(f"Returning cached block catalog {type(self.table)}: '{len(self.table)}' blocks...")
+			return self.table
+
+		software_container = self.software.get_software_container(reload=reload)
+		logger.debug(
+			f"Building the block catalog of the project: "
+			f"plc's: {list(software_container.keys())}, "
+			f"reload: '{reload}'"
+		)
+		try:
+			self.trees = {}
+			self.block_groups = {software.BlockGroup: plc_name for plc_name, software in software_container.items()}
+			# the PLC's are cataloged concurrently, each PLC fills its own table and tree
+			self.plc_tables = self.scheduler.map_plcs(lambda plc_name: self.build_plc_table(plc_name, software_container[plc_name].BlockGroup), list(software_container.keys()))
+			tables = [table for table in self.plc_tables.values() if not table.empty]
+			table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=CATALOG_COLUMNS)
+		except Exception as e:
+			raise Exception(f'Failed to build the block catalog: {str(e)}')
+
+		self.table = table
+		self.build_indexes()
+		self.version += 1
+		logger.debug(
+			f"Returning block catalog {type(self.table)}: "
+			f"total entries: '{len(self.table)}', "
+			f"version: '{self.version}'"
+		)
+		return self.table
+
+
+	def build_indexes(self):
+		"""
+		Builds the lookup indexes on the rows of the catalog table.
+		"""
+		table = self.table
+		plcs = table['PLC'].tolist()
+		names = table['Name'].astype(str).tolist()
+		keys = [name.lower() for name in names]
+		spaces = [number_space(block_type) for block_type in table['Type']]
+
+		self.name_index = {}
+		self.key_index = {}
+		self.number_index = {}
+		self.object_index = dict(zip(table['ReferenceObject'], range(len(table))))
+		for position, (plc, name, key, space, number) in enumerate(zip(plcs, names, keys, spaces, table['Number'])):
+			self.name_index.setdefault((plc, name), position)
+			self.key_index.setdefault(key, []).append(position)
+			self.number_index.setdefault((plc, space, number), []).append(position)
+
+		order = sorted(range(len(keys)), key=keys.__getitem__)
+		self.sorted_keys = [keys[position] for position in order]
+		self.sorted_key_positions = order
+
+		dates = table['ModifiedDate']
+		dated = np.flatnonzero(dates.notna().to_numpy())
+		date_values = dates.iloc[dated].to_numpy(dtype='datetime64[ns]')
+		date_order = np.argsort(date_values, kind='stable')
+		self.sorted_dates = date_values[date_order]
+		self.sorted_date_positions = dated[date_order]
+		logger.debug(
+			f"Built the block catalog indexes: "
+			f"names: '{len(self.name_index)}', "
+			f"case-insensitive names: '{len(self.key_index)}', "
+			f"numbers: '{len(self.number_index)}', "
+			f"dated blocks: '{len(self.sorted_dates)}'"
+		)
+
+
+	def rows(self, positions, plc=None):
+		"""
+		Returns the catalog rows at the given positions (ascending), optionally only the rows of one PLC.
+		"""
+		rows = self.table.iloc[sorted(positions)]
+		if plc is not None:
+			rows = rows[rows['PLC'] == plc]
+		return rows
+
+
+	def get_group_plc(self, block_group, reload=False):
+		"""
+		Returns the name of the PLC of a root block group, None if the group is not the root block group of a PLC.
+		"""
+		self.get_table(reload=reload)
+		return self.block_groups.get(block_group)
+
+
+	def get_tree(self, plc_name, reload=False):
+		"""
+		Returns the BlockTree of the block groups and blocks of a PLC.
+		"""
+		self.get_table(reload=reload)
+		if plc_name not in self.trees:
+			raise ValueError(f"PLC '{plc_name}' not found in the project")
+		return self.trees[plc_name]
+
+
+	def get_block_group(self, plc_name, reload=False):
+		"""
+		Returns the root block group of a PLC.
+		"""
+		self.get_table(reload=reload)
+		for block_group, name in self.block_groups.items():
+			if name == plc_name:
+				return block_group
+		raise ValueError(f"PLC '{plc_name}' not found in the project")
+
+
+	def locate_block(self, block, reload=False):
+		"""
+		Returns the PLC of a block and its folders, from the root block group of the PLC to the group that holds the block.
+
+		Returns:
+			tuple: The PLC name and the list of folder names, None if the block is not in the catalog.
+		"""
+		self.get_table(reload=reload)
+		position = self.object_index.get(block)
+		if position is None:
+			return None
+		plc_name = self.table['PLC'].iat[position]
+		return plc_name, self.trees[plc_name].get_path(self.table['Node'].iat[position])
+
+
+	def find(self, name, plc=None, block_type=None, number=None, case_sensitive=True, reload=False):
+		"""
+		Finds blocks by name.
+
+		Args:
+			name (str): The name of the block.
+			plc (str, optional): Only search the blocks of this PLC.
+			block_type (str, optional): Only return blocks of this type, e.g. 'FB'.
+			number (int, optional): Only return blocks with this number.
+			case_sensitive (bool, optional): Whether the name has to match the case. Defaults to True.
+
+		Returns:
+			pandas.DataFrame: The matching catalog rows.
+		"""
+		self.get_table(reload=reload)
+		if case_sensitive and plc is not None:
+			position = self.name_index.get((plc, name))
+			positions = [] if position is None else [position]
+		else:
+			positions = self.key_index.get(str(name).lower(), [])
+			if case_sensitive:
+				positions = [position for position in positions if self.table['Name'].iat[position] == name]
+
+		rows = self.rows(positions, plc)
+		if block_type is not None:
+			rows = rows[rows['Type'] == block_type]
+		if number is not None:
+			rows = rows[rows['Number'] == number]
+		return rows
+
+
+	def get_block(self, name, plc, number=None, reload=False):
+		"""
+		Returns the block object with the given name in a PLC, None if it does not exist (or has another number).
+		"""
+		rows = self.find(name, plc=plc, reload=reload)
+		if rows.empty:
+			logger.debug(f"Block '{name}' not found in the catalog of PLC '{plc}'")
+			return None
+		block = rows['ReferenceObject'].iat[0]
+		if number and rows['Number'].iat[0] != number:
+			logger.debug(f"Block number does not match: '{rows['Number'].iat[0]}' != '{number}'")
+			return None
+		return block
+
+
+	def find_number(self, block_type, number, plc=None, reload=False):
+		"""
+		Finds blocks by number, the data blocks (global and instance) share one number space.
+
+		Returns:
+			pandas.DataFrame: The catalog rows with that number in the number space of the block type.
+		"""
+		self.get_table(reload=reload)
+		space = number_space(block_type)
+		plcs = [plc] if plc is not None else list(self.plc_tables.keys())
+		positions = [position for plc_name in plcs for position in self.number_index.get((plc_name, space, number), [])]
+		return self.rows(positions)
+
+
+	def find_many(self, names, plc=None, case_sensitive=False, reload=False):
+		"""
+		Finds a list of blocks, e.g. a list of names pasted by the user.
+
+		Args:
+			names (str | list): The names, a string is split on new lines, tabs, commas and semicolons.
+			plc (str, optional): Only search the blocks of this PLC.
+			case_sensitive (bool, optional): Whether the names have to match the case. Defaults to False.
+
+		Returns:
+			tuple: The found catalog rows with a 'Query' column (in the order of the names), and the list of names that were not found.
+		"""
+		if isinstance(names, str):
+			names = re.split(NAME_SEPARATORS, names)
+		names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+
+		found, missing = [], []
+		for name in names:
+			rows = self.find(name, plc=plc, case_sensitive=case_sensitive, reload=reload)
+			reload = False
+			if rows.empty:
+				missing.append(name)
+			else:
+				found.append(rows.assign(Query=name))
+
+		found = pd.concat(found) if found else pd.DataFrame(columns=CATALOG_COLUMNS + ['Query'])
+		logger.debug(
+			f"Searched '{len(names)}' block names: "
+			f"found rows: '{len(found)}', "
+			f"missing: {missing}"
+		)
+		return found, missing
+
+
+	def find_prefix(self, prefix, plc=None, reload=False):
+		"""
+		Finds the blocks with a name that starts with the prefix (case-insensitive).
+
+		Returns:
+			pandas.DataFrame: The matching catalog rows.
+		"""
+		self.get_table(reload=reload)
+		prefix = str(prefix).lower()
+		start = bisect_left(self.sorted_keys, prefix)
+		end = bisect_right(self.sorted_keys, prefix + '\U0010ffff', lo=start)
+		return self.rows(self.sorted_key_positions[start:end], plc)
+
+
+	def modified_between(self, start=None, end=None, plc=None, reload=False):
+		"""
+		Finds the blocks modified within a date range, blocks without a modified date are never returned.
+
+		Args:
+			start (datetime | str, optional): The first modified date (inclusive), None for no lower bound.
+			end (datetime | str, optional): The last modified date (inclusive), None for no upper bound.
+			plc (str, optional): Only search the blocks of this PLC.
+
+		Returns:
+			pandas.DataFrame: The matching catalog rows.
+		"""
+		self.get_table(reload=reload)
+		first = 0 if start is None else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+		last = len(self.sorted_dates) if end is None else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+		return self.rows(self.sorted_date_positions[first:last].tolist(), plc)
+
+
+	def modified_since(self, date, plc=None, reload=False):
+		return self.modified_between(start=date, plc=plc, reload=reload)
+
+
+	def check_collision(self, plc, name=None, block_type=None, number=None, reload=False):
+		"""
+		Checks if a new block would collide with an existing block of the PLC, by name (case-insensitive) or by number.
+
+		Args:
+			plc (str): The PLC of the new block.
+			name (str, optional): The name of the new block.
+			block_type (str, optional): The type of the new block, required to check the number.
+			number (int, optional): The number of the new block.
+
+		Returns:
+			pandas.DataFrame: The existing blocks the new block would collide with, empty if there is no collision.
+		"""
+		self.get_table(reload=reload)
+		positions = set()
+		if name is not None:
+			positions.update(self.key_index.get(str(name).lower(), []))
+		if block_type is not None and number is not None:
+			positions.update(self.number_index.get((plc, number_space(block_type), number), []))
+		return self.rows(positions, plc)
+
+
+	def get_collisions(self, across_plcs=False, reload=False):
+		"""
+		Retrieves the colliding blocks in the catalog.
+
+		Args:
+			across_plcs (bool, optional): False returns the blocks of a PLC that share a (case-insensitive) name or a number,
+				True returns the blocks with the same name in several PLC's that do not have the same type and number.
+
+		Returns:
+			pandas.DataFrame: The colliding catalog rows.
+		"""
+		table = self.get_table(reload=reload)
+		keys = table['Name'].astype(str).str.lower()
+		if across_plcs:
+			signatures = table['Type'].astype(str) + ':' + table['Number'].astype(str)
+			grouped = pd.DataFrame({'Key': keys, 'PLC': table['PLC'], 'Signature': signatures}).groupby('Key')
+			mask = (grouped['PLC'].transform('nunique') > 1) & (grouped['Signature'].transform('nunique') > 1)
+		else:
+			spaces = table['Type'].map(number_space)
+			mask = (
+				pd.DataFrame({'PLC': table['PLC'], 'Key': keys}).duplicated(keep=False)
+				| pd.DataFrame({'PLC': table['PLC'], 'Space': spaces, 'Number': table['Number']}).duplicated(keep=False)
+			)
+		collisions = table[mask.to_numpy()]
+		logger.debug(f"Returning colliding blocks: across plc's: '{across_plcs}', total entries: '{len(collisions)}'")
+		return collisions
@@ -0,0 +1,140 @@
+"""
+Device-type classification of the hardware (PLC, scalance, module, drive, ...).
+
+The rules are an ordered table: the first rule with a matching identifier wins. The whole table is compiled into one
+regex with a lookahead branch per rule, tried in the order of the table, so a single match per identifier decides
+the device type. Identifiers only match at the start of a word (e.g. 'SEW' does not match inside 'MOVISEW').
+The result is cached per identifier (TypeIdentifier and/or OrderNumber), a project only has a few hundred distinct ones.
+"""
+
+import re
+import pandas as pd
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+# (device type, identifier patterns, color), the order is the priority
+# scalance and the PN/PN coupler come before module and drive: their GSD identifiers can also contain 'ET200' or 'SIEMENS'
+DEVICE_TYPE_RULES = [
+	('PLC', [r'S71500', r'6ES7 51\d'], 'red'),
+	('scalance', [r'SCALANCE', r'6GK5'], 'green'),
+	('PNcoupler', [r'PNPNCOUPLER', r'6ES7 158-3AD'], 'orange'),
+	('module', [r'ET200SP', r'ET200ECO', r'6ES7 1[3-5]\d'], 'blue'),
+	('drive', [r'SIEMENS', r'DFS(?![A-Z])', r'SEW(?![A-Z])'], 'yellow'),
+]
+OTHER_TYPE = ('other', 'gray')
+DEVICE_TYPE_COLORS = dict([(device_type, color) for device_type, _, color in DEVICE_TYPE_RULES] + [OTHER_TYPE])
+
+
+def compile_rules(rules):
+	"""
+	Compiles the rule table into one regex, with an empty named group per rule.
+
+	Args:
+		rules (list): The (device type, identifier patterns, color) rules in order of priority.
+
+	Returns:
+		re.Pattern: The compiled regex, the name of the matched group is the device type.
+	"""
+	branches = []
+	for device_type, patterns, _ in rules:
+		alternatives = '|'.join(patterns)
+		branches.append(rf"(?=.*?(?<![A-Z0-9])(?:{alternatives}))(?P<{device_type}>)")
+	return re.compile(r'^(?:' + '|'.join(branches) + r')', re.DOTALL)
+
+
+DEVICE_TYPE_REGEX = compile_rules(DEVICE_TYPE_RULES)
+
+
+class Classification:
+	"""
+	Classifies device identifiers into device types with the precompiled rule table.
+
+	Attributes:
+		cache (dict): Maps an identifier to its device type.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.cache = {}
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_core_classes(self):
+		self.hardware = self.project.hardware
+		self.attributes = self.project.attributes
+
+
+	def match(self, identifier):
+		match = DEVICE_TYPE_REGEX.match(str(identifier).upper())
+		return match.lastgroup if match else OTHER_TYPE[0]
+
+
+	def classify(self, identifier):
+		"""
+		Returns the device type and color of an identifier (e.g. a TypeIdentifier).
+
+		Args:
+			identifier (str): The identifier of the device.
+
+		Returns:
+			tuple: The device type and its color.
+		"""
+		device_type = self.cache.get(identifier)
+		if device_type is None:
+			device_type = self.cache[identifier] = self.match(identifier)
+		return device_type, DEVICE_TYPE_COLORS[device_type]
+
+
+	def classify_many(self, identifiers):
+		"""
+		Classifies a batch of identifiers in one pass, only the distinct identifiers that are not cached are matched.
+
+		Args:
+			identifiers (iterable): The identifiers, e.g. a column of TypeIdentifiers.
+
+		Returns:
+			pandas.Series: The device type of each identifier, in the same order.
+		"""
+		identifiers = pd.Series(identifiers, dtype=object).fillna('').astype(str)
+		unknown = [identifier for identifier in identifiers.unique() if identifier not in self.cache]
+		if unknown:
+			matched = pd.Series(unknown, dtype=object).str.upper().str.extract(DEVICE_TYPE_REGEX)
+			# only the group of the matching rule is set (empty string), rows without any match are 'other'
+			device_types = matched.notna().idxmax(axis=1).where(matched.notna().any(axis=1), OTHER_TYPE[0])
+			self.cache.update(zip(unknown, device_types))
+			logger.debug(f"Classified '{len(unknown)}' new identifiers, cached identifiers: '{len(self.cache)}'")
+		return identifiers.map(self.cache)
+
+
+	def get_inventory_types(self, reload=False):
+		"""
+		Classifies every device item of the hardware inventory in a single pass.
+		The TypeIdentifier and the OrderNumber are matched together, so items with an 'OrderNumber:' type identifier
+		are classified as well.
+
+		Returns:
+			pandas.DataFrame: The device item table (see 'Attributes.get_device_item_table') with a 'DeviceType' and 'Color' column.
+		"""
+		if hasattr(self, 'inventory_types') and not reload and self.inventory_types_version == self.hardware.inventory_version:
+			logger.debug(f"Returning cached device types of the inventory: '{len(self.inventory_types)}' items...")
+			return self.inventory_types
+
+		table = self.attributes.get_device_item_table(reload=reload).copy()
+		identifiers = table['TypeIdentifier'].fillna('').astype(str) + ' ' + table['OrderNumber'].fillna('').astype(str)
+		table['DeviceType'] = self.classify_many(identifiers).values
+		table['Color'] = table['DeviceType'].map(DEVICE_TYPE_COLORS)
+
+		self.inventory_types = table
+		self.inventory_types_version = self.hardware.inventory_version
+		logger.debug(
+			f"Returning device types of the inventory {type(table)}: "
+			f"total entries: '{len(table)}', "
+			f"device types: {table['DeviceType'].value_counts().to_dict()}"
+		)
+		return table
@@ -0,0 +1,315 @@
+"""
+Synthetic project generator for the fake Openness backend.
+Builds parameterised projects (from a handful up to 100k devices, blocks and tags) with the same structure
+as a plant project: zones of stations connected in a line, PLC software with nested block/type/tag groups,
+and a project library of which the project blocks are (partly outdated) instances.
+
+Example:
+	>>> from core.fake.generator import generate_project
+	>>> myproject = generate_project(stations=2000, plcs=12, blocks_per_plc=1500, tags_per_plc=5000)
+"""
+
+import datetime
+import random
+
+from core.fake import openness as fake
+
+# (kind, station type identifier, head module name, head order number, firmware)
+STATION_KINDS = [
+	('ET200SP', 'System:Rack.ET200SP', 'IO device', '6ES7 155-6AU01-0BN0', 'V4.1'),
+	('ET200ECO', 'System:Rack.ET200ECO', 'IO device', '6ES7 148-6JA00-0AB0', 'V5.0'),
+	('SCALANCE', 'System:Rack.SCALANCE', 'Switch', '6GK5 208-0BA00-2AC2', 'V6.2'),
+	('SEW', 'GSD:GSDML-V2.3-SEW-MOVIGEAR-20180101.XML', 'Drive', 'MOVIGEAR-PN', 'V2.0'),
+	('SIEMENS', 'GSD:GSDML-V2.32-SIEMENS-SINAMICS_G120-20170101.XML', 'Drive', '6SL3 246-0BA22-1FA0', 'V4.7'),
+	('PNPNCOUPLER', 'System:Rack.PNPNCOUPLER', 'PN/PN coupler', '6ES7 158-3AD10-0XA0', 'V4.2'),
+]
+PLC_KIND = ('PLC', 'System:Rack.S71500', 'PLC', '6ES7 516-3FN01-0AB0', 'V2.6')
+MODULE_KINDS = [
+	('DI 8x24VDC ST', '6ES7 131-6BF00-0BA0', 'I', 1),
+	('DQ 8x24VDC/0.5A ST', '6ES7 132-6BF00-0BA0', 'Q', 1),
+	('AI 4xU/I 2-wire ST', '6ES7 134-6HD00-0BA1', 'I', 8),
+	('AQ 2xU/I ST', '6ES7 135-6HB00-0DA1', 'Q', 4),
+]
+DATA_TYPES = [('Bool', 'X'), ('Byte', 'B'), ('Int', 'W'), ('DInt', 'D')]
+BASE_DATE = datetime.datetime(2024, 1, 1, 8, 0, 0)
+SYSTEM_LIB_BLOCK = 'LSystemVarS7-1500'
+
+
+def generate_project(name='P000000A01', stations=100, plcs=2, zones=None, modules_per_station=4,
+		blocks_per_plc=200, tags_per_plc=500, tags_per_table=250, library_types=50, versions_per_type=3,
+		group_depth=2, groups_per_level=3, system_block_export=None, seed=0):
+	"""
+	Generates a synthetic project for the fake backend.
+
+	Args:
+		name (str): The name of the project.
+		stations (int): The total amount of stations, the PLC stations included.
+		plcs (int): The amount of PLC's, each PLC gets its own device group (zone).
+		zones (int, optional): The amount of zones (device groups), defaults to the amount of PLC's.
+		modules_per_station (int): The amount of IO modules in each station.
+		blocks_per_plc (int): The amount of program blocks for each PLC.
+		tags_per_plc (int): The amount of tags for each PLC.
+		tags_per_table (int): The amount of tags in each tag table.
+		library_types (int): The amount of types in the project library.
+		versions_per_type (int): The amount of versions of each library type.
+		group_depth (int): The depth of the nested block/type/tag groups.
+		groups_per_level (int): The amount of subgroups on each level.
+		system_block_export (str, optional): Path of a SimaticML file that is exported for the system library block.
+		seed (int): Seed for the random generator, the same seed gives the same project.
+
+	Returns:
+		Project: The fake project.
+	"""
+	rnd = random.Random(seed)
+	project = fake.Project(name)
+	zones = zones or max(plcs, 1)
+
+	library_versions = _generate_library(project, rnd, library_types, versions_per_type)
+	plc_items = _generate_hardware(project, rnd, stations, plcs, zones, modules_per_station)
+
+	for plc_index, plc_item in enumerate(plc_items):
+		software = plc_item.services[fake.SoftwareContainer].Software
+		_generate_blocks(software, rnd, blocks_per_plc, library_versions, group_depth, groups_per_level, system_block_export)
+		_generate_types(software, rnd, library_versions, group_depth, groups_per_level)
+		_generate_tags(software, rnd, plc_index, tags_per_plc, tags_per_table, group_depth, groups_per_level)
+	return project
+
+
+def generate_portal(**kwargs):
+	"""
+	Generates a fake portal with a synthetic project opened in it, see 'generate_project' for the arguments.
+
+	Returns:
+		tuple: The fake project and the fake portal.
+	"""
+	portal = fake.TiaPortal()
+	project = generate_project(**kwargs)
+	portal.Projects.append(project)
+	return project, portal
+
+
+def _date(rnd, days=365):
+	return BASE_DATE + datetime.timedelta(days=rnd.randrange(days), seconds=rnd.randrange(86400))
+
+
+def _generate_hardware(project, rnd, stations, plcs, zones, modules_per_station):
+	plc_items = []
+	zone_groups = []
+	for zone_index in range(zones):
+		group = fake.DeviceGroup(f"{712000 + zone_index:06d}", project)
+		project.DeviceGroups.append(group)
+		zone_groups.append(group)
+
+	previous_port = {}
+	for index in range(stations):
+		zone_index = index % zones
+		group = zone_groups[zone_index]
+		is_plc = index < plcs
+		kind = PLC_KIND if is_plc else STATION_KINDS[rnd.randrange(len(STATION_KINDS))]
+		kind_name, type_identifier, head_name, order_number, firmware = kind
+		zone = group.Name
+		station_name = f"{zone}{kind_name}_{index}"
+
+		# ungrouped devices and nested groups are used for a part of the stations to mimic real projects
+		if index % 50 == 49:
+			parent_group = project.UngroupedDevicesGroup
+		elif index % 10 == 9:
+			if not group.Groups:
+				group.Groups.append(fake.DeviceGroup(f"{zone} sub", group))
+			parent_group = group.Groups[0]
+		else:
+			parent_group = group
+
+		station = fake.Device(f"{station_name} station", f"System:Device.{kind_name}", parent_group)
+		parent_group.Devices.append(station)
+
+		rack = fake.DeviceItem(station_name, station, type_identifier=type_identifier)
+		station._device_items.append(rack)
+		classification = fake.CLASSIFICATION_CPU if is_plc else fake.CLASSIFICATION_HM
+		head = fake.DeviceItem(station_name if is_plc else f"{head_name}_{index}", rack,
+			type_identifier=f"OrderNumber:{order_number}/{firmware}", order_number=order_number,
+			firmware_version=firmware, classification=classification, position=1 if is_plc else 0)
+		rack._device_items.append(head)
+
+		interface_name = 'PROFINET' if is_plc else 'PROFINET interface'
+		interface_item = fake.DeviceItem(interface_name, head, type_identifier='System:Interface.PN')
+		head._device_items.append(interface_item)
+		interface = fake.NetworkInterface(station_name, interface_item)
+		interface_item.services[fake.NetworkInterface] = interface
+		address = f"10.{zone_index % 256}.{(index // 250) % 256}.{index % 250 + 1}"
+		interface.Nodes.append(fake.Node('E1', address, router_address=f"10.{zone_index % 256}.0.254", parent=interface))
+
+		for port_index in (1, 2):
+			port_item = fake.DeviceItem(f"Port_{port_index}", interface_item, type_identifier='System:Port.PN')
+			interface_item._device_items.append(port_item)
+			port = fake.NetworkPort(f"Port_{port_index}", interface, cable_length=f"Length{rnd.choice([20, 50, 100])}m")
+			interface.Ports.append(port)
+
+		# stations of a zone are connected in a line: port 2 of a station goes to port 1 of the next one
+		if zone_index in previous_port:
+			previous_port[zone_index].ConnectToPort(interface.Ports[0])
+		previous_port[zone_index] = interface.Ports[1]
+
+		if is_plc:
+			container = fake.SoftwareContainer(station_name, head)
+			head.services[fake.SoftwareContainer] = container
+			plc_items.append(head)
+
+		io_byte = {'I': 0, 'Q': 0}
+		for position in range(modules_per_station):
+			module_name, module_order, io_type, length = MODULE_KINDS[rnd.randrange(len(MODULE_KINDS))]
+			module = fake.DeviceItem(f"{module_name}_{position + 1}", rack, type_identifier=f"OrderNumber:{module_order}/V1.0",
+				order_number=module_order, firmware_version='V1.0', position=position + 2)
+			start = (index * 16 + io_byte[io_type]) % 32000
+			module.Addresses.append(fake.Address('Input' if io_type == 'I' else 'Output', start, length * 8, module))
+			io_byte[io_type] += length
+			rack._device_items.append(module)
+
+	# the addresses of all the modules in a zone are owned by the PLC of that zone
+	for zone_index, group in enumerate(zone_groups):
+		if not plc_items:
+			break
+		plc_item = plc_items[zone_index % len(plc_items)]
+		for station in _group_stations(group):
+			for item in station._device_items[0]._device_items:
+				for address in item.Addresses:
+					address.AddressControllers.append(plc_item)
+	return plc_items
+
+
+def _group_stations(group):
+	stations = list(group.Devices)
+	for sub_group in group.Groups:
+		stations.extend(_group_stations(sub_group))
+	return stations
+
+
+def _generate_groups(root, factory, attribute, depth, per_level):
+	"""
+	Generates nested groups under the root group and returns all the groups, the root included.
+	"""
+	groups = [root]
+	level = [root]
+	for depth_index in range(depth):
+		next_level = []
+		for parent in level:
+			for index in range(per_level):
+				group = factory(f"{parent.Name[:12]}_{depth_index}{index}", parent)
+				getattr(parent, attribute).append(group)
+				next_level.append(group)
+		groups.extend(next_level)
+		level = next_level
+	return groups
+
+
+def _generate_library(project, rnd, library_types, versions_per_type):
+	type_folder = project.ProjectLibrary.TypeFolder
+	folders = [type_folder]
+	for index in range(4):
+		folder = fake.LibraryTypeFolder(f"Folder_{index}", type_folder)
+		type_folder.Folders.append(folder)
+		folders.append(folder)
+
+	library_versions = []
+	for index in range(library_types):
+		folder = folders[index % len(folders)]
+		library_type = fake.LibraryType(f"LIB_Type_{index:04d}", folder, comment=f"Library type {index}")
+		folder.Types.append(library_type)
+		for version_index in range(versions_per_type):
+			state = 'InWork' if version_index == versions_per_type - 1 and index % 7 == 0 else 'Committed'
+			version = fake.LibraryTypeVersion(library_type, f"1.0.{version_index}", _date(rnd), state=state)
+			library_type.Versions.append(version)
+
+		# dependencies on the latest version of some earlier types
+		if index:
+			for dependency_index in rnd.sample(range(index), min(index, rnd.randrange(3))):
+				dependency = library_versions[dependency_index][-1]
+				for version in library_type.Versions:
+					version.add_dependency(dependency)
+		library_versions.append(list(library_type.Versions))
+	return library_versions
+
+
+def _generate_blocks(software, rnd, blocks_per_plc, library_versions, group_depth, groups_per_level, system_block_export):
+	groups = _generate_groups(software.BlockGroup, fake.PlcBlockUserGroup, 'Groups', group_depth, groups_per_level)
+	system_group = fake.PlcSystemBlockGroup('System blocks', software.BlockGroup)
+	software.BlockGroup.SystemBlockGroups.append(system_group)
+
+	system_block = fake.FB(SYSTEM_LIB_BLOCK, 2204, groups[0], _date(rnd))
+	system_block.export_source = system_block_export
+	groups[0].Blocks.append(system_block)
+
+	numbers = {'OB': 1, 'FC': 1, 'FB': 1, 'GlobalDB': 1, 'InstanceDB': 3000}
+	function_blocks = []
+	for index in range(blocks_per_plc):
+		group = groups[rnd.randrange(len(groups))]
+		roll = rnd.random()
+		date = _date(rnd)
+		if roll < 0.05:
+			block = fake.OB(f"OB_{numbers['OB']}", numbers['OB'], group, date)
+			numbers['OB'] += 1
+		elif roll < 0.35:
+			block = fake.FC(f"FC_{numbers['FC']}", numbers['FC'], group, date)
+			numbers['FC'] += 1
+		elif roll < 0.6 or not function_blocks:
+			block = fake.FB(f"FB_{numbers['FB']}", numbers['FB'], group, date)
+			numbers['FB'] += 1
+			function_blocks.append(block)
+		elif roll < 0.75:
+			block = fake.GlobalDB(f"DB_{numbers['GlobalDB']}", numbers['GlobalDB'], group, date)
+			numbers['GlobalDB'] += 1
+		else:
+			instance_of = function_blocks[rnd.randrange(len(function_blocks))]
+			block = fake.InstanceDB(f"{instance_of.Name}_DB_{numbers['InstanceDB']}", numbers['InstanceDB'], group, date, instance_of)
+			numbers['InstanceDB'] += 1
+		group.Blocks.append(block)
+
+	# a part of the function blocks are instances of a library type, some of them of an outdated version
+	if library_versions:
+		for block in function_blocks[::3]:
+			versions = library_versions[rnd.randrange(len(library_versions))]
+			version = versions[-1] if rnd.random() < 0.8 else versions[0]
+			version.add_instance(software, block)
+
+	for index in range(max(blocks_per_plc // 50, 1)):
+		block = fake.FB(f"F_Block_{index}", 30000 + index, system_group, _date(rnd), language='F_LAD')
+		system_group.Blocks.append(block)
+
+
+def _generate_types(software, rnd, library_versions, group_depth, groups_per_level):
+	groups = _generate_groups(software.TypeGroup, fake.PlcTypeGroup, 'Groups', max(group_depth - 1, 0), groups_per_level)
+	system_group = fake.PlcTypeGroup('System data types', software.TypeGroup)
+	software.TypeGroup.SystemTypeGroups.append(system_group)
+
+	for index, group in enumerate(groups):
+		for type_index in range(5):
+			plc_type = fake.PlcStruct(f"UDT_{index}_{type_index}", group, _date(rnd))
+			group.Types.append(plc_type)
+			if library_versions and type_index == 0:
+				versions = library_versions[rnd.randrange(len(library_versions))]
+				versions[-1].add_instance(software, plc_type)
+	system_group.Types.append(fake.PlcStruct('IEC_TIMER', system_group, BASE_DATE))
+
+
+def _generate_tags(software, rnd, plc_index, tags_per_plc, tags_per_table, group_depth, groups_per_level):
+	groups = _generate_groups(software.TagTableGroup, fake.PlcTagTableGroup, 'Groups', max(group_depth - 1, 0), groups_per_level)
+	default_table = fake.PlcTagTable('Default tag table', software.TagTableGroup)
+	software.TagTableGroup.TagTables.append(default_table)
+
+	table = default_table
+	areas = ['I', 'Q', 'M']
+	for index in range(tags_per_plc):
+		if index and index % tags_per_table == 0:
+			group = groups[rnd.randrange(len(groups))]
+			table = fake.PlcTagTable(f"Tags_{plc_index}_{index // tags_per_table}", group)
+			group.TagTables.append(table)
+
+		area = areas[index % 3]
+		data_type, size = DATA_TYPES[rnd.randrange(len(DATA_TYPES))]
+		byte = (index // 3) % 32000
+		if size == 'X':
+			address = f"%{area}{byte}.{index % 8}"
+		else:
+			address = f"%{area}{size}{byte}"
+		comment = f"{rnd.choice(['Motor', 'Valve', 'Sensor', 'Conveyor', 'Robot'])} {index} {rnd.choice(['start', 'stop', 'fault', 'ready'])}"
+		table.Tags.append(fake.PlcTag(f"{area}_{data_type}_{index}", address, data_type, table, comment=comment))
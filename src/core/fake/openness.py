@@ -0,0 +1,663 @@
+"""
+In-memory fake of the TIA Portal Openness object model.
+Mirrors the part of the 'Siemens.Engineering' API that the core-modules touch: device groups, devices and device items,
+network interfaces with their nodes and ports, the PLC software container with its block, type and tag table groups,
+and the project library with its type folders and versions.
+
+Every call that crosses the Openness boundary in the real API (GetAttribute, GetAttributes, GetService, ...) is counted
+in 'CALLS' and can be slowed down with 'set_latency' to mimic the round-trip time of a real TIA Portal instance.
+"""
+
+import datetime
+import threading
+import time
+
+from collections import Counter
+from types import SimpleNamespace
+
+CALLS = Counter()
+LATENCY = 0.0
+_calls_lock = threading.Lock()
+
+
+def set_latency(seconds):
+	"""
+	Sets the simulated round-trip time of every boundary call.
+
+	Args:
+		seconds (float): The time in seconds that each boundary call takes.
+	"""
+	global LATENCY
+	LATENCY = seconds
+
+
+def reset_calls():
+	CALLS.clear()
+
+
+def roundtrip(kind):
+	"""
+	Registers a call over the Openness boundary and waits the simulated latency.
+
+	Args:
+		kind (str): The kind of call, used as key in 'CALLS'.
+	"""
+	with _calls_lock:
+		CALLS[kind] += 1
+	if LATENCY:
+		time.sleep(LATENCY)
+
+
+class EngineeringNotSupportedException(Exception):
+	pass
+
+
+class NetType:
+	"""
+	Stand-in for the System.Type returned by GetType(), only the 'Name' and 'FullName' are provided.
+	"""
+	def __init__(self, name, namespace):
+		self.Name = name
+		self.FullName = f"{namespace}.{name}"
+
+	def __str__(self):
+		return self.FullName
+
+	def __repr__(self):
+		return self.FullName
+
+
+class DateTime:
+	"""
+	Stand-in for System.DateTime.
+	"""
+	def __init__(self, value):
+		self.value = value
+		self.Year = value.year
+		self.Month = value.month
+		self.Day = value.day
+		self.Hour = value.hour
+		self.Minute = value.minute
+		self.Second = value.second
+
+	def ToString(self):
+		return self.value.strftime('%d/%m/%Y %H:%M:%S')
+
+	def __str__(self):
+		return self.ToString()
+
+
+class Composition(list):
+	"""
+	Stand-in for the Openness compositions, a list with the .NET 'Count', 'IndexOf' and 'Find' members.
+	"""
+	@property
+	def Count(self):
+		return len(self)
+
+	def IndexOf(self, item):
+		return self.index(item)
+
+	def Find(self, name):
+		roundtrip('Find')
+		for item in self:
+			if item.Name == name:
+				return item
+		return None
+
+	def GetType(self):
+		return NetType(type(self).__name__, 'Siemens.Engineering')
+
+
+class BlockComposition(Composition):
+	"""
+	Block composition of a block group, 'Find' is a hashed lookup in the group like in the real API.
+	"""
+	def __init__(self, *args):
+		super().__init__(*args)
+		self.names = {block.Name: block for block in self}
+
+	def append(self, block):
+		super().append(block)
+		self.names[block.Name] = block
+
+	def Find(self, name):
+		roundtrip('Find')
+		return self.names.get(name)
+
+
+class ServiceAccessor:
+	"""
+	Makes 'obj.GetService[ServiceType]()' work like the generic .NET method.
+	"""
+	def __init__(self, owner):
+		self.owner = owner
+
+	def __getitem__(self, service_type):
+		def get_service():
+			roundtrip('GetService')
+			return self.owner.services.get(service_type)
+		return get_service
+
+
+class EngineeringObject:
+	"""
+	Base of all the fake engineering objects.
+
+	Attributes that are readable with 'GetAttribute' are listed in 'ATTRIBUTES', or stored in the 'attributes' dict.
+	"""
+	NAMESPACE = 'Siemens.Engineering'
+	ATTRIBUTES = ('Name',)
+
+	def __init__(self, name, parent=None):
+		self.Name = name
+		self.Parent = parent
+		self.attributes = {}
+		self.services = {}
+
+	def GetAttribute(self, name):
+		roundtrip('GetAttribute')
+		return self._read_attribute(name)
+
+	def GetAttributes(self, names):
+		roundtrip('GetAttributes')
+		return [self._read_attribute(name) for name in names]
+
+	def SetAttribute(self, name, value):
+		roundtrip('SetAttribute')
+		self.attributes[name] = value
+
+	def _read_attribute(self, name):
+		if name in self.attributes:
+			return self.attributes[name]
+		if name in self.ATTRIBUTES:
+			return getattr(self, name)
+		raise EngineeringNotSupportedException(f"Attribute '{name}' is not supported by '{self.GetType().Name}'")
+
+	@property
+	def GetService(self):
+		return ServiceAccessor(self)
+
+	def GetType(self):
+		return NetType(type(self).__name__, self.NAMESPACE)
+
+	def ToString(self):
+		return str(self.GetType())
+
+	def __repr__(self):
+		return f"<{type(self).__name__} '{self.Name}'>"
+
+
+class MultilingualTextItem:
+	def __init__(self, text, language='en-US'):
+		self.Text = text
+		self.Language = language
+
+
+class MultilingualText:
+	def __init__(self, text=''):
+		self.Items = Composition([MultilingualTextItem(text)] if text else [])
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# hardware
+# ----------------------------------------------------------------------------------------------------------------------
+
+class DeviceItemClassifications:
+	def __init__(self, name):
+		self.name = name
+
+	def __str__(self):
+		return self.name
+
+
+CLASSIFICATION_NONE = DeviceItemClassifications('None')
+CLASSIFICATION_CPU = DeviceItemClassifications('CPU')
+CLASSIFICATION_HM = DeviceItemClassifications('HM')
+
+
+class DeviceGroup(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.Devices = Composition()
+		self.Groups = Composition()
+
+
+class DeviceSystemGroup(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.Devices = Composition()
+
+
+class Device(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+	ATTRIBUTES = ('Name', 'TypeIdentifier')
+
+	def __init__(self, name, type_identifier, parent=None):
+		super().__init__(name, parent)
+		self.TypeIdentifier = type_identifier
+		self._device_items = Composition()
+
+	@property
+	def DeviceItems(self):
+		roundtrip('DeviceItems')
+		return self._device_items
+
+	def Delete(self):
+		roundtrip('Delete')
+		self.Parent.Devices.remove(self)
+
+
+class Address(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+	ATTRIBUTES = ('StartAddress', 'Length', 'IoType')
+
+	def __init__(self, io_type, start_address, length, parent=None):
+		super().__init__(f"{io_type}{start_address}", parent)
+		self.IoType = io_type
+		self.StartAddress = start_address
+		self.Length = length
+		self.AddressControllers = Composition()
+
+
+class DeviceItem(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+	ATTRIBUTES = ('Name', 'TypeIdentifier', 'OrderNumber', 'FirmwareVersion', 'Classification', 'PositionNumber', 'Container')
+
+	def __init__(self, name, parent, type_identifier='', order_number='', firmware_version='', classification=CLASSIFICATION_NONE, position=0):
+		super().__init__(name, parent)
+		self.TypeIdentifier = type_identifier
+		self.OrderNumber = order_number
+		self.FirmwareVersion = firmware_version
+		self.Classification = classification
+		self.PositionNumber = position
+		self.Addresses = Composition()
+		self._device_items = Composition()
+
+	@property
+	def DeviceItems(self):
+		roundtrip('DeviceItems')
+		return self._device_items
+
+	@property
+	def Container(self):
+		return self.Parent
+
+
+class Node(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+	ATTRIBUTES = ('Name', 'Address', 'SubnetMask', 'RouterAddress', 'NodeType')
+
+	def __init__(self, name, address, subnet_mask='255.255.255.0', router_address='0.0.0.0', parent=None):
+		super().__init__(name, parent)
+		self.Address = address
+		self.SubnetMask = subnet_mask
+		self.RouterAddress = router_address
+		self.NodeType = 'Ethernet'
+
+
+class NetworkPort(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW'
+	ATTRIBUTES = ('Name', 'CableLength')
+
+	def __init__(self, name, interface, cable_length='Length20m'):
+		super().__init__(name, interface)
+		self.Interface = interface
+		self.CableLength = cable_length
+		self.ConnectedPorts = Composition()
+
+	def ConnectToPort(self, port):
+		self.ConnectedPorts.append(port)
+		port.ConnectedPorts.append(self)
+
+
+class NetworkInterface(EngineeringObject):
+	"""
+	The NetworkInterface service of a device item, 'Name' is the name of the station of the interface.
+	"""
+	NAMESPACE = 'Siemens.Engineering.HW.Features'
+	ATTRIBUTES = ('Name',)
+
+	def __init__(self, name, deviceitem):
+		super().__init__(name, deviceitem)
+		self.Nodes = Composition()
+		self.Ports = Composition()
+
+
+class PlcSoftware(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.BlockGroup = PlcBlockSystemGroup('Program blocks', self)
+		self.TypeGroup = PlcTypeSystemGroup('PLC data types', self)
+		self.TagTableGroup = PlcTagTableSystemGroup('PLC tags', self)
+
+
+class SoftwareContainer(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.HW.Features'
+
+	def __init__(self, name, deviceitem):
+		super().__init__(name, deviceitem)
+		self.Software = PlcSoftware(name, self)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# software
+# ----------------------------------------------------------------------------------------------------------------------
+
+class PlcBlockGroup(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Blocks'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.Blocks = BlockComposition()
+		self.Groups = Composition()
+
+	def Dispose(self):
+		pass
+
+
+class PlcBlockUserGroup(PlcBlockGroup):
+	pass
+
+
+class PlcSystemBlockGroup(PlcBlockGroup):
+	pass
+
+
+class PlcBlockSystemGroup(PlcBlockGroup):
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.SystemBlockGroups = Composition()
+
+
+class PlcBlock(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Blocks'
+	ATTRIBUTES = ('Name', 'Number', 'IsConsistent', 'ModifiedDate', 'HeaderAuthor', 'ProgrammingLanguage', 'LibraryConformanceStatus', 'CodeModifiedDate')
+
+	def __init__(self, name, number, parent, modified_date, language='LAD', author='VCC', consistent=True):
+		super().__init__(name, parent)
+		self.Number = number
+		self.ModifiedDate = DateTime(modified_date)
+		self.CodeModifiedDate = self.ModifiedDate
+		self.ProgrammingLanguage = language
+		self.HeaderAuthor = author
+		self.IsConsistent = consistent
+		self.LibraryConformanceStatus = 'The object is not connected to the library.'
+		self.export_source = None
+		self.services[tia.Compiler.ICompilable] = CompilerService(self)
+
+	def Export(self, fileinfo, options):
+		"""
+		Writes the SimaticML of the block, the file of 'export_source' if set, otherwise a minimal document.
+		"""
+		roundtrip('Export')
+		if self.export_source is not None:
+			with open(self.export_source, 'rb') as source, open(fileinfo.FullName, 'wb') as target:
+				target.write(source.read())
+			return
+		block_type = self.GetType().Name
+		with open(fileinfo.FullName, 'w', encoding='utf-8') as target:
+			target.write(
+				'<?xml version="1.0" encoding="utf-8"?>\n'
+				'<Document>\n'
+				'  <Engineering version="V15.1" />\n'
+				f'  <SW.Blocks.{block_type} ID="0">\n'
+				'    <AttributeList>\n'
+				f'      <Name>{self.Name}</Name>\n'
+				f'      <Number>{self.Number}</Number>\n'
+				f'      <ProgrammingLanguage>{self.ProgrammingLanguage}</ProgrammingLanguage>\n'
+				'    </AttributeList>\n'
+				'    <ObjectList />\n'
+				f'  </SW.Blocks.{block_type}>\n'
+				'</Document>\n'
+			)
+
+
+class OB(PlcBlock):
+	pass
+
+
+class FC(PlcBlock):
+	pass
+
+
+class FB(PlcBlock):
+	pass
+
+
+class GlobalDB(PlcBlock):
+	pass
+
+
+class InstanceDB(PlcBlock):
+	ATTRIBUTES = PlcBlock.ATTRIBUTES + ('InstanceOfName', 'InstanceOfNumber')
+
+	def __init__(self, name, number, parent, modified_date, instance_of, **kwargs):
+		super().__init__(name, number, parent, modified_date, language='DB', **kwargs)
+		self.InstanceOfName = instance_of.Name
+		self.InstanceOfNumber = instance_of.Number
+
+
+class CompilerResult:
+	def __init__(self):
+		self.Messages = Composition()
+		self.State = 'Success'
+
+
+class CompilerService:
+	def __init__(self, owner):
+		self.owner = owner
+
+	def Compile(self):
+		roundtrip('Compile')
+		return CompilerResult()
+
+
+class PlcTypeGroup(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Types'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.Types = Composition()
+		self.Groups = Composition()
+
+
+class PlcTypeSystemGroup(PlcTypeGroup):
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.SystemTypeGroups = Composition()
+
+
+class PlcStruct(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Types'
+	ATTRIBUTES = ('Name', 'IsConsistent', 'ModifiedDate', 'LibraryConformanceStatus')
+
+	def __init__(self, name, parent, modified_date, consistent=True):
+		super().__init__(name, parent)
+		self.ModifiedDate = DateTime(modified_date)
+		self.IsConsistent = consistent
+		self.LibraryConformanceStatus = 'The object is not connected to the library.'
+
+
+class PlcTagTableGroup(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Tags'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.TagTables = Composition()
+		self.Groups = Composition()
+
+
+class PlcTagTableSystemGroup(PlcTagTableGroup):
+	pass
+
+
+class PlcTagTable(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Tags'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.Tags = Composition()
+
+
+class PlcTag(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.SW.Tags'
+	ATTRIBUTES = ('Name', 'LogicalAddress', 'DataTypeName', 'ExternalAccessible')
+
+	def __init__(self, name, logical_address, data_type, parent=None, comment=''):
+		super().__init__(name, parent)
+		self.LogicalAddress = logical_address
+		self.DataTypeName = data_type
+		self.ExternalAccessible = True
+		self.Comment = MultilingualText(comment)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# library
+# ----------------------------------------------------------------------------------------------------------------------
+
+class LibraryTypeFolder(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.Library.Types'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.Types = Composition()
+		self.Folders = Composition()
+
+
+class LibraryType(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.Library.Types'
+	ATTRIBUTES = ('Name', 'Guid')
+
+	def __init__(self, name, parent=None, comment=''):
+		super().__init__(name, parent)
+		self.Comment = MultilingualText(comment)
+		self.Versions = Composition()
+		self.Guid = f"{id(self):032x}"
+
+
+class LibraryTypeVersion(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.Library.Types'
+	ATTRIBUTES = ('VersionNumber', 'ModifiedDate', 'Author', 'State', 'Guid')
+
+	def __init__(self, type_object, version_number, modified_date, author='VCC', state='Committed', comment=''):
+		super().__init__(f"{type_object.Name} V{version_number}", type_object)
+		self.TypeObject = type_object
+		self.VersionNumber = version_number
+		self.ModifiedDate = DateTime(modified_date)
+		self.Author = author
+		self.State = state
+		self.Comment = MultilingualText(comment)
+		self.Dependencies = Composition()
+		self.Dependents = Composition()
+		self.Guid = f"{id(self):032x}"
+		self.instances = {}
+
+	def add_dependency(self, version):
+		self.Dependencies.append(version)
+		version.Dependents.append(self)
+
+	def add_instance(self, software, instance):
+		self.instances.setdefault(software, Composition()).append(instance)
+		instance.services[tia.Library.Types.LibraryTypeInstanceInfo] = LibraryTypeInstanceInfo(self)
+		instance.LibraryConformanceStatus = 'The object is conform to the library.'
+
+	def FindInstances(self, software):
+		roundtrip('FindInstances')
+		return self.instances.get(software, Composition())
+
+
+class LibraryTypeInstanceInfo:
+	def __init__(self, version):
+		self.LibraryTypeVersion = version
+
+
+class ProjectLibrary(EngineeringObject):
+	NAMESPACE = 'Siemens.Engineering.Library'
+
+	def __init__(self, name, parent=None):
+		super().__init__(name, parent)
+		self.TypeFolder = LibraryTypeFolder('Types', self)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# project and portal
+# ----------------------------------------------------------------------------------------------------------------------
+
+class HistoryEntry:
+	def __init__(self, date_time, text):
+		self.DateTime = DateTime(date_time)
+		self.Text = text
+
+
+class Project(EngineeringObject):
+	ATTRIBUTES = ('Name', 'Author', 'CreationTime', 'LastModified', 'LastModifiedBy')
+
+	def __init__(self, name, author='VCC', creation_time=None):
+		super().__init__(name)
+		creation_time = creation_time or datetime.datetime(2024, 1, 1, 8, 0, 0)
+		self.Author = author
+		self.CreationTime = DateTime(creation_time)
+		self.LastModified = DateTime(creation_time)
+		self.LastModifiedBy = author
+		self.HistoryEntries = Composition([HistoryEntry(creation_time, 'Project created')])
+		self.Devices = Composition()
+		self.DeviceGroups = Composition()
+		self.UngroupedDevicesGroup = DeviceSystemGroup('Ungrouped devices', self)
+		self.ProjectLibrary = ProjectLibrary('Project library', self)
+
+	def Close(self):
+		pass
+
+
+class TiaPortalMode:
+	WithUserInterface = 'WithUserInterface'
+	WithoutUserInterface = 'WithoutUserInterface'
+
+
+class TiaPortal:
+	def __init__(self, mode=TiaPortalMode.WithoutUserInterface):
+		self.Mode = mode
+		self.Projects = Composition()
+
+	def Dispose(self):
+		pass
+
+
+class FileInfo:
+	def __init__(self, path):
+		self.FullName = path
+
+
+class IDisposable:
+	pass
+
+
+def IEngineeringServiceProvider(engineering_object):
+	return engineering_object
+
+
+# namespaces with the same layout as the Openness namespaces used by the core-modules
+tia = SimpleNamespace(
+	IEngineeringServiceProvider=IEngineeringServiceProvider,
+	TiaPortal=TiaPortal,
+	TiaPortalMode=TiaPortalMode,
+	ExportOptions=SimpleNamespace(WithDefaults='WithDefaults', WithReadOnly='WithReadOnly', none='None'),
+	Compiler=SimpleNamespace(ICompilable=CompilerService),
+	Library=SimpleNamespace(Types=SimpleNamespace(LibraryTypeInstanceInfo=LibraryTypeInstanceInfo)),
+	EngineeringNotSupportedException=EngineeringNotSupportedException,
+)
+hwf = SimpleNamespace(
+	NetworkInterface=NetworkInterface,
+	SoftwareContainer=SoftwareContainer,
+)
+System = SimpleNamespace(
+	IDisposable=IDisposable,
+	IO=SimpleNamespace(FileInfo=FileInfo),
+)
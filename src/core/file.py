@@ -4,8 +4,6 @@ Last updated: 05/08/2024
 """
 
 import os
-import clr
-clr.AddReference("C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll")
 import pandas as pd
 import datetime
 
@@ -13,6 +11,9 @@ from utils.loggerConfig import get_logger
 
 logger = get_logger(__name__)
 
+IO_TYPES = {'I': 'Input', 'Q': 'Output', 'M': 'Other'}
+TAG_COLUMNS = ['plc', 'Table', 'Tag', 'LogAddr', 'Address', 'comment', 'DataType', 'IO']
+
 # TODO: DOCSTRINGS & documentation
 class File():
 	"""
@@ -49,6 +50,7 @@ class File():
 		self.hardware = self.project.hardware
 		self.library = self.project.library
 		self.blockdata = self.project.blockdata
+		self.catalog = self.project.catalog
 
 	def get_core_functions(self):
 		logger.debug(f"Accessing 'get_software_container' from the software object '{self.project.software}'...")
@@ -138,41 +140,39 @@ class File():
 			f"reload: '{reload}'"
 		)
 
-		self.PLC_list = self.hardware.get_plc_devices(reload=reload)
-		for plc in self.PLC_list:
-			blocks_list = self.software.get_software_blocks(self.software_container[plc.Name].BlockGroup, include_group=False, include_safety_blocks=True, reload=reload)
-
-			logger.debug(f"Filtering for block '{block_name}' out of all the blocks in the project: '{len(blocks_list)}' blocks")
-			logger.debug(f"Returning block information of '{block_name}' if it has been found")
-			for block in blocks_list:
-				if str(block.Name.lower()) == block_name.lower():
-					reversed_path = self.library.get_map_structure(block)
-					path = reversed(reversed_path)
-					path = '/'.join(folder for folder in path)
-					logger.debug(f'reversed path: {reversed_path}, path: {path}')
-
-					block_type = block.GetType().Name
-					block_number = block.Number
-					block_author = block.HeaderAuthor
-					block_modified = block.ModifiedDate
-					block_language = block.ProgrammingLanguage
-
-					result = f'The block \'{block_name}\' has been found:\n' \
-							f'Path: {path}\n' \
-							f'Type: {block_type}\n' \
-							f'Number: {block_number}\n' \
-							f'HeaderAuthor: {block_author}\n' \
-							f'ModdifiedDate: {block_modified}\n' \
-							f'Programming Language: {block_language}\n'
-					
-					if block_type == 'InstanceDB':
-						result += f'InstanceOfName: {block.InstanceOfName}\n' \
-								f'InstanceOfNumber: {block.GetAttribute("InstanceOfNumber")}\n' \
-								f'IsConsistent: {block.IsConsistent}\n'
-					
-					self.search_results[block_name] = result
-					return result
-		return None
+		# case-insensitive name index of the block catalog, the first PLC (in hardware order) with the block wins
+		rows = self.catalog.find(block_name, case_sensitive=False, reload=reload)
+		logger.debug(f"Returning block information of '{block_name}' if it has been found: '{len(rows)}' matches")
+		if rows.empty:
+			return None
+
+		row = rows.iloc[0]
+		block = row['ReferenceObject']
+		path = self.library.get_path(block)
+		logger.debug(f'path: {path}')
+
+		block_type = row['Type']
+		block_number = row['Number']
+		block_author = block.HeaderAuthor
+		# the catalog holds a pandas Timestamp, formatted like the System.DateTime the block returns
+		block_modified = row['ModifiedDate'].strftime('%d/%m/%Y %H:%M:%S') if pd.notna(row['ModifiedDate']) else None
+		block_language = block.ProgrammingLanguage
+
+		result = f'The block \'{block_name}\' has been found:\n' \
+				f'Path: {path}\n' \
+				f'Type: {block_type}\n' \
+				f'Number: {block_number}\n' \
+				f'HeaderAuthor: {block_author}\n' \
+				f'ModdifiedDate: {block_modified}\n' \
+				f'Programming Language: {block_language}\n'
+
+		if block_type == 'InstanceDB':
+			result += f'InstanceOfName: {row["InstanceOfName"]}\n' \
+					f'InstanceOfNumber: {row["InstanceOfNumber"]}\n' \
+					f'IsConsistent: {row["IsConsistent"]}\n'
+
+		self.search_results[block_name] = result
+		return result
 
 
 	def projectTree(self, reload=False):
@@ -186,9 +186,10 @@ class File():
 			logger.debug(f"Returning cached project tree representation...")
 			return self.tree_text, self.tree_df_data
 
-		blocks = {}
 		self.PLC_list = self.hardware.get_plc_devices(reload=reload)
-		# returns dict with headgroups as key, and value as list of blocks or a dict with subgroups and blocks
+		self.catalog.get_table(reload=reload)
+		# flat tree per PLC (see 'Catalog.get_tree'): a group, its blocks, its subgroups and its system block groups
+		trees = []
 		for plc in self.PLC_list:
 			logger.debug(
 				f"Extracting project structure of: "
@@ -196,37 +197,49 @@ class File():
 				f"PLC: '{plc.Name}', "
 				f"reload: '{reload}'"
 			)
-			blocks.update(self.software.get_software_blocks(self.software_container[plc.Name].BlockGroup, include_safety_blocks=True, reload=reload)) 
-		
-		tree_text = ""
-		space = "  " 
-		tree_df_data = []
-
-		def process_group(group_items, group_name, indent=1):
-			nonlocal tree_text, space
-			tree_text += f"{space * indent}{group_name}\n"
-			tree_df_data.append({"GroupName": group_name, "GroupLevel": indent})
-			for item in group_items:
-				if isinstance(item, dict):
-					# This is a subgroup
-					for sub_group, sub_items in item.items():
-						process_group(sub_items, sub_group.Name, indent + 1)
-				else:
-					# This is a block
-					tree_text += f"{space * (indent + 1)}{item.Name}\n"
-					tree_df_data.append({"Name": item.Name, "GroupLevel": indent,"Indent": indent + 1})
-
-		for group, items in blocks.items():
-			process_group(items, group.Name)
+			trees.append(self.catalog.get_tree(plc.Name))
+
+		tree_text = ''.join(tree.render() for tree in trees)
+		tree_df_data = [record for tree in trees for record in tree.to_records()]
 
 		self.tree_text, self.tree_df_data = tree_text, tree_df_data
 		logger.debug(f"Returning project tree representation of the project as a string {type(tree_text)} and as a list {type(tree_df_data)} for export")
 		return tree_text, tree_df_data
 
 	
-	def show_tagTables(self, reload=False):
+	def make_tag_frame(self, plc_name, table_name, rows):
+		"""
+		Makes the tag dataframe of a batch of tag rows, the address and the IO type are parsed for the whole batch at once.
+
+		Args:
+			plc_name (str): The name of the PLC of the tag table.
+			table_name (str): The name of the tag table.
+			rows (list): The tag rows (see 'Software.iter_project_tags').
+
+		Returns:
+			pandas.DataFrame: The columns of the 'project tags' tab.
+		"""
+		logical_addresses = pd.Series([row['LogicalAddress'] for row in rows], dtype=object).fillna('').astype(str)
+		return pd.DataFrame({
+			'plc': plc_name,
+			'Table': table_name,
+			'Tag': [row['Name'] for row in rows],
+			'LogAddr': logical_addresses,
+			# all the digits of the address (byte and bit) as one number, divided by 10
+			'Address': pd.to_numeric(logical_addresses.str.replace(r'\D', '', regex=True), errors='coerce') / 10,
+			'comment': [row['Comment'] for row in rows],
+			'DataType': [row['DataTypeName'] for row in rows],
+			'IO': logical_addresses.str[1].map(IO_TYPES),
+		})
+
+
+	def show_tagTables(self, reload=False, on_batch=None):
 		"""
 		Retrieves the project tags and creates a DataFrame with the tag tables and tags.
+		The tags are streamed in batches (see 'Software.iter_project_tags'), the dataframe is assembled once at the end.
+
+		Args:
+			on_batch (callable, optional): Called with the dataframe of each batch as soon as it is parsed, e.g. to show the first tables.
 
 		Returns:
 			df (pandas.DataFrame): DataFrame containing the tag tables and tags.
@@ -240,48 +253,16 @@ class File():
 			f"reload: '{reload}'"			
 		)
 
-		def calculate_total_tags(tags):
-			total_tags = 0
-			for table in tags.keys():
-				total_tags += len(tags[table])
-			return total_tags
-		
-		IO_type_dict = {'I':'Input', 'Q': 'Output', 'M':'Other'}
-		tags = self.software.get_project_tags(reload=reload)
-		total_tables = len(tags)
-		total_tags = calculate_total_tags(tags)
-		processed_tags = 0
+		frames = []
+		for plc_name, table_name, rows, progress in self.software.iter_project_tags(reload=reload):
+			logger.debug(f"'{table_name}' batch has '{len(rows)}' tags")
+			frame = self.make_tag_frame(plc_name, table_name, rows)
+			frames.append(frame)
+			if on_batch is not None:
+				on_batch(frame)
+			self.update_progress_bar(progress)
 
-		logger.debug(
-			f"Inserting the retrieved tags into a dataframe: "
-			f"amount of tags: '{len(tags)}'"
-		)
-		
-		df_tags = pd.DataFrame()
-		for table_index, table in enumerate(tags.keys()):
-			logger.debug(f"'{table.Name}' has '{len(tags[table])}' tags")
-			plc_name = table.Parent.Parent.GetAttribute("Name")
-			for i, tag in enumerate(tags[table]):
-				comment = ''.join(s.Text for s in tag.Comment.Items)
-
-				add_data_df = pd.DataFrame({
-					'plc' : [plc_name],
-					'Table': [table.Name],  
-					'Tag': [tag.Name],
-					'LogAddr': [tag.LogicalAddress],
-					'Address': [float(''.join(s for s in tag.LogicalAddress if s.isdigit()))/10],
-					'comment': [comment],
-					'DataType': [tag.DataTypeName],
-					'IO': [IO_type_dict[tag.LogicalAddress[1]]]
-				})
-				
-				df_tags = pd.concat([df_tags, add_data_df], ignore_index=True)
-
-				processed_tags += 1
-				table_progress = (table_index + 1) / total_tables
-				tag_progress = processed_tags / total_tags
-				progress_value = ((table_progress * 50) + (tag_progress * 50))
-				self.update_progress_bar(progress_value)
+		df_tags = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TAG_COLUMNS)
 		self.df_tags = df_tags
 		logger.debug(
 			f"Returning DataFrame {type(df_tags)} of all the tags in the project: "
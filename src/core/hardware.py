@@ -3,16 +3,117 @@ Author: Quinten Bauwens
 Last updated: 09/07/2024
 """
 
-import clr
-# add the reference to the Siemens.Engineering.dll
-clr.AddReference("C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll") 
-import Siemens.Engineering as tia
-import Siemens.Engineering.HW.Features as hwf
-
 from utils.loggerConfig import get_logger
 
 logger = get_logger(__name__)
 
+FINGERPRINT_DEPTH = 3
+NODE_FINGERPRINT_ATTRIBUTES = ('Name', 'Address', 'SubnetMask', 'RouterAddress')
+CHANGE_LOG_SIZE = 32
+
+class HardwareInventory:
+	"""
+	Flat, classified index of every device item in the project, filled by a single traversal.
+
+	Attributes:
+		items (list): All the device items in traversal order, stations not included.
+		stations (list): All the stations (devices) in traversal order.
+		records (dict): Maps each device item to a dict with its 'parent', 'station', 'classification' and 'services'.
+		station_items (dict): Maps each station to the list of its device items.
+		classification_index (dict): Maps a classification (e.g. 'CPU') to the list of device items with that classification.
+		service_index (dict): Maps a service name (e.g. 'NetworkInterface') to the list of device items exposing it.
+		fingerprints (dict): Maps each station to its fingerprint (names, type identifiers and child counts of the top levels).
+		group_fingerprints (dict): Maps each device group to its fingerprint (its direct stations and sub groups).
+		station_zones (dict): Maps each station to its zone, the name of its top-level device group (None if ungrouped).
+	"""
+
+	def __init__(self):
+		self.items = []
+		self.stations = []
+		self.records = {}
+		self.station_items = {}
+		self.classification_index = {}
+		self.service_index = {}
+		self.fingerprints = {}
+		self.group_fingerprints = {}
+		self.station_zones = {}
+
+
+	def __len__(self):
+		return len(self.items)
+
+
+	def __contains__(self, item):
+		return item in self.records
+
+
+	def add_station(self, station, fingerprint=None):
+		self.stations.append(station)
+		self.station_items[station] = []
+		self.fingerprints[station] = fingerprint
+
+
+	def add_item(self, item, parent, station, classification, services):
+		"""
+		Adds a device item to the inventory and updates all the indexes.
+
+		Args:
+			item (DeviceItem): The device item to add.
+			parent (object): The parent of the device item (station or device item).
+			station (Device): The station the device item belongs to.
+			classification (str): The classification of the device item (e.g. 'CPU', 'None').
+			services (dict): Maps the service name to the service handle for each service the item exposes.
+		"""
+		self.items.append(item)
+		self.records[item] = {
+			'parent': parent,
+			'station': station,
+			'classification': classification,
+			'services': services
+		}
+		self.station_items[station].append(item)
+		self.classification_index.setdefault(classification, []).append(item)
+		for service_name in services:
+			self.service_index.setdefault(service_name, []).append(item)
+
+
+	def by_classification(self, classification):
+		return self.classification_index.get(classification, [])
+
+
+	def by_service(self, service_name):
+		return self.service_index.get(service_name, [])
+
+
+	def get_station(self, item):
+		record = self.records.get(item)
+		return record['station'] if record else None
+
+
+	def get_zone(self, item):
+		return self.station_zones.get(self.get_station(item))
+
+
+	def get_parent(self, item):
+		record = self.records.get(item)
+		return record['parent'] if record else None
+
+
+	def get_service(self, item, service_name):
+		record = self.records.get(item)
+		return record['services'].get(service_name) if record else None
+
+
+	def get_station_records(self, station):
+		"""
+		Returns the device items of a station in the form 'Hardware.crawl_station' returns them, to reuse them in a refresh.
+		"""
+		return [
+			(item, self.records[item]['parent'], self.records[item]['classification'], self.records[item]['services'])
+			for item in self.station_items.get(station, [])
+		]
+
+
 class Hardware:
 	"""
 	Represents the logic behind hardware components in a project.
@@ -28,70 +129,357 @@ class Hardware:
 		self.myproject = project.myproject
 		self.myinterface = project.myinterface
 
+		self.inventory = None
+		self.inventory_version = 0
+		self.change_log = []
 		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
 
 
-	def give_items(self, device, items=[], initial_call=True):
+	def get_core_classes(self):
+		self.services = self.project.services
+		self.scheduler = self.project.scheduler
+		self.attributes = self.project.attributes
+		self.classification = self.project.classification
+
+
+	def get_item_services(self, deviceitem, classification):
 		"""
-		Recursively retrieves all the items from a device and its sub-devices.
+		Resolves the services a device item exposes through the shared service resolver.
+		The software container is only resolved for CPU's.
 
 		Args:
-			device (Device): The device to retrieve items from.
-			Items (list, optional): The list to store the retrieved items. Defaults to an empty list.
+			deviceitem (DeviceItem): The device item to resolve the services of.
+			classification (str): The classification of the device item.
 
 		Returns:
-			list: The list of retrieved items.
+			dict: Maps the service name to the service handle of each service that the item exposes.
 		"""
-		logger.debug(f"Retrieving all items recursively from the project starting with device: '{device.Name}'") if initial_call else None
-		for item in device.DeviceItems:
-			items.append(item)
-			items = self.give_items(item, items, initial_call=False)
-		return items
+		services = {}
+		network_service = self.services.get_network_interface(deviceitem)
+		if network_service is not None:
+			services['NetworkInterface'] = network_service
+
+		if classification == 'CPU':
+			software_container = self.services.get_software_container(deviceitem)
+			if software_container is not None:
+				services['SoftwareContainer'] = software_container
+		return services
 
 
-	def get_devices(self, group, items=[], initial_call=True):
+	def crawl_station(self, station):
 		"""
-		Retrieves all the devices from a group and its sub-groups.
+		Collects all the (nested) device items of a station, without recursion.
+		Only reads from the project, so stations can be crawled concurrently.
 
 		Args:
-			group (Group): The group to retrieve devices from.
-			Items (list, optional): The list to store the retrieved devices. Defaults to an empty list.
+			station (Device): The station to crawl.
 
 		Returns:
-			list: The list of retrieved devices.
+			list: A (deviceitem, parent, classification, services) tuple per device item, in traversal order.
 		"""
-		logger.debug(f"Retrieving all devices recursively from the project starting at group: '{group.Name}'") if initial_call else None
+		records = []
+		visited = set()
 
-		for device in group.Devices:
-			items = self.give_items(device, items, initial_call=False)
-		return items
-	
+		# depth-first, the reversed order on the stack keeps the order of the compositions
+		stack = [(deviceitem, station) for deviceitem in reversed(list(station.DeviceItems))]
+		while stack:
+			deviceitem, parent = stack.pop()
+			if deviceitem in visited:
+				continue
+			visited.add(deviceitem)
 
-	def get_groups(self, group_composition, items=[]):
+			classification = str(deviceitem.Classification)
+			services = self.get_item_services(deviceitem, classification)
+			records.append((deviceitem, parent, classification, services))
+			stack.extend((child, deviceitem) for child in reversed(list(deviceitem.DeviceItems)))
+		return records
+
+
+	def get_station_fingerprint(self, station):
 		"""
-		Retrieves all the groups and devices from a group composition.
+		Makes the fingerprint of a station: the name, type identifier and amount of children of the device items
+		in the first FINGERPRINT_DEPTH levels, with the network fingerprint of the items that have a network interface.
+		A station with an unchanged fingerprint is not crawled again in a refresh.
 
 		Args:
-			group_composition (list): The list of group compositions.
-			Items (list, optional): The list to store the retrieved groups and devices. Defaults to an empty list.
+			station (Device): The station.
 
 		Returns:
-			list: The list of retrieved groups and devices.
+			tuple: The fingerprint of the station.
 		"""
+		level = list(station.DeviceItems)
+		fingerprint = [(station.Name, len(level))]
+		for depth in range(FINGERPRINT_DEPTH):
+			next_level = []
+			for deviceitem in level:
+				row = self.attributes.read_object(deviceitem, ('Name', 'TypeIdentifier'))
+				children = list(deviceitem.DeviceItems) if depth < FINGERPRINT_DEPTH - 1 else []
+				fingerprint.append((row['Name'], row['TypeIdentifier'], len(children), self.get_network_fingerprint(deviceitem)))
+				next_level.extend(children)
+			level = next_level
+		return tuple(fingerprint)
+
+
+	def get_network_fingerprint(self, deviceitem):
+		"""
+		Makes the fingerprint of the network interface of a device item: the addresses of its nodes and, per port,
+		the cable length and the ports it is connected to. So address and wiring edits mark the station as changed.
 
-		logger.debug(f"Retrieving all groups and their devices from group composition")
-		for group in group_composition:
-			items = self.get_devices(group, items)
-			items = self.get_groups(group.Groups, items)
-		return items
+		Args:
+			deviceitem (DeviceItem): The device item.
+
+		Returns:
+			tuple: The fingerprint of the interface, empty if the item does not have a network interface.
+		"""
+		network_service = self.services.get_network_interface(deviceitem)
+		if network_service is None:
+			return ()
+
+		nodes = tuple(
+			tuple(str(value) for value in self.attributes.read_object(node, NODE_FINGERPRINT_ATTRIBUTES).values())
+			for node in network_service.Nodes
+		)
+		ports = []
+		for port in network_service.Ports:
+			row = self.attributes.read_object(port, ('Name', 'CableLength'))
+			ports.append((str(row['Name']), str(row['CableLength']), tuple(port.ConnectedPorts)))
+		return nodes, tuple(ports)
+
+
+	def crawl_group(self, group):
+		"""
+		Collects the stations of a device group and its nested groups, without recursion.
+
+		Args:
+			group (DeviceGroup): The device group, the project itself or the ungrouped devices group.
+
+		Returns:
+			tuple: The stations of the group in traversal order, and a dict with the fingerprint of every (nested) group.
+		"""
+		stations = []
+		group_fingerprints = {}
+		stack = [group]
+		while stack:
+			group = stack.pop()
+			if group in group_fingerprints:
+				continue
+
+			devices = list(group.Devices)
+			sub_groups = list(group.Groups) if hasattr(group, 'Groups') else []
+			group_fingerprints[group] = (tuple(devices), tuple(sub_groups))
+
+			stations.extend(devices)
+			stack.extend(reversed(sub_groups))
+		return stations, group_fingerprints
+
+
+	def get_stations(self, group_fingerprints=None, station_zones=None):
+		"""
+		Retrieves all the stations of the project: the ungrouped ones and the ones in (nested) device groups.
+		The top-level groups are crawled on the worker pool, every station is returned once.
+
+		Args:
+			group_fingerprints (dict, optional): Gets filled with the fingerprint of every device group.
+			station_zones (dict, optional): Gets filled with the zone of every station, the name of its top-level device group
+				(None for the ungrouped stations).
+
+		Returns:
+			list: The list of stations in traversal order.
+		"""
+		device_groups = list(self.myproject.DeviceGroups)
+		groups = device_groups + [self.myproject.UngroupedDevicesGroup, self.myproject]
+		zones = [group.Name for group in device_groups] + [None, None]
+
+		stations = []
+		visited_stations = set()
+		for zone, (group_stations, fingerprints) in zip(zones, self.scheduler.map(self.crawl_group, groups)):
+			if group_fingerprints is not None:
+				group_fingerprints.update(fingerprints)
+			for station in group_stations:
+				if station not in visited_stations:
+					visited_stations.add(station)
+					stations.append(station)
+					if station_zones is not None:
+						station_zones[station] = zone
+		return stations
+
+
+	def scan_station(self, station):
+		return self.get_station_fingerprint(station), self.crawl_station(station)
+
+
+	def get_inventory(self, reload=False, refresh=False):
+		"""
+		Builds the hardware inventory of the project in a single pass: each device item is visited exactly once,
+		its parent, station, classification and services are recorded so later lookups do not need a re-scan.
+		The stations are crawled on the worker pool of the scheduler, the order of the inventory does not depend on it.
+
+		A reload rebuilds the whole inventory. A refresh only crawls the stations whose fingerprint changed again,
+		see 'refresh_inventory'.
+
+		Args:
+			reload (bool, optional): Rebuilds the inventory. Defaults to False.
+			refresh (bool, optional): Refreshes the existing inventory instead of rebuilding it. Defaults to False.
+
+		Returns:
+			HardwareInventory: The classified inventory of the project.
+		"""
+		if self.inventory is not None and not reload and not refresh:
+			logger.debug(f"Returning cached hardware inventory of the project: '{len(self.inventory)}' items...")
+			return self.inventory
+
+		if self.inventory is not None and not reload:
+			return self.refresh_inventory()
+
+		logger.debug(
+			f"Building the hardware inventory of the project: "
+			f"reload: '{reload}', "
+			f"refresh: '{refresh}'"
+		)
+		# the project can have changed, the cached services may belong to deleted or replaced items
+		self.services.invalidate()
+
+		# the stations are crawled concurrently, the inventory is filled afterwards in station order
+		group_fingerprints = {}
+		station_zones = {}
+		stations = self.get_stations(group_fingerprints, station_zones)
+		scans = self.scheduler.map(self.scan_station, stations)
+
+		inventory = HardwareInventory()
+		inventory.group_fingerprints = group_fingerprints
+		inventory.station_zones = station_zones
+		for station, (fingerprint, records) in zip(stations, scans):
+			self.add_station_records(inventory, station, fingerprint, records)
+
+		self.set_inventory(inventory, None)
+		logger.debug(
+			f"Returning hardware inventory {type(inventory)}: "
+			f"stations: '{len(inventory.stations)}', "
+			f"items: '{len(inventory)}', "
+			f"classifications: {list(inventory.classification_index.keys())}"
+		)
+		return inventory
+
+
+	def refresh_inventory(self):
+		"""
+		Refreshes the inventory by diffing the fingerprints of the stations against the previous inventory.
+		Only the added stations and the stations with a changed fingerprint are crawled again,
+		the device items of the other stations are taken over from the previous inventory.
+
+		Changes below the first FINGERPRINT_DEPTH levels and attributes that are not in the fingerprints (e.g. the firmware)
+		are not detected, a reload rebuilds the inventory for those.
+
+		Returns:
+			HardwareInventory: The refreshed inventory, the change set is available through 'get_changes'.
+		"""
+		previous = self.inventory
+		group_fingerprints = {}
+		station_zones = {}
+		stations = self.get_stations(group_fingerprints, station_zones)
+		fingerprints = self.scheduler.map(self.get_station_fingerprint, stations)
+
+		current = set(stations)
+		added = [station for station in stations if station not in previous.station_items]
+		changed = [
+			station for station, fingerprint in zip(stations, fingerprints)
+			if station in previous.station_items and previous.fingerprints.get(station) != fingerprint
+		]
+		removed = [station for station in previous.stations if station not in current]
+		groups = [
+			group for group, fingerprint in group_fingerprints.items()
+			if previous.group_fingerprints.get(group) != fingerprint
+		]
+		groups.extend(group for group in previous.group_fingerprints if group not in group_fingerprints)
+
+		logger.debug(
+			f"Refreshing the hardware inventory of the project: "
+			f"stations: '{len(stations)}', "
+			f"added: '{len(added)}', "
+			f"changed: '{len(changed)}', "
+			f"removed: '{len(removed)}', "
+			f"changed groups: '{len(groups)}'"
+		)
+
+		# the services of the items of changed and removed stations can belong to deleted or replaced items
+		self.services.invalidate_many(item for station in changed + removed for item in previous.station_items[station])
+		dirty = added + changed
+		crawled = dict(zip(dirty, self.scheduler.map(self.crawl_station, dirty)))
+
+		inventory = HardwareInventory()
+		inventory.group_fingerprints = group_fingerprints
+		inventory.station_zones = station_zones
+		for station, fingerprint in zip(stations, fingerprints):
+			records = crawled[station] if station in crawled else previous.get_station_records(station)
+			self.add_station_records(inventory, station, fingerprint, records)
+
+		changes = {
+			'added': added,
+			'changed': changed,
+			'removed': removed,
+			'groups': groups
+		}
+		self.set_inventory(inventory, changes)
+		logger.debug(
+			f"Returning refreshed hardware inventory {type(inventory)}: "
+			f"stations: '{len(inventory.stations)}', "
+			f"items: '{len(inventory)}'"
+		)
+		return inventory
 
 
-	def get_interface_devices(self, projectItems, reload=False, items=None):
+	def add_station_records(self, inventory, station, fingerprint, records):
+		inventory.add_station(station, fingerprint)
+		for deviceitem, parent, classification, services in records:
+			if deviceitem not in inventory:
+				inventory.add_item(deviceitem, parent, station, classification, services)
+
+
+	def set_inventory(self, inventory, changes):
+		"""
+		Stores a new inventory and logs its change set, None for a full rebuild.
+		"""
+		self.inventory = inventory
+		self.inventory_version += 1
+		self.change_log.append((self.inventory_version, changes))
+		del self.change_log[:-CHANGE_LOG_SIZE]
+
+		# the derived lists belong to the previous inventory, they get re-derived on the next call
+		for derived in ('items', 'plc_items', 'interface_items'):
+			self.__dict__.pop(derived, None)
+
+
+	def get_changes(self, since_version):
+		"""
+		Retrieves the stations that changed since an earlier version of the inventory, so downstream caches
+		(node list, graph, ...) can be updated instead of rebuilt.
+
+		Args:
+			since_version (int): The inventory version the downstream cache was built from.
+
+		Returns:
+			set: The stations that were added, changed or removed since that version.
+				None if the changes are unknown (full rebuild in between or version too old), the cache has to be rebuilt.
+		"""
+		if since_version is None or since_version < self.inventory_version - len(self.change_log):
+			return None
+
+		stations = set()
+		for version, changes in self.change_log:
+			if version <= since_version:
+				continue
+			if changes is None:
+				return None
+			stations.update(changes['added'], changes['changed'], changes['removed'])
+		return stations
+
+
+	def get_interface_devices(self, projectItems=None, reload=False, items=None):
 		"""
 		Retrieves all the devices with an interface service.
 
 		Args:
-			projectItems (list): The list of project items.
+			projectItems (list, optional): The list of project items to filter, defaults to all the items in the inventory.
 			Items (list, optional): The list to store the retrieved devices. Defaults to None.
 
 		Returns:
@@ -101,24 +489,24 @@ class Hardware:
 			logger.debug(f"Returning cached list {type(self.interface_items)} of all the interface devices in the project: '{len(self.interface_items)}'...")
 			return self.interface_items
 
+		inventory = self.get_inventory(reload=reload)
 		logger.debug(
-			f"Filtering for interface-devices out of all the '{len(projectItems)}' project items: "
+			f"Filtering for interface-devices out of all the '{len(inventory)}' project items: "
 			f"reload: '{reload}'"
 		)
 
 		if items is None:
 			items = []
 
-		for deviceitem in projectItems:
-			network_service = tia.IEngineeringServiceProvider(deviceitem).GetService[hwf.NetworkInterface]()
-			if isinstance(network_service, hwf.NetworkInterface):
-				items.append(deviceitem)
+		if projectItems is None:
+			items.extend(inventory.by_service('NetworkInterface'))
+		else:
+			items.extend(item for item in projectItems if inventory.get_service(item, 'NetworkInterface') is not None)
 
 		self.interface_items = items
 		logger.debug(
 			f"Returning filtered list {type(items)} of all the interface devices out of the project-items: "
-			f"amount of interface devices: '{len(items)}', "
-			f"object type:  '{items[0].GetType()}'"
+			f"amount of interface devices: '{len(items)}'"
 		)
 		return items
 
@@ -139,13 +527,7 @@ class Hardware:
 			f"reload: '{reload}'"
 		)
 
-		items = []
-		items.extend(self.get_devices(self.myproject))
-		items.extend(self.get_devices(self.myproject.UngroupedDevicesGroup))
-		items.extend(self.get_groups(self.myproject.DeviceGroups))
-
-		# Removes all the duplicates
-		items = list(set(items))
+		items = list(self.get_inventory(reload=reload).items)
 		self.items = items
 		logger.debug(f"Returning combined list {type(items)} of all the items in the project: '{len(items)}'")
 		return items
@@ -165,21 +547,46 @@ class Hardware:
 			logger.debug(f"Returning cached list {type(self.plc_items)} of all the PLC devices in the project: '{len(self.plc_items)}'...")
 			return self.plc_items
 
-		projectItems = self.GetAllItems(reload=reload)
+		inventory = self.get_inventory(reload=reload)
 		logger.debug(
-			f"Filtering for PLC-devices out of all '{len(projectItems)}' the project items: "
+			f"Filtering for PLC-devices out of all '{len(inventory)}' the project items: "
 			f"reload: '{reload}'"
 		)
 		if items is None:
 			items = []
-		for deviceitem in projectItems:
-			if str(deviceitem.Classification) == 'CPU':
-				items.append(deviceitem)
+		items.extend(inventory.by_classification('CPU'))
 		
 		self.plc_items = items
 		logger.debug(
 			f"Returning filtered list {type(items)} of all the PLC devices out of the project-items: "
-			f"amount of PLC-items: '{len(items)}', "
-			f"object type: '{items[0].GetType()}'"
+			f"amount of PLC-items: '{len(items)}'"
 		)
-		return items
\ No newline at end of file
+		return items
+
+
+	def get_station(self, deviceitem):
+		"""
+		Retrieves the station (device) a device item belongs to, without walking up the .Parent chain.
+
+		Args:
+			deviceitem (DeviceItem): The device item.
+
+		Returns:
+			Device: The station of the device item, or None if the item is not in the inventory.
+		"""
+		return self.get_inventory().get_station(deviceitem)
+
+
+	def get_items_by_device_type(self, device_type, reload=False):
+		"""
+		Retrieves the device items of a device type (e.g. 'PLC', 'scalance', 'drive'), see 'core.classification'.
+
+		Args:
+			device_type (str): The device type.
+
+		Returns:
+			list: The device items of that type, in inventory order.
+		"""
+		table = self.classification.get_inventory_types(reload=reload)
+		items = self.get_inventory().items
+		return [items[index] for index in table.index[table['DeviceType'] == device_type]]
@@ -0,0 +1,160 @@
+"""
+Hardware bill-of-materials and firmware analytics.
+
+The TypeIdentifier, order number, firmware version, station and zone of every device item are extracted once into a
+columnar table (see 'Attributes.get_device_item_table'), the reports are groupby's and vectorised comparisons on that
+table instead of iterations over the live project objects.
+"""
+
+import pandas as pd
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+FIRMWARE_PATTERN = r'(\d+)(?:\.(\d+))?(?:\.(\d+))?'
+
+def firmware_key(versions):
+	"""
+	Converts firmware versions ('V2.6', 'V4.1.2', ...) to comparable integers, missing parts count as 0.
+
+	Args:
+		versions (pandas.Series | str): The firmware versions.
+
+	Returns:
+		pandas.Series | int: major * 1e6 + minor * 1e3 + patch, -1 for an empty or unreadable version.
+	"""
+	if isinstance(versions, str):
+		return int(firmware_key(pd.Series([versions])).iloc[0])
+
+	parts = versions.fillna('').astype(str).str.extract(FIRMWARE_PATTERN)
+	numbers = parts.apply(pd.to_numeric, errors='coerce')
+	key = numbers[0] * 1000000 + numbers[1].fillna(0) * 1000 + numbers[2].fillna(0)
+	return key.fillna(-1).astype('int64')
+
+
+class HardwareAnalytics:
+	"""
+	Answers bill-of-materials, zone and firmware queries from a columnar hardware table.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_core_classes(self):
+		self.hardware = self.project.hardware
+		self.classification = self.project.classification
+
+
+	def get_table(self, reload=False):
+		"""
+		Retrieves the columnar hardware table, built once per version of the hardware inventory.
+
+		Returns:
+			pandas.DataFrame: A row per device item with its zone, station, device type, station type and the numeric 'FirmwareKey'.
+		"""
+		if hasattr(self, 'table') and not reload and self.table_version == self.hardware.inventory_version:
+			logger.debug(f"Returning cached hardware table: '{len(self.table)}' rows...")
+			return self.table
+
+		table = self.classification.get_inventory_types(reload=reload).copy()
+		inventory = self.hardware.get_inventory()
+		table.insert(0, 'Zone', [inventory.get_zone(item) for item in inventory.items])
+		# the type of a station is the type of its first item (the rack), e.g. the GSD identifier of a drive
+		table['StationType'] = table.groupby('Station', sort=False)['DeviceType'].transform('first')
+		table['FirmwareKey'] = firmware_key(table['FirmwareVersion'])
+
+		self.table = table
+		self.table_version = self.hardware.inventory_version
+		logger.debug(
+			f"Returning hardware table {type(table)}: "
+			f"total entries: '{len(table)}', "
+			f"columns: {list(table.columns)}"
+		)
+		return table
+
+
+	def get_hardware_items(self, reload=False):
+		"""
+		Returns the rows of the hardware table that are orderable hardware (items with an order number).
+		"""
+		table = self.get_table(reload=reload)
+		return table[table['OrderNumber'].fillna('').astype(str) != '']
+
+
+	def get_bom(self, by=None, reload=False):
+		"""
+		Counts the hardware per order number (bill of materials).
+
+		Args:
+			by (list, optional): Extra columns to break the counts down by, e.g. ['Zone'] or ['Station'].
+
+		Returns:
+			pandas.DataFrame: The columns of 'by', OrderNumber, TypeIdentifier, DeviceType and Count, the largest counts first.
+		"""
+		by = list(by or [])
+		items = self.get_hardware_items(reload=reload)
+		bom = (
+			items.groupby(by + ['OrderNumber', 'TypeIdentifier', 'DeviceType'], dropna=False)
+			.size()
+			.reset_index(name='Count')
+			.sort_values(by + ['Count'], ascending=[True] * len(by) + [False], kind='stable')
+			.reset_index(drop=True)
+		)
+		logger.debug(f"Returning bill of materials by {by + ['OrderNumber']}: '{len(bom)}' rows")
+		return bom
+
+
+	def get_zone_breakdown(self, column='DeviceType', reload=False):
+		"""
+		Counts the hardware per zone.
+
+		Args:
+			column (str, optional): The column to count in the zones, e.g. 'DeviceType' or 'OrderNumber'. Defaults to 'DeviceType'.
+
+		Returns:
+			pandas.DataFrame: A row per zone ('Ungrouped' for the ungrouped stations), a column per value and a 'Total' column.
+		"""
+		items = self.get_hardware_items(reload=reload)
+		zones = items['Zone'].fillna('Ungrouped')
+		breakdown = pd.crosstab(zones, items[column].fillna(''), rownames=['Zone'], colnames=[column])
+		breakdown['Total'] = breakdown.sum(axis=1)
+		return breakdown
+
+
+	def get_firmware_older_than(self, version, order_number=None, device_type=None, station_type=None, reload=False):
+		"""
+		Retrieves the hardware with a firmware version older than the given version.
+
+		Args:
+			version (str): The minimum firmware version, e.g. 'V4.2'.
+			order_number (str, optional): Only check the items with an order number starting with this value.
+			device_type (str, optional): Only check the items of this device type, e.g. 'module'.
+			station_type (str, optional): Only check the items in stations of this type, e.g. 'drive'.
+
+		Returns:
+			pandas.DataFrame: The zone, station, name, order number, firmware version, device type and station type of the outdated items.
+		"""
+		items = self.get_hardware_items(reload=reload)
+		mask = (items['FirmwareKey'] >= 0) & (items['FirmwareKey'] < firmware_key(version))
+		if order_number is not None:
+			mask &= items['OrderNumber'].astype(str).str.startswith(order_number)
+		if device_type is not None:
+			mask &= items['DeviceType'] == device_type
+		if station_type is not None:
+			mask &= items['StationType'] == station_type
+
+		outdated = items.loc[mask, ['Zone', 'Station', 'Name', 'OrderNumber', 'FirmwareVersion', 'DeviceType', 'StationType']].reset_index(drop=True)
+		logger.debug(
+			f"Returning hardware with firmware older than '{version}': "
+			f"order number: '{order_number}', "
+			f"device type: '{device_type}', "
+			f"station type: '{station_type}', "
+			f"total entries: '{len(outdated)}'"
+		)
+		return outdated
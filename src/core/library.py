@@ -5,18 +5,42 @@ created on: 01/08/2024
 """
 
 import os
+import numpy as np
 import pandas as pd
 import traceback
 import datetime
 import xmltodict
 import pprint
 import xml.etree.ElementTree as ET
-import Siemens.Engineering as tia # Copy the Siemens.Engineering.dll to the folder of the script (current working dir.)!!
 
+from core.attributes import TYPE_ATTRIBUTES
+from core.backend import tia
+from utils.dependencyGraph import DependencyGraph
 from utils.loggerConfig import get_logger
+from utils.tableBuilder import TableBuilder
+from utils.usageMatrix import UsageMatrix
+from utils.versionIndex import VersionIndex
 
 logger = get_logger(__name__)
 
+LIBRARY_COLUMNS = ['Project', 'Folder', 'Name', 'Version', 'ModifiedDate', 'Author', 'LibraryState', 'Dependents', 'InstanceCount', 'VersionCount', 'TypeComment', 'VersionComment', 'ReferenceObject']
+PROJECT_TYPE_COLUMNS = ['Project', 'PLC', 'Folder', 'Name', 'Type', 'Number', 'IsConsistent', 'ModifiedDate', 'ReferenceObject']
+# columns of the extracted tables that are only shown when their setting is on, see 'get_view'
+DERIVED_COLUMNS = ['Path', 'Warning', 'VersionStatus']
+HIDDEN_COLUMNS = {
+	'library': [],
+	'used_lib_blocks': ['ReferenceObject', 'SafetyBlock', 'SystemType'],
+}
+
+
+def object_keys(table):
+	"""
+	Returns the identity of the blocks or types of a table: (PLC, Type, Name, Number), it stays the same over extractions.
+	"""
+	numbers = table['Number'].astype(object).where(table['Number'].notna(), None)
+	return list(zip(table['PLC'], table['Type'], table['Name'], numbers))
+
+
 # TODO: DOCSTRINGS & documentation & Export data
 class Library:
 	"""
@@ -46,33 +70,58 @@ class Library:
 		self.myproject = project.myproject
 		self.myinterface = project.myinterface
 
-		self.item_group_path = {}
+		# folder path trie: folder -> chain of folder names, item -> folders, see 'get_folders'
+		self.folder_chains = {}
+		self.chain_folders = {}
+		self.folder_paths = {}
+		self.item_folders = {}
 
 		self.library_types = None
 		self.library_df = None
-		self.library_df = None
+		self.version_index = None
 		self.library_info = None
 		self.system_lib_version = None
 
 		self.used_lib_blocks_df = None
-
-		self.project_blocks_df = None
+		self.instance_counts = None
+		self.instance_info = {}
+
+		# results of the previous extraction, reused for the objects that were not modified since (see 'validate_used_blocks'):
+		# (type name, version number) -> (modified date, version row), identity -> (modified date, library link)
+		# and identity -> ((modified date, library version modified date), conformance status)
+		self.version_records = {}
+		self.instance_records = {}
+		self.conformance_records = {}
+
+		# dependency graph of the library versions (a node per row of the library content), see 'get_dependency_graph'
+		self.dependency_graph = None
+		self.dependency_records = {}
+
+		# library instances per type x PLC x version, updated with the validated blocks, see 'get_usage_matrix'
+		self.usage_matrix = UsageMatrix()
+		self.usage_source = None
+
+		# per PLC name, the PLC's are extracted concurrently
+		self.project_blocks_df = {}
 		self.types_blocks_df = None
-		self.project_types_df = None
+		self.project_types_df = {}
 
-		self.df_path = pd.DataFrame(columns=['Name', 'Path'])
-		self.df_warning = pd.DataFrame(columns=['Name', 'Warning'])
+		# the tables are extracted with all the rows and derived columns, the settings only select from them
+		self.views = {}
+		self.version_status = None
 
 		self.folder_path = False
 		self.include_warning_column = False
 		self.include_safety_blocks = True
 		self.include_system_types = True
+		self.include_version_status = False
 
 		self.settings = {
 			'folder_path': False,
 			'warning_column': False,
 			'safety_blocks': True,
-			'system_types': True
+			'system_types': True,
+			'version_status': False
 		}
 
 		self.pp = pprint.PrettyPrinter(indent=2)
@@ -85,6 +134,9 @@ class Library:
 		self.hardware = self.project.hardware
 		self.blocks = self.project.blockdata
 		self.file = self.project.file
+		self.attributes = self.project.attributes
+		self.catalog = self.project.catalog
+		self.scheduler = self.project.scheduler
 
 	def get_core_functions(self):
 		logger.debug(f"Accessing 'get_software_container' from the software object '{self.project.software}'...")
@@ -95,49 +147,101 @@ class Library:
 			logger.debug(f"Accessing 'get_nwk_para' from the blocks object '{self.project.blockdata}'...")
 			self.system_lib_version = self.blocks.get_nwk_para('LSystemVarS7-1500', 'LVccLibVersion')
 
-	def get_map_structure(self, item, group_path=None, initial_call=True):
+	def get_folder_chain(self, folder):
 		"""
-		Recursively maps the structure of the item.
+		Returns the names of a folder and of all its parents, from the outermost parent to the folder.
+		Each folder is resolved once, the chain of a folder extends the (shared) chain of its parent.
 
 		Args:
-			item (object): The item to map the structure of.
-			groups (list, optional): List of groups. Defaults to None.
+			folder (object): The folder, group or any other engineering object with a name.
 
 		Returns:
-			list: List of groups representing the structure.
+			tuple: The folder names, empty for an object without a name (the parent above the project).
 		"""
-		if initial_call:
-			if item.Name in self.item_group_path.keys(): # HAS TO BE IN initial_call, OTHERWISE IT RETURNS ON SECOND CALL
-				logger.debug(f"Item '{item.Name}' already mapped, returning cached content...")
-				return self.item_group_path[item.Name]
-		
-			logger.debug(
-				f"Mapping structure of item '{item.Name}': "
-				f"object type: '{item.GetType()}'"
-			) if initial_call else None
+		unresolved = []
+		while folder is not None and folder not in self.folder_chains:
+			try:
+				name = folder.GetAttribute('Name')
+				parent = folder.Parent
+			except Exception:
+				break
+			unresolved.append((folder, name))
+			folder = parent
+
+		chain = self.folder_chains.get(folder, ())
+		for folder, name in reversed(unresolved):
+			if name is not None:
+				chain = chain + (name,)
+			self.folder_chains[folder] = chain
+		return chain
+
+
+	def get_folders(self, item):
+		"""
+		Returns the folders of an item (a block, type or library type), from the outermost folder to the folder of the item.
+		A folder name that occurs again closer to the item is only kept at the closest place.
+		The folders of the blocks in the catalog come from its block tree, the other items climb the folder chain.
 
-			item_name = item.Name
+		Returns:
+			tuple: The folder names, shared by all the items with the same folders.
+		"""
+		folders = self.item_folders.get(item)
+		if folders is not None:
+			return folders
+
+		location = self.catalog.locate_block(item)
+		if location is not None:
+			plc_name, block_path = location
+			chain = self.get_folder_chain(self.catalog.get_block_group(plc_name).Parent) + tuple(block_path)
+		else:
+			try:
+				chain = self.get_folder_chain(item.Parent)
+			except Exception:
+				chain = ()
+
+		folders = self.chain_folders.get(chain)
+		if folders is None:
+			unique = []
+			for name in reversed(chain):
+				if name not in unique:
+					unique.append(name)
+			folders = self.chain_folders.setdefault(chain, tuple(reversed(unique)))
+		self.item_folders[item] = folders
+		return folders
+
+
+	def get_path(self, item):
+		"""
+		Returns the folder path of an item, e.g. 'Project/Station/PLC_1/Program blocks/Conveyors'.
+		"""
+		folders = self.get_folders(item)
+		path = self.folder_paths.get(folders)
+		if path is None:
+			path = self.folder_paths.setdefault(folders, '/'.join(folders))
+		return path
 
-		if group_path is None:
-			group_path = []
 
-		try:
-			folder = item.Parent.GetAttribute('Name')
-			item = item.Parent
-			if folder is not None and folder not in group_path:
-				group_path.append(folder)
-			self.get_map_structure(item, group_path, initial_call=False)
-		except:
-			pass
-		
-		if initial_call:
-			self.item_group_path[item_name] = group_path
-			logger.debug(
-				f"Structure mapped: "
-				f"item: {item_name}, "
-				f"path: {group_path}"
-			)
-		return group_path
+	def get_map_structure(self, item):
+		"""
+		Maps the structure of the item.
+
+		Args:
+			item (object): The item to map the structure of.
+
+		Returns:
+			list: The folders of the item, from the folder that holds the item to the outermost folder.
+		"""
+		return list(reversed(self.get_folders(item)))
+
+
+	def clear_paths(self):
+		"""
+		Forgets the resolved folders, e.g. after the folders of the project were changed.
+		"""
+		self.folder_chains = {}
+		self.chain_folders = {}
+		self.folder_paths = {}
+		self.item_folders = {}
 
 
 	def get_library_types(self, group, types=None, reload=False, initial_call=True):
@@ -169,10 +273,103 @@ class Library:
 		return types
 
 
+	def get_instance_info(self, plc, reload=False):
+		"""
+		Resolves the library type version of every block and type of a PLC, one 'LibraryTypeInstanceInfo' service call per object.
+		An object that was not modified since the previous call keeps its previous library type version.
+		The blocks and types come from the catalog and 'get_project_types_df', refreshed by the caller ('get_instance_counts').
+
+		Args:
+			plc (object): The PLC.
+
+		Returns:
+			pandas.DataFrame: A row per library instance with the PLC, Name, LibraryType, LibraryVersion and ReferenceObject.
+		"""
+		if plc.Name in self.instance_info and not reload:
+			logger.debug(f"Library instances of '{plc.Name}' resolved earlier, returning cached content...")
+			return self.instance_info[plc.Name]
+
+		library_service = tia.Library.Types.LibraryTypeInstanceInfo
+		software_container = self.software_container[plc.Name]
+		project_blocks = self.catalog.get_plc_table(plc.Name)
+		project_types = self.get_project_types_df(software_container.TypeGroup, plc)
+		project_objects = list(project_blocks['ReferenceObject']) + list(project_types['ReferenceObject'])
+		keys = object_keys(project_blocks) + object_keys(project_types)
+		dates = list(project_blocks['ModifiedDate']) + list(project_types['ModifiedDate'])
+
+		previous_records = self.instance_records.get(plc.Name, {})
+		records = {}
+		resolved = 0
+		rows = {'PLC': [], 'Name': [], 'LibraryType': [], 'LibraryVersion': [], 'ReferenceObject': []}
+		for project_object, key, date in zip(project_objects, keys, dates):
+			record = previous_records.get(key)
+			if record is None or record[0] != date:
+				try:
+					instance_info = project_object.GetService[library_service]()
+				except Exception:
+					instance_info = None
+				link = None
+				if isinstance(instance_info, library_service):
+					version = instance_info.LibraryTypeVersion
+					link = (version.TypeObject.Name, version.VersionNumber)
+				record = (date, link)
+				resolved += 1
+			records[key] = record
+			if record[1] is None:
+				continue
+			rows['PLC'].append(plc.Name)
+			rows['Name'].append(key[2])
+			rows['LibraryType'].append(record[1][0])
+			rows['LibraryVersion'].append(record[1][1])
+			rows['ReferenceObject'].append(project_object)
+
+		instance_info = pd.DataFrame(rows)
+		self.instance_records[plc.Name] = records
+		self.instance_info[plc.Name] = instance_info
+		logger.debug(
+			f"Resolved library instances of '{plc.Name}': "
+			f"project objects: '{len(project_objects)}', "
+			f"resolved again: '{resolved}', "
+			f"library instances: '{len(instance_info)}'"
+		)
+		return instance_info
+
+
+	def get_instance_counts(self, reload=False):
+		"""
+		Counts the library instances in the project in one pass over the blocks and types of all the PLC's,
+		instead of a 'FindInstances' search per version per PLC.
+
+		Returns:
+			dict: Maps (library type name, version number, PLC name) to the amount of instances.
+		"""
+		if self.instance_counts is not None and not reload:
+			logger.debug('Library instances counted earlier, returning cached content...')
+			return self.instance_counts
+
+		# the blocks and types are refreshed once, the PLC's are resolved concurrently
+		self.get_types_blocks_df(reload=reload)
+		plc_instances = self.scheduler.map_plcs(lambda plc: self.get_instance_info(plc, reload=reload), self.plc_list)
+		frames = [frame for frame in plc_instances.values() if not frame.empty]
+
+		instance_counts = {}
+		if frames:
+			counts = pd.concat(frames, ignore_index=True).groupby(['LibraryType', 'LibraryVersion', 'PLC'], sort=False).size()
+			instance_counts = counts.to_dict()
+
+		self.instance_counts = instance_counts
+		logger.debug(
+			f"Returning library instance counts {type(instance_counts)}: "
+			f"total (type, version, plc) entries: '{len(instance_counts)}', "
+			f"total instances: '{sum(instance_counts.values())}'"
+		)
+		return instance_counts
+
+
 	def get_library_content(self, reload: bool=False):
 		if self.library_df is not None and not reload:
 			logger.debug('Library dataframe retrieved earlier, returning cached content...')
-			return self.library_df
+			return self.get_view('library')
 		
 		logger.debug(
 			f"Retrieving library data: "
@@ -181,11 +378,11 @@ class Library:
 
 		libraryType_folder = self.myproject.ProjectLibrary.TypeFolder
 		project_name = self.myproject.Name
-		library_content = pd.DataFrame()
+		library_content = TableBuilder(LIBRARY_COLUMNS + ['Path'])
 		
 		try:
+			# the PLC's, blocks and types (and their paths) are refreshed by 'get_instance_counts'
 			self.library_types = self.get_library_types(libraryType_folder, reload=reload)
-			self.plc_list = self.hardware.get_plc_devices(reload=reload)
 
 			logger.debug(
 				f"Making dataframe entry for each library type: "
@@ -198,6 +395,13 @@ class Library:
 			if self.library_types is None:
 				raise ValueError('No library types found')
 
+			# the instances are counted once for the whole project, summed over the PLC's per (type, version)
+			version_counts = {}
+			version_records = {}
+			resolved = 0
+			for (type_name, version_number, plc_name), count in self.get_instance_counts(reload=reload).items():
+				version_counts[(type_name, version_number)] = version_counts.get((type_name, version_number), 0) + count
+
 			for library_type in self.library_types:
 				folder = library_type.Parent.GetAttribute('Name')
 				type_comment = ''.join(s.Text for s in library_type.Comment.Items)
@@ -213,55 +417,53 @@ class Library:
 				)
 				
 				for version in type_versions:
-					version_comment = ''.join(s.Text for s in version.Comment.Items)
-					for plc in self.plc_list:
-						instance_count += version.FindInstances(self.software_container[plc.Name]).Count
+					version_number = version.VersionNumber
+					instance_count += version_counts.get((type_name, version_number), 0)
 					# convert date in every df to datetime object for later comparison in validate_used_blocks
 					date = version.ModifiedDate
 					version_modifiedDate = datetime.datetime(date.Year, date.Month, date.Day, date.Hour, date.Minute, date.Second).strftime('%d-%m-%Y %H:%M:%S')
-					version_author = version.Author
-					version_xDependents = version.Dependents.Count
-					library_state = str(version.State)
-
-					df_update = pd.DataFrame({
-						'Project':[project_name],
-						'Folder':[folder],
-						'Name':[type_name],
-						'Version':[version.VersionNumber],
-						'ModifiedDate':[version_modifiedDate],
-						'Author':[version_author],
-						'LibraryState':[library_state],
-						'Dependents':[version_xDependents],
-						'InstanceCount':[instance_count],
-						'VersionCount':[version_count],
-						'TypeComment':[type_comment],
-						'VersionComment':[version_comment],
-						'ReferenceObject':[version]
+
+					# a version that was not modified since the previous extraction keeps its author, state and comment
+					record = self.version_records.get((type_name, version_number))
+					if record is None or record[0] != version_modifiedDate:
+						record = (version_modifiedDate, {
+							'Author': version.Author,
+							'LibraryState': str(version.State),
+							'VersionComment': ''.join(s.Text for s in version.Comment.Items)
 						})
-					reversed_structure = self.get_map_structure(library_type)
-
-					if self.folder_path:
-						df_update['Path'] = '/'.join(reversed(reversed_structure))
-					library_content = pd.concat([library_content, df_update], ignore_index=True)
-					path = '/'.join(reversed(reversed_structure))
-					logger.debug(path)
-					
-					df_update = pd.DataFrame({
-						'Name' : [type_name],
-						'Path' : [path]
-					})
-
-					self.df_path = pd.concat([self.df_path, df_update], ignore_index=True)
+						resolved += 1
+					version_records[(type_name, version_number)] = record
+
+					row = {
+						'Project': project_name,
+						'Folder': folder,
+						'Name': type_name,
+						'Version': version_number,
+						'ModifiedDate': version_modifiedDate,
+						'Author': record[1]['Author'],
+						'LibraryState': record[1]['LibraryState'],
+						'Dependents': version.Dependents.Count,
+						'InstanceCount': instance_count,
+						'VersionCount': version_count,
+						'TypeComment': type_comment,
+						'VersionComment': record[1]['VersionComment'],
+						'ReferenceObject': version,
+						'Path': self.get_path(library_type)
+					}
+					library_content.append(row)
 		except Exception as e:
 			raise Exception(f'Failed to make library blocks dataframe: {str(e)}')
 		
-		self.library_df = library_content
+		self.version_records = version_records
+		self.library_df = library_content.to_frame()
+		self.version_index = VersionIndex(self.library_df['Name'], self.library_df['Version'])
 		logger.debug(
 			f"Returning library dataframe: {type(self.library_df)}, "
 			f"total entries: '{len(self.library_df)}', "
+			f"versions read again: '{resolved}', "
 			f"columns: {(self.library_df.columns)}"
 		)
-		return self.library_df
+		return self.get_view('library')
 
 
 	def get_project_types_df(self, group, plc, reload: bool=False):
@@ -275,19 +477,21 @@ class Library:
 		Returns:
 			object: The project types dataframe.
 		"""
-		if self.project_types_df is not None and not reload:
+		if plc.Name in self.project_types_df and not reload:
 			logger.debug('Project types and blocks dataframe retrieved earlier, returning cached content...')
-			return self.project_types_df
+			return self.project_types_df[plc.Name]
 
 		logger.debug(
 			f"Retrieving project types data: "
 			f"reload: '{reload}'"
 		)
 
-		project_types_df = pd.DataFrame()
+		project_types_df = TableBuilder(PROJECT_TYPE_COLUMNS + ['Path', 'SystemType'])
 
 		try:
-			project_types = self.software.get_software_types(group, include_system_types=self.include_system_types, reload=reload)
+			# the system types are always extracted and flagged, the 'system_types' setting filters them out of the view
+			project_types = self.software.get_software_types(group, include_system_types=True, reload=reload)
+			user_types = set(self.software.get_software_types(group, include_system_types=False, reload=reload))
 			project_name = self.myproject.Name
 
 			logger.debug(
@@ -297,14 +501,17 @@ class Library:
 				f"object type: '{project_types[0].GetType()}'"
 			)
 
-			for project_type in project_types:
-				date = project_type.ModifiedDate
+			# one bulk read per type instead of a round-trip per attribute
+			type_rows = self.attributes.read(project_types, TYPE_ATTRIBUTES)
+
+			for project_type, row in zip(project_types, type_rows):
+				date = row['ModifiedDate']
 				type_modifiedDate = datetime.datetime(date.Year, date.Month, date.Day, date.Hour, date.Minute, date.Second).strftime('%d-%m-%Y %H:%M:%S')
 				plc_name = plc.Name
 				folder = project_type.Parent.GetAttribute('Name')
-				type_name = project_type.Name
+				type_name = row['Name']
 				struc = project_type.ToString().split('.')[-1]
-				isConsistent = project_type.IsConsistent
+				isConsistent = row['IsConsistent']
 
 				logger.debug(
 					f"entry '{type_name}': "
@@ -312,44 +519,35 @@ class Library:
 					f"object type: '{project_type.ToString()}'"
 				)
 
-				try:
-					type_number = project_type.GetAttribute('Number')
-				except:
-					type_number = None
+				type_number = row['Number']
+				if type_number is None:
 					logger.debug(f"No type_number found for type '{type_name}' under '{folder}'")
 				
-				df_update = pd.DataFrame({
-						'Project':[project_name], 
-						'PLC':[plc_name], 
-						'Folder':[folder],
-						'Name':[type_name], 
-						'Type':[struc], 
-						'Number':[type_number],
-						'IsConsistent':[isConsistent],
-						'ModifiedDate':[type_modifiedDate],
-						'ReferenceObject':[project_type]
-						})
-				reversed_structure = self.get_map_structure(project_type)
-
-				if self.folder_path:
-					df_update['Path'] = '/'.join(reversed(reversed_structure))
-				project_types_df = pd.concat([project_types_df, df_update], ignore_index=True)
-
-				df_update = pd.DataFrame({
-					'Name' : [type_name],
-					'Path' : ['/'.join(reversed(reversed_structure))]
-				})
-				self.df_path = pd.concat([self.df_path, df_update], ignore_index=True)
+				row = {
+					'Project': project_name,
+					'PLC': plc_name,
+					'Folder': folder,
+					'Name': type_name,
+					'Type': struc,
+					'Number': type_number,
+					'IsConsistent': isConsistent,
+					'ModifiedDate': type_modifiedDate,
+					'ReferenceObject': project_type,
+					'Path': self.get_path(project_type),
+					'SystemType': project_type not in user_types
+				}
+				project_types_df.append(row)
 		except Exception as e:
 			raise Exception(f'Failed to make project types dataframe: {str(e)}')
 		
-		self.project_types_df = project_types_df
+		project_types_df = project_types_df.to_frame()
+		self.project_types_df[plc.Name] = project_types_df
 		logger.debug(
-			f"Returning project types dataframe {type(self.project_types_df)}: "
-			f"total entries: '{len(self.project_types_df)}', "
-			f"columns: {self.project_types_df.columns}"
+			f"Returning project types dataframe {type(project_types_df)}: "
+			f"total entries: '{len(project_types_df)}', "
+			f"columns: {project_types_df.columns}"
 		)
-		return self.project_types_df
+		return project_types_df
 
 
 	def get_project_blocks_df(self, group, plc, reload=False):
@@ -364,94 +562,57 @@ class Library:
 			tuple: Tuple containing the project blocks dataframe and instance DB.
 		"""
 
-		if self.project_blocks_df is not None and not reload:
+		if plc.Name in self.project_blocks_df and not reload:
 			logger.debug('Project blocks dataframe retrieved earlier, returning cached content...')
-			return self.project_blocks_df
+			return self.project_blocks_df[plc.Name]
 		
 		logger.debug(
 			f"Retrieving project blocks data: "
 			f"reload: '{reload}'"
 		)
 
-		project_blocks_df = pd.DataFrame()
-
 		try:
-			project_blocks = self.software.get_software_blocks(group, include_group=False, include_safety_blocks=self.include_safety_blocks)
+			# the blocks and their attributes come from the block catalog, read once per PLC (and refreshed by 'get_types_blocks_df')
+			# the safety blocks are always extracted and flagged, the 'safety_blocks' setting filters them out of the view
+			project_blocks = self.catalog.get_plc_table(plc.Name)
 
 			logger.debug(
 				f"Retrieved project blocks: ,"
 				f"plc: '{plc.Name}', "
-				f"total types: '{len(project_blocks)}', "
-				f"object type: '{project_blocks[0].GetType()}'"
+				f"total blocks: '{len(project_blocks)}'"
 			)
 			accepted_types = ['OB', 'FC', 'FB', 'GlobalDB', 'InstanceDB']
-			project_name = self.myproject.Name
-			
-			for block in project_blocks:
-				blockType = block.GetType().Name
-				
-				if blockType not in accepted_types:
-					logger.debug(f"Blocktype '{blockType}' of block '{block.Name}' not recognised, continuing...")
-					continue
-
-				blockNumber = block.Number
-				isConsistent = block.IsConsistent
-				date = block.ModifiedDate
-				block_modifiedDate = datetime.datetime(date.Year, date.Month, date.Day, date.Hour, date.Minute, date.Second).strftime('%d-%m-%Y %H:%M:%S')
-				folder = block.Parent.GetAttribute('Name')
-				plc_name = plc.Name
-
-				logger.debug(
-					f"entry '{block.Name}': "
-					f"plc: {plc_name}', "
-					f"object type: '{blockType}', "
-				)
-
-				try:
-					instanceOfNumber = block.GetAttribute('InstanceOfNumber')
-				except:
-					instanceOfNumber = 'NaN'
-					logger.debug(f"No instanceOfNumber found for block '{block.Name} - {block.GetType()}' under '{folder}'")
-				
-				if blockType in accepted_types:
-					df_update = pd.DataFrame({
-							'Project':[project_name],
-							'PLC':[plc_name], 
-							'Folder':[folder],
-							'Name':[block.Name], 
-							'Type':[blockType], 
-							'Number':[blockNumber],
-							'InstanceOfName':[getattr(block, 'InstanceOfName', 'NaN')], # if block has no instanceOfName, return 'NaN'
-							'InstanceOfNumber':[instanceOfNumber],
-							'IsConsistent':[isConsistent],
-							'ModifiedDate':[block_modifiedDate],
-							'ReferenceObject':[block] 
-							})
-				else:
-					raise ValueError('Blocktype not recognised')
-				
-				reversed_structure = self.get_map_structure(block)
-
-				if self.folder_path:
-					df_update['Path'] = '/'.join(reversed(reversed_structure))
-				project_blocks_df = pd.concat([project_blocks_df, df_update], ignore_index=True)
-
-				df_update = pd.DataFrame({
-					'Name' : [block.Name],
-					'Path' : ['/'.join(reversed(reversed_structure))]
-				})
-
-				self.df_path = pd.concat([self.df_path, df_update], ignore_index=True)
+			accepted = project_blocks['Type'].isin(accepted_types)
+			for block_name, block_type in project_blocks.loc[~accepted, ['Name', 'Type']].itertuples(index=False):
+				logger.debug(f"Blocktype '{block_type}' of block '{block_name}' not recognised, continuing...")
+			project_blocks = project_blocks[accepted]
+
+			project_blocks_df = pd.DataFrame({
+				'Project': self.myproject.Name,
+				'PLC': project_blocks['PLC'],
+				'Folder': project_blocks['Folder'],
+				'Name': project_blocks['Name'],
+				'Type': project_blocks['Type'],
+				'Number': project_blocks['Number'],
+				# if block has no instanceOfName/instanceOfNumber, return 'NaN'
+				'InstanceOfName': project_blocks['InstanceOfName'].where(project_blocks['InstanceOfName'].notna(), 'NaN'),
+				'InstanceOfNumber': project_blocks['InstanceOfNumber'].where(project_blocks['InstanceOfNumber'].notna(), 'NaN'),
+				'IsConsistent': project_blocks['IsConsistent'],
+				'ModifiedDate': project_blocks['ModifiedDate'].dt.strftime('%d-%m-%Y %H:%M:%S'),
+				'ReferenceObject': project_blocks['ReferenceObject'],
+				'SafetyBlock': project_blocks['System'].astype(bool),
+			}).reset_index(drop=True)
+			project_blocks_df.insert(len(project_blocks_df.columns) - 1, 'Path', [self.get_path(block) for block in project_blocks_df['ReferenceObject']])
 		except Exception as e:
 			raise Exception(f'Failed to retrieve project blocks dataframe: {str(e)}')
 		
-		self.project_blocks_df = project_blocks_df
+		self.project_blocks_df[plc.Name] = project_blocks_df
 		logger.debug(
-			f"Returning project blocks dataframe {type(self.project_blocks_df)}: "
-			f"total entries: '{len(self.project_blocks_df)}', "
-			f"columns: '{self.project_blocks_df.columns}'"
+			f"Returning project blocks dataframe {type(project_blocks_df)}: "
+			f"total entries: '{len(project_blocks_df)}', "
+			f"columns: '{project_blocks_df.columns}'"
 		)
-		return self.project_blocks_df
+		return project_blocks_df
 	
 
 	def get_types_blocks_df(self, reload=False):
@@ -461,25 +622,33 @@ class Library:
 				f"plc's: {[plc.Name for plc in self.plc_list]}, "
 				f"reload: '{reload}'"
 			)
-		types_blocks_df = pd.DataFrame()
 		self.plc_list = self.hardware.get_plc_devices(reload=reload)
-		try:
-			for plc in self.plc_list:
-				logger.debug(f"Handling plc: '{plc.Name}'...")
-				software_container = self.software_container[plc.Name]
-				location_projectBlocks = software_container.BlockGroup
-				location_datatypes = software_container.TypeGroup
-				
-				project_blocks_df = self.get_project_blocks_df(location_projectBlocks, plc, reload)
-				project_types_df = self.get_project_types_df(location_datatypes, plc, reload)
+		self.catalog.get_table(reload=reload)
+		if reload:
+			self.clear_paths()
+
+		def get_plc_types_blocks(plc):
+			logger.debug(f"Handling plc: '{plc.Name}'...")
+			software_container = self.software_container[plc.Name]
+			location_projectBlocks = software_container.BlockGroup
+			location_datatypes = software_container.TypeGroup
+
+			project_blocks_df = self.get_project_blocks_df(location_projectBlocks, plc, reload)
+			project_types_df = self.get_project_types_df(location_datatypes, plc, reload)
+			logger.debug(
+				f"'{plc.Name}' type/block entries extracted: "
+				f"total blocks: '{len(project_blocks_df)}' "
+				f"total types: '{len(project_types_df)}'"
+			)
+			return [project_blocks_df, project_types_df]
 
-				types_blocks_df = pd.concat([types_blocks_df, project_blocks_df, project_types_df], ignore_index=True)
-				logger.debug(
-					f"'{plc.Name}' type/block entries added to types-blocks dataframe: "
-					f"total blocks: '{len(project_blocks_df)}' "
-					f"total types: '{len(project_types_df)}'"
-					f"total entries: '{len(types_blocks_df)}'"
-				)
+		try:
+			# the PLC's are extracted concurrently, the per-PLC dataframes are merged in the order of the PLC's
+			plc_frames = self.scheduler.map_plcs(get_plc_types_blocks, self.plc_list)
+			frames = [frame for frames in plc_frames.values() for frame in frames if not frame.empty]
+			types_blocks_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['SafetyBlock', 'SystemType'])
+			# a block is never a system type and a type never a safety block
+			types_blocks_df[['SafetyBlock', 'SystemType']] = types_blocks_df[['SafetyBlock', 'SystemType']].fillna(False).astype(bool)
 		except Exception as e:
 			raise Exception(f'Failed to retrieve types blocks dataframe: {str(e)}')
 		
@@ -506,140 +675,121 @@ class Library:
 
 		if self.used_lib_blocks_df is not None and not reload:
 			logger.debug('Blocks have been validated earlier, returning cached content...')
-			return self.used_lib_blocks_df
+			return self.get_view('used_lib_blocks')
 		
 		logger.debug(
 			f"Checking used blocks data and validating against library blocks: "
 			f"reload: '{reload}'"
 		)
 		
-		data_collection = []
 		used_lib_blocks_df = None
 			
 		try:
-			project_blocks_df = self.get_types_blocks_df(reload)
-			library_content_df = self.get_library_content(reload)
-			library_service = tia.Library.Types.LibraryTypeInstanceInfo
-
-			logger.debug(f"Validating '{len(project_blocks_df)}' project blocks against '{len(library_content_df)}' library blocks, and making dataframe entry for each block")
-			for i, row in project_blocks_df.iterrows():
-				block_type = row['Type']
-				block_name = row['Name']
-				row_block_data = row.copy()
-
-				if block_type == 'InstanceDB':
-					block_instanceOfName = row['InstanceOfName']
-					block_instanceOfNumber = row['InstanceOfNumber']
-
-					search_instance_filter = (project_blocks_df['Name'] == block_instanceOfName) & (project_blocks_df['Number'] == block_instanceOfNumber)
-					search_instance = project_blocks_df.loc[search_instance_filter]
-
-					if search_instance.empty:
-						message = f"Block '{block_name}' wich is instanceOf '{block_instanceOfName}' not found in project blocks"
-						row_block_data['ConnectedToLibrary'] = False
-						data_collection.append(row_block_data)
-						
-						df_warning_update = pd.DataFrame({
-							'Name' : [block_name],
-							'Warning': [message]
-						})
-						self.df_warning = pd.concat([self.df_warning, df_warning_update], ignore_index=True)
-						logger.warning(message) 
-						continue
-					
-					block_object = search_instance['ReferenceObject'].values[0]
-					block_modifiedDate = search_instance['ModifiedDate'].values[0]
-					logger.debug(f"Found block '{block_name}' wich is instanceOf block '{block_instanceOfName}' in project blocks")
+			# the library content refreshes the blocks and types (see 'get_instance_counts'), they are not extracted twice
+			self.get_library_content(reload)
+			library_content_df = self.library_df
+			project_blocks_df = self.get_types_blocks_df()
+			blocks = project_blocks_df.reset_index(drop=True)
+
+			logger.debug(f"Validating '{len(blocks)}' project blocks against '{len(library_content_df)}' library blocks with joins on (name, number) and (name, version)")
+
+			# instance -> parent block on (Name, Number), the first block with that name and number (in the order of the PLC's)
+			parent_positions = {}
+			for position, key in enumerate(zip(blocks['Name'], blocks['Number'])):
+				parent_positions.setdefault(key, position)
+			is_instance = blocks['Type'] == 'InstanceDB'
+			source_positions = pd.Series([
+				parent_positions.get((instance_name, instance_number), -1) if instance else position
+				for position, (instance, instance_name, instance_number) in enumerate(zip(is_instance, blocks['InstanceOfName'], blocks['InstanceOfNumber']))
+			])
+			missing_parent = source_positions < 0
+			source_positions = source_positions.where(~missing_parent, 0)
+			source_objects = blocks['ReferenceObject'].take(source_positions).reset_index(drop=True)
+			source_dates = blocks['ModifiedDate'].take(source_positions).reset_index(drop=True)
+			block_keys = object_keys(blocks)
+			source_keys = [block_keys[position] for position in source_positions]
+
+			# block -> library type version, resolved once per block (see 'get_instance_info')
+			instance_info = self.scheduler.map_plcs(self.get_instance_info, self.plc_list).values()
+			links = {}
+			for frame in instance_info:
+				links.update(zip(frame['ReferenceObject'], zip(frame['LibraryType'], frame['LibraryVersion'])))
+			linked = [None if missing else links.get(block_object) for block_object, missing in zip(source_objects, missing_parent)]
+			type_names = pd.Series([link[0] if link else None for link in linked], dtype=object)
+			type_versions = pd.Series([link[1] if link else None for link in linked], dtype=object)
+			connected = type_names.notna()
+
+			# block -> library on (Name) and on (Name, Version), a block is outdated when its version is not in the library
+			# or older than the latest version of its type
+			library_versions = library_content_df.drop_duplicates(['Name', 'Version']).set_index(['Name', 'Version'])
+			type_found = connected & type_names.isin(library_content_df['Name'])
+			type_keys = pd.MultiIndex.from_arrays([type_names, type_versions])
+			version_found = type_found & pd.Series(type_keys.isin(library_versions.index))
+			outdated = type_found & (~version_found | self.version_index.is_outdated(type_names, type_versions))
+			unknown_type = connected & ~type_found
+
+			exact = library_versions.reindex(type_keys).reset_index(drop=True)
+			latest = self.version_index.get_latest(type_names)
+			latest_row = library_versions.reindex(pd.MultiIndex.from_arrays([type_names, latest])).reset_index(drop=True)
+
+			used_lib_blocks_df = blocks.copy()
+			status = pd.Series(False, index=blocks.index, dtype=object)
+			status[connected] = True
+			status[outdated] = 'Outdated'
+			used_lib_blocks_df['ConnectedToLibrary'] = status
+			used_lib_blocks_df['Version'] = type_versions.where(connected)
+			# an outdated block gets the version, date and state of the latest version of its type
+			used_lib_blocks_df['VersionInLibrary'] = latest.where(outdated, type_versions.where(version_found))
+			used_lib_blocks_df['NameInLibrary'] = type_names.where(connected)
+			used_lib_blocks_df['ModifiedDateInLibrary'] = latest_row['ModifiedDate'].where(outdated, exact['ModifiedDate'].where(version_found))
+			used_lib_blocks_df['LibraryState'] = latest_row['LibraryState'].where(outdated, exact['LibraryState'].where(version_found))
+
+			# the conformance is only read again for a block that was modified, or whose library version was modified,
+			# since the previous validation
+			library_dates = exact['ModifiedDate'].astype(object).where(exact['ModifiedDate'].notna(), None)
+			conformance, records, stale = {}, {}, {}
+			for position in blocks.index[type_found]:
+				key, stamp = source_keys[position], (source_dates[position], library_dates[position])
+				record = records.get(key) or self.conformance_records.get(key)
+				if record is not None and record[0] == stamp:
+					conformance[position] = record[1]
+					records[key] = record
 				else:
-					block_object = row['ReferenceObject']
-					block_modifiedDate = row['ModifiedDate']
-
-				try:
-					connect_to_library = block_object.GetService[library_service]()
-					connection = True if isinstance(connect_to_library, library_service) else False
-				except Exception as e:
-					connection = False
-					logger.warning(f"Cannot connect to library with block '{block_name}' - unofficial programblock")
-				
-				if connection:
-					library_type_name = connect_to_library.LibraryTypeVersion.TypeObject.Name
-					library_type_version = connect_to_library.LibraryTypeVersion.VersionNumber
-					library_conformanceStatus = block_object.GetAttribute('LibraryConformanceStatus')
-
-					library_search_filter = (
-						(library_content_df['Name'] == library_type_name)
-					)
-					library_search_filter2 = (
-						(library_content_df['Version'] == library_type_version)
-					)
-
-					library_search_type1 = library_content_df.loc[library_search_filter]
-					library_search_type2 = library_search_type1.loc[library_search_filter2]
-					library_search_versions = library_search_type2['Version'].values if not library_search_type2.empty else None
-
-					row_block_data['ConnectedToLibrary'] = connection
-					row_block_data['Version'] = library_type_version
-					if not library_search_type1.empty or library_search_versions is not None:
-						row_block_data['VersionInLibrary'] =  (library_type_version if library_type_version in library_search_versions else library_search_versions[0])
-					else:
-						version_tuples = library_search_type1['Version'].apply(lambda v: tuple(map(int, v.split('.')))) if not library_search_type1.empty else None
-						max_version = max(version_tuples) if version_tuples is not None else None
-						row_block_data['VersionInLibrary'] = max_version if max_version is not None else 'NaN'
-					row_block_data['NameInLibrary'] = library_type_name
-
-					if library_search_type1.empty:
-						message = (
-							f"Block '{block_name}' connected to library block '{library_type_name}', "
-							f"version: '{library_type_version}' but not found in library content dataframe"
-						)
-						# warning column stored separately to enable/disable 
-						df_warning_update = pd.DataFrame({
-							'Name' : [block_name],
-							'Warning': [message]
-						})
-						self.df_warning = pd.concat([self.df_warning, df_warning_update], ignore_index=True)
-						logger.warning(message)
-						continue
-					
-					if (library_search_type2.empty):
-						object_name = block_name if block_type != 'InstanceDB' else block_instanceOfName
-						var_string = f"'{object_name}' has outdated version '{library_type_version}', {block_modifiedDate}" if library_search_type2.empty else f"'{object_name}' outdated '{block_modifiedDate}'"
-						message = (f"Block {var_string}: " 
-									f"library block '{library_type_name}', "
-									f"library version '{library_search_versions}', " 
-									f"updated on '{library_search_type2['ModifiedDate'].values[0]}'"
-						)
-						row_block_data['ConnectedToLibrary'] = 'Outdated'
-						row_block_data['ModifiedDateInLibrary'] = library_search_type1['ModifiedDate'].values[0]
-						row_block_data['LibraryState'] = library_search_type1['LibraryState'].values[0]
-						row_block_data['LibraryConformanceStatus'] = library_conformanceStatus
-
-						# warning column stored separately to enable/disable 
-						df_warning_update = pd.DataFrame({
-							'Name' : [block_name],
-							'Warning': [message]
-						})
-						self.df_warning = pd.concat([self.df_warning, df_warning_update], ignore_index=True)
-						logger.warning(message)
-					else:
-						row_block_data['ModifiedDateInLibrary'] = library_search_type2['ModifiedDate'].values[0]
-						row_block_data['LibraryState'] = library_search_type2['LibraryState'].values[0]
-						row_block_data['LibraryConformanceStatus'] = library_conformanceStatus
-				else:
-					row_block_data['ConnectedToLibrary'] = connection
-				data_collection.append(row_block_data)
-
-			used_lib_blocks_df = pd.DataFrame(data_collection)
-			logger.debug(f"Adding 'NaN' as empty value, removing ReferenceObject column because no later use in dataframe: {list(used_lib_blocks_df.columns)}")
-			used_lib_blocks_df = used_lib_blocks_df.drop('ReferenceObject', axis=1)
-			used_lib_blocks_df.fillna('NaN', inplace=True)
-
-			columns = list(used_lib_blocks_df.columns)
-			if 'Path' in columns:
-				logger.debug(f"Reordering columns: '{columns}'")
-				columns.append(columns.pop(columns.index('Path')))
-				used_lib_blocks_df = used_lib_blocks_df[columns]
-				logger.debug(f"Reordered columns: '{used_lib_blocks_df.columns}'")
+					stale.setdefault(key, (stamp, []))[1].append(position)
+			stale_rows = self.attributes.read([source_objects[positions[0]] for _, positions in stale.values()], ('LibraryConformanceStatus',))
+			for (key, (stamp, positions)), row in zip(stale.items(), stale_rows):
+				records[key] = (stamp, row['LibraryConformanceStatus'])
+				conformance.update(dict.fromkeys(positions, row['LibraryConformanceStatus']))
+			self.conformance_records = records
+			used_lib_blocks_df['LibraryConformanceStatus'] = pd.Series(conformance, index=blocks.index[type_found], dtype=object)
+			logger.debug(f"Conformance of '{len(conformance)}' library blocks: read again: '{len(stale)}', reused: '{len(conformance) - sum(len(positions) for _, positions in stale.values())}'")
+
+			# the warning of every block is kept in the 'Warning' column, only shown with the 'warning_column' setting
+			warnings = {}
+			for position in blocks.index[missing_parent]:
+				warnings[position] = f"Block '{blocks.at[position, 'Name']}' wich is instanceOf '{blocks.at[position, 'InstanceOfName']}' not found in project blocks"
+			for position in blocks.index[unknown_type]:
+				warnings[position] = (
+					f"Block '{blocks.at[position, 'Name']}' connected to library block '{type_names[position]}', "
+					f"version: '{type_versions[position]}' but not found in library content dataframe"
+				)
+			for position in blocks.index[outdated]:
+				object_name = blocks.at[position, 'InstanceOfName'] if is_instance[position] else blocks.at[position, 'Name']
+				warnings[position] = (
+					f"Block '{object_name}' has outdated version '{type_versions[position]}', {source_dates[position]}: "
+					f"library block '{type_names[position]}', "
+					f"library version '{latest[position]}', "
+					f"updated on '{latest_row.at[position, 'ModifiedDate']}'"
+				)
+			for position in sorted(warnings):
+				logger.warning(warnings[position])
+
+			# blocks connected to a type that is not in the library content are only reported as a warning
+			used_lib_blocks_df = used_lib_blocks_df[~unknown_type].reset_index(drop=True)
+			shown = [column for column in used_lib_blocks_df.columns if column not in DERIVED_COLUMNS + HIDDEN_COLUMNS['used_lib_blocks']]
+			logger.debug(f"Adding 'NaN' as empty value in the shown columns: {shown}")
+			used_lib_blocks_df[shown] = used_lib_blocks_df[shown].astype(object).fillna('NaN')
+			used_lib_blocks_df['Warning'] = pd.Series(warnings, dtype=object).reindex(blocks.index)[~unknown_type].to_numpy()
 		except Exception as e:
 			raise Exception(f'Failed to validate used blocks: {str(e)}\n{traceback.format_exc()}')
 
@@ -649,50 +799,196 @@ class Library:
 			f"total entries: '{len(self.used_lib_blocks_df)}', "
 			f"columns: {self.used_lib_blocks_df.columns}"
 		)
-		return self.used_lib_blocks_df
+		return self.get_view('used_lib_blocks')
 
 
-	def update_dataframe(self):
+	def get_dependency_graph(self, reload=False):
 		"""
-		Updates the library content.
+		Builds the dependency graph of the library type versions, a node per row of the library content.
+		The dependencies of a version are read once ('Dependencies'), again only when the version was modified.
 
 		Returns:
-			None
+			DependencyGraph: The graph, rebuilt when the library content was extracted again.
 		"""
-		def update_path_column(df, add=True):
-			if df is not None:
-				logger.debug(f"Updating path column in dataframe: {df.columns}")
-				self.df_path.drop_duplicates(subset=['Name'], keep='first', inplace=True)
-				if add:
-					df['Path'] = df['Name'].map(self.df_path.set_index('Name')['Path'])
-				else:
-					if 'Path' in df.columns:
-						df.drop('Path', axis=1, inplace=True)
-		
-		def update_warning_column(df, add=True):
-			if df is not None:
-				logger.debug(f"Updating warning column in dataframe: {df.columns}")
-				self.df_warning.drop_duplicates(subset=['Name'], keep='first', inplace=True)
-				if add:
-					df['Warning'] = df['Name'].map(self.df_warning.set_index('Name')['Warning'])
-				else:
-					if 'Warning' in df.columns:
-						df.drop('Warning', axis=1, inplace=True)
-		
-		dataframes = {
-			'library': self.library_df,
-			'used_lib_blocks': self.used_lib_blocks_df
-		}
-		
-		for name, df in dataframes.items():
-			update_path_column(df, add=self.folder_path)
-			if name == 'used_lib_blocks':
-				update_warning_column(df, add=self.include_warning_column)
+		self.get_library_content(reload)
+		if self.dependency_graph is not None and self.dependency_graph[0] is self.library_df:
+			return self.dependency_graph[1]
+
+		library_df = self.library_df
+		keys = list(zip(library_df['Name'], library_df['Version']))
+		positions = {key: position for position, key in enumerate(keys)}
+		records = {}
+		sources, targets = [], []
+		try:
+			for position, (key, date, version) in enumerate(zip(keys, library_df['ModifiedDate'], library_df['ReferenceObject'])):
+				record = self.dependency_records.get(key)
+				if record is None or record[0] != date:
+					record = (date, [(dependency.TypeObject.Name, dependency.VersionNumber) for dependency in version.Dependencies])
+				records[key] = record
+				for dependency in record[1]:
+					target = positions.get(dependency)
+					if target is None:
+						logger.debug(f"Dependency '{dependency}' of library type '{key}' not found in the library content")
+						continue
+					sources.append(position)
+					targets.append(target)
+		except Exception as e:
+			raise Exception(f'Failed to build the library dependency graph: {str(e)}')
+
+		graph = DependencyGraph(len(library_df), sources, targets)
+		self.dependency_records = records
+		self.dependency_graph = (library_df, graph)
+		return graph
+
+
+	def get_impact(self, name, version=None, direction='dependents', transitive=True, reload=False):
+		"""
+		Returns the library versions that depend on a type (direction 'dependents', affected by a new version of the type)
+		or that the type pulls in (direction 'dependencies'), with their instances in the project.
+
+		Args:
+			name (str): The library type name.
+			version (str, optional): Only this version of the type, all its versions when None.
+			direction (str, optional): 'dependents' or 'dependencies'. Defaults to 'dependents'.
+			transitive (bool, optional): Also the indirect dependents/dependencies. Defaults to True.
+
+		Returns:
+			pandas.DataFrame: A row per version with the Name, Version, LibraryState, Instances (in the project)
+			and PLCs (that have instances).
+		"""
+		graph = self.get_dependency_graph(reload)
+		library_df = self.library_df
+		selected = library_df['Name'] == name
+		if version is not None:
+			selected &= library_df['Version'] == version
+		if not selected.any():
+			raise ValueError(f"Library type '{name}'{f' version {version}' if version is not None else ''} not found in the library content")
+
+		positions = graph.query(np.flatnonzero(selected.to_numpy()), direction, transitive=transitive)
+		impact = library_df.iloc[positions][['Name', 'Version', 'LibraryState']].reset_index(drop=True)
+
+		instances, plcs = {}, {}
+		for (type_name, version_number, plc_name), count in self.get_instance_counts().items():
+			instances[(type_name, version_number)] = instances.get((type_name, version_number), 0) + count
+			plcs.setdefault((type_name, version_number), set()).add(plc_name)
+		impact_keys = list(zip(impact['Name'], impact['Version']))
+		impact['Instances'] = [instances.get(key, 0) for key in impact_keys]
+		impact['PLCs'] = [', '.join(sorted(plcs.get(key, ()))) for key in impact_keys]
+		logger.debug(
+			f"Impact of library type '{name}', version '{version}': "
+			f"direction: '{direction}', "
+			f"transitive: '{transitive}', "
+			f"versions: '{len(impact)}', "
+			f"instances: '{impact['Instances'].sum()}'"
+		)
+		return impact
+
+
+	def get_dependents(self, name, version=None, transitive=True):
+		"""
+		Returns the library versions that depend on a type, see 'get_impact'.
+		"""
+		return self.get_impact(name, version, direction='dependents', transitive=transitive)
+
+
+	def get_dependencies(self, name, version=None, transitive=True):
+		"""
+		Returns the library versions that a type pulls in, see 'get_impact'.
+		"""
+		return self.get_impact(name, version, direction='dependencies', transitive=transitive)
+
+
+	def get_usage_matrix(self, reload=False):
+		"""
+		Returns which PLC's use which versions of the library types, counted from the validated blocks and types.
+		An instance DB is not counted, its function block is. The matrix is updated when the blocks were validated again,
+		only for the blocks that changed.
+
+		Returns:
+			UsageMatrix: The instances per (type, PLC, version), sliceable per type ('get_type') and per PLC ('get_plc').
+		"""
+		self.validate_used_blocks(reload)
+		if self.usage_source is self.used_lib_blocks_df:
+			return self.usage_matrix
+
+		validated = self.used_lib_blocks_df
+		status = validated['ConnectedToLibrary']
+		used = validated[((status == True) | (status == 'Outdated')) & (validated['Type'] != 'InstanceDB')]
+		entries = dict(zip(
+			object_keys(used),
+			zip(used['NameInLibrary'], used['Version'], used['PLC'], used['ConnectedToLibrary'] == 'Outdated')
+		))
+		self.usage_matrix.update(entries, types=self.library_df['Name'].unique())
+		self.usage_source = validated
+		return self.usage_matrix
+
+
+	def get_version_status(self):
+		"""
+		Returns the status of every version in the library content: 'Outdated' for an older version of its type, otherwise 'Latest'.
+		Computed once per extraction of the library content, see 'get_view'.
+		"""
+		if self.version_status is None or self.version_status[0] is not self.library_df:
+			outdated = self.version_index.is_outdated(self.library_df['Name'], self.library_df['Version'])
+			self.version_status = (self.library_df, outdated.map({True: 'Outdated', False: 'Latest'}))
+		return self.version_status[1]
+
+
+	def get_view(self, name):
+		"""
+		Returns an extracted table the way it is shown with the current settings, without accessing the project.
+		The rows of the safety blocks and system types are filtered out of the validated blocks when their setting is off,
+		the derived columns (Path, Warning, VersionStatus) are only added when their setting is on.
+		The views are cached per settings until the table is extracted again.
+
+		Args:
+			name (str): The table, 'library' or 'used_lib_blocks'.
+
+		Returns:
+			pandas.DataFrame: The table as shown, None if the table is not extracted yet.
+		"""
+		source = self.library_df if name == 'library' else self.used_lib_blocks_df
+		if source is None:
+			return None
+
+		cached_source, views = self.views.get(name, (None, {}))
+		if cached_source is not source:
+			views = {}
+			self.views[name] = (source, views)
+		key = tuple(self.settings.items())
+		if key in views:
+			return views[key]
+
+		rows = pd.Series(True, index=source.index)
+		if name == 'used_lib_blocks':
+			if not self.include_safety_blocks:
+				rows &= ~source['SafetyBlock']
+			if not self.include_system_types:
+				rows &= ~source['SystemType']
+
+		columns = [column for column in source.columns if column not in DERIVED_COLUMNS + HIDDEN_COLUMNS[name]]
+		if self.folder_path:
+			columns.append('Path')
+		if self.include_warning_column and name == 'used_lib_blocks':
+			columns.append('Warning')
+		view = source.loc[rows, columns]
+		if self.include_version_status and name == 'library':
+			view = view.assign(VersionStatus=self.get_version_status()[rows])
+		view = view.reset_index(drop=True)
+
+		views[key] = view
+		logger.debug(
+			f"Made the view of '{name}': "
+			f"settings: {self.settings}, "
+			f"rows: '{len(view)}' of '{len(source)}', "
+			f"columns: {list(view.columns)}"
+		)
+		return view
 
 	
 	def set_settings(self, settings):
 		"""
-		Sets the settings.
+		Sets the settings, the tables are shown with them through 'get_view' (no extraction again).
 
 		Args:
 			settings (dict): Dictionary containing the settings.
@@ -702,16 +998,16 @@ class Library:
 		self.include_warning_column = settings.get('warning_column', self.include_warning_column)
 		self.include_safety_blocks = settings.get('safety_blocks', self.include_safety_blocks)
 		self.include_system_types = settings.get('system_types', self.include_system_types)
+		self.include_version_status = settings.get('version_status', self.include_version_status)
 
 		self.settings = {
 			'folder_path': self.folder_path,
 			'warning_column': self.include_warning_column,
 			'safety_blocks': self.include_safety_blocks,
-			'system_types': self.include_system_types
+			'system_types': self.include_system_types,
+			'version_status': self.include_version_status
 		}
 
-		self.update_dataframe()
-
 	
 	def get_settings(self):		
 		"""
@@ -759,7 +1055,9 @@ class Library:
 		if tab == "content":
 			df = self.get_library_content()
 		elif tab == "validate project blocks":
-			df, info = self.validate_used_blocks()
+			df = self.validate_used_blocks()
+		elif tab == "usage matrix":
+			df = self.get_usage_matrix().to_pivot()
 
 		if extension == ".csv":
 			df.to_csv(export_path, index=False)
@@ -3,10 +3,6 @@ Author: Quinten Bauwens
 Last updated: 09/07/2024
 """
 
-import clr
-clr.AddReference("C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll")
-import Siemens.Engineering as tia
-import Siemens.Engineering.HW.Features as hwf
 import os
 import re
 import random as rd
@@ -18,10 +14,16 @@ import plotly.graph_objs as go
 from matplotlib import pyplot as plt
 from collections import OrderedDict as od
 
+from core.attributes import NODE_ATTRIBUTES
+from core.classification import DEVICE_TYPE_COLORS
 from utils.loggerConfig import get_logger
+from utils.tableBuilder import TableBuilder
 
 logger = get_logger(__name__)
 
+NODE_TABLE_COLUMNS = ['plc_name', 'subnetmask', 'gateway', 'device_name', 'node_names', 'node_addresses']
+DEVICE_NODE_COLUMNS = ['plc_name', 'device_name', 'node_name', 'node_address']
+
 class Nodes:
 	"""
 	A class representing a collection of nodes in a project.
@@ -61,38 +63,85 @@ class Nodes:
 
 		self.nodeList = None
 		self.items = {}
+		self.device_nodes = None
+		self.node_version = None
+		self.graph_connections = None
+		self.graph_version = None
 		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
 
 	def get_core_classes(self):
 		self.hardware = self.project.hardware
+		self.services = self.project.services
+		self.attributes = self.project.attributes
+		self.classification = self.project.classification
 
 	def get_core_functions(self):
 		logger.debug(f"Accessing 'GetAllItems' from the hardware object '{self.project.hardware}'...")
 		self.projectItems = self.hardware.GetAllItems()
 
 	# TODO: NEEDS TO BE UPDATED (INCORRECT) : get the nodes from subnet section directly instead of looping through all devices
-	def getNodeList(self, items={}, reload=False):
+	def getNodeList(self, items=None, reload=False, refresh=False):
 		"""
 		Returns a dictionary with all the nodes in the project.
+		A reload reads all the nodes again, on a refresh only the nodes of the stations in the change set of the
+		hardware refresh are read again.
 
 		Args:
 			items (dict, optional): Additional items to include in the dictionary. Defaults to an empty dictionary.
+			reload (bool, optional): Rebuilds the hardware inventory and reads all the nodes again. Defaults to False.
+			refresh (bool, optional): Refreshes the hardware inventory and reads the nodes of the changed stations again. Defaults to False.
 
 		Returns:
 			dict: A dictionary containing all the nodes in the project.
 		"""
-		if self.nodeList and not reload:
+		if self.nodeList and not reload and not refresh:
 			logger.debug(f"Returning cached node list: {type(self.nodeList)}, total entries: '{len(self.nodeList)}'...")
 			return self.nodeList
 
-		PLC_List = self.hardware.get_plc_devices(reload=reload)
-		interface_devices = self.hardware.get_interface_devices(self.projectItems, reload=reload)
+		# one (re)build of the inventory, the device lists below are derived from it
+		self.hardware.get_inventory(reload=reload, refresh=refresh)
+		self.projectItems = self.hardware.GetAllItems()
+		PLC_List = self.hardware.get_plc_devices()
+		interface_devices = self.hardware.get_interface_devices(self.projectItems)
 		logger.debug(
 			f"Gathering nodes from PLC's {[item.Name for item in PLC_List]} and making dict: "
 			f"amount of interface devices: '{len(interface_devices)}, '"
-			f"reload: '{reload}'"
+			f"reload: '{reload}', "
+			f"refresh: '{refresh}'"
 		)
 
+		if items is None:
+			items = {}
+
+		# the nodes of the interface devices are the same for every PLC, they get read once with a bulk read per node
+		changed_stations = self.hardware.get_changes(self.node_version) if self.device_nodes is not None else None
+		if changed_stations is None:
+			self.device_nodes = {}
+		else:
+			logger.debug(f"Updating the nodes of '{len(changed_stations)}' changed stations")
+			self.device_nodes = {
+				device: nodes for device, nodes in self.device_nodes.items()
+				if self.hardware.get_station(device) not in changed_stations and device in self.hardware.get_inventory()
+			}
+
+		new_devices = []
+		for device in interface_devices:
+			if device in self.device_nodes:
+				continue
+			network_service = self.services.get_network_interface(device)
+
+			if network_service is None: # skip the device if it does not have a network interface
+				logger.debug(f"Device '{device.Name}' does not have a network interface")
+				self.device_nodes[device] = None
+				continue
+			new_devices.append((device, device.Name, list(network_service.Nodes)))
+
+		node_rows = iter(self.attributes.read([node for _, _, nodes in new_devices for node in nodes], NODE_ATTRIBUTES))
+		for device, device_name, nodes in new_devices:
+			self.device_nodes[device] = (device_name, [next(node_rows) for _ in nodes])
+		self.node_version = self.hardware.inventory_version
+		device_nodes = [self.device_nodes[device] for device in interface_devices if self.device_nodes[device] is not None]
+
 		for plc in PLC_List:
 			this_plc_name = plc.Name
 			items[this_plc_name] = od()
@@ -104,33 +153,20 @@ class Nodes:
 			this_plc_dict = items[this_plc_name]
 			devices_list = this_plc_dict["devices"]
 
-			for device in interface_devices:
-				network_service = tia.IEngineeringServiceProvider(device).GetService[hwf.NetworkInterface]()
-
-				if not isinstance(network_service, hwf.NetworkInterface): # skip the device if it does not have a network interface
-					logger.debug(f"Device '{device.Name}' does not have a network interface")
-					continue
-						
-				this_device_name = device.Name
+			for this_device_name, rows in device_nodes:
 				this_device_list = []
 
-				if (device.Name == "PROFINET"):
-					this_plc_subnet = network_service.Nodes[0].GetAttribute("SubnetMask")
-					this_plc_gateway = network_service.Nodes[0].GetAttribute("RouterAddress")
-
+				if (this_device_name == "PROFINET"):
 					items[this_plc_name]["Network"] = { # update the network key with values
-						"subnetmask" : this_plc_subnet,
-						"gateway" : this_plc_gateway
+						"subnetmask" : rows[0]["SubnetMask"],
+						"gateway" : rows[0]["RouterAddress"]
 						}
 
 				this_nodes_dict = {}
 				
-				for index in range(network_service.Nodes.Count):
-					this_node_name = network_service.Nodes[index].GetAttribute("Name")
-					this_node_address = network_service.Nodes[index].GetAttribute("Address")
-
+				for row in rows:
 					# add node to the dictionary
-					this_nodes_dict[this_node_name] = this_node_address
+					this_nodes_dict[row["Name"]] = row["Address"]
 				
 				# bundle all the nodes in the corresponding device
 				this_device_list.append({"nodes" : this_nodes_dict})	
@@ -143,7 +179,7 @@ class Nodes:
 		return items
 
 
-	def getNodeTable(self, items={}, reload=False):
+	def getNodeTable(self, items=None, reload=False):
 		"""
 		Returns a table with all the nodes for visualization in a GUI application.
 
@@ -157,7 +193,7 @@ class Nodes:
 			logger.debug(f"Returning cached nodes table: {type(self.nodesTable)}, total entries: '{len(self.nodesTable)}'...")
 			return self.nodesTable
 		
-		nodesTable = pd.DataFrame()
+		nodesTable = TableBuilder(NODE_TABLE_COLUMNS)
 		self.nodeList = self.getNodeList(items, reload=reload)
 		logger.debug(
 			f"Creating dataframe for nodes: "
@@ -168,49 +204,38 @@ class Nodes:
 		for plc_name, plc_info in self.nodeList.items():
 			for device in plc_info['devices']:
 				for device_name, device_info in device.items():
-					node_names = [node for node in device_info[0]['nodes'].keys()]
-
-					# make a DataFrame for the device and concatenate it to the network_segment
-					device_df = pd.DataFrame({
-						'plc_name': [plc_name],  
-						'subnetmask': [plc_info['Network']['subnetmask']],
-						'gateway': [plc_info['Network']['gateway']],
-						'device_name': [device_name],
-						'node_names': node_names,
-						'node_addresses': [device_info[0]['nodes'][node] for node in node_names]
-						}, index=[0])
-					
-					# Concatenate all network_segments to nodesTable
-					nodesTable = pd.concat([nodesTable, device_df], ignore_index=True)
+					# a row per node of the device
+					for node_name, node_address in device_info[0]['nodes'].items():
+						nodesTable.append(
+							plc_name=plc_name,
+							subnetmask=plc_info['Network']['subnetmask'],
+							gateway=plc_info['Network']['gateway'],
+							device_name=device_name,
+							node_names=node_name,
+							node_addresses=node_address
+						)
+		nodesTable = nodesTable.to_frame()
 		self.nodesTable = nodesTable
 		logger.debug(f"Returning nodesTable as {type(nodesTable)}")
 		return nodesTable
 
 
-	#TODO : add more data to the nodes (isProfinet, isProfibus, redundancyRole etc..)
-	def graph_data(self, reload=False):
+	def get_station_connections(self, deviceitems):
 		"""
-		Generates a graph representation of the network connections between devices.
+		Retrieves the network connections of the interfaces of a station.
+
+		Args:
+			deviceitems (list): The device items of the station.
 
 		Returns:
-			nx.Graph: The generated graph object representing the network connections.
+			list: A (source node, target node, source device type, target device type, cable length) tuple per connected port.
 		"""
-		if hasattr(self, "G") and not reload:
-			logger.debug(f"Returning cached graph data: {type(self.G)}, with '{len(self.G.nodes)}' nodes and '{len(self.G.edges)}' edges...")
-			return self.G
-
-		G = nx.Graph()  # initialize the graph
-		items = self.hardware.GetAllItems(reload=reload)
-		logger.debug(
-			f"Mapping network connections of '{len(items)}' hardware devices in the project to a graph: "
-			f"reload: '{reload}'"
-		)
+		connections = []
+		for deviceitem in deviceitems:
+			network_service = self.services.get_network_interface(deviceitem)  # get the interface service
+			logger.debug(f"'{deviceitem.Name}' has network interface: '{network_service is not None}'")
 
-		for deviceitem in items:  # for all items and device items in project
-			network_service = tia.IEngineeringServiceProvider(deviceitem).GetService[hwf.NetworkInterface]()  # get the interface service
-			logger.debug(f"'{deviceitem.Name}' has network interface: '{isinstance(network_service, hwf.NetworkInterface)}'")
-
-			if isinstance(network_service, hwf.NetworkInterface):  # check whether the service exists
+			if network_service is not None:  # check whether the service exists
 				for source_port in network_service.Ports:  # get the ports from the interface
 					if source_port.ConnectedPorts.Count != 0:  # check whether the port is connected
 						source_node = deviceitem.Parent.Parent.GetAttribute('Name')  # Name of the station of the interface to use as node in the graph
@@ -222,9 +247,6 @@ class Nodes:
 						target_container = target_port.Interface.Parent.GetAttribute('Container')
 						target_device_type = target_container.Parent.GetAttribute('TypeIdentifier')
 
-						G.add_node(source_node, deviceType=source_device_type)
-						G.add_node(target_node, deviceType=target_device_type)
-
 						# get the cable length of the connection
 						try:
 							cable_length = target_port.GetAttribute('CableLength') 
@@ -238,8 +260,64 @@ class Nodes:
 
 						# convert the cable length back to string and add "m" for meters
 						cable_length = str(cable_length) + "m" if cable_length != 'N/A' else cable_length
-						G.add_edge(source_node, target_node, length=cable_length)  # add the connection to the graph
-						logger.debug(f"Added connection between '{source_node}' and '{target_node}' with a cable length of '{cable_length}'")
+						connections.append((source_node, target_node, source_device_type, target_device_type, cable_length))
+		return connections
+
+
+	#TODO : add more data to the nodes (isProfinet, isProfibus, redundancyRole etc..)
+	def graph_data(self, reload=False, refresh=False):
+		"""
+		Generates a graph representation of the network connections between devices.
+		The connections are kept per station: a reload reads all of them again, on a refresh only the stations in the
+		change set of the hardware refresh and their neighbours are read again.
+
+		Args:
+			reload (bool, optional): Rebuilds the hardware inventory and reads all the connections again. Defaults to False.
+			refresh (bool, optional): Refreshes the hardware inventory and reads the connections of the changed stations again. Defaults to False.
+
+		Returns:
+			nx.Graph: The generated graph object representing the network connections.
+		"""
+		if hasattr(self, "G") and not reload and not refresh:
+			logger.debug(f"Returning cached graph data: {type(self.G)}, with '{len(self.G.nodes)}' nodes and '{len(self.G.edges)}' edges...")
+			return self.G
+
+		inventory = self.hardware.get_inventory(reload=reload, refresh=refresh)
+		changed_stations = self.hardware.get_changes(self.graph_version) if self.graph_connections is not None else None
+		logger.debug(
+			f"Mapping network connections of '{len(inventory)}' hardware devices in the project to a graph: "
+			f"changed stations: '{'all' if changed_stations is None else len(changed_stations)}', "
+			f"reload: '{reload}', "
+			f"refresh: '{refresh}'"
+		)
+
+		if changed_stations is None:
+			connections = {}
+			dirty = inventory.stations
+		else:
+			# the neighbours of a changed station can have connections to its replaced ports, they are read again too
+			connections = self.graph_connections
+			changed_nodes = {connection[0] for station in changed_stations for connection in connections.get(station, [])}
+			dirty = set(changed_stations)
+			for station, station_connections in connections.items():
+				if any(connection[1] in changed_nodes for connection in station_connections):
+					dirty.add(station)
+
+		for station in dirty:
+			connections.pop(station, None)
+			if station in inventory.station_items:
+				connections[station] = self.get_station_connections(inventory.station_items[station])
+
+		G = nx.Graph()  # initialize the graph
+		for station in inventory.stations:
+			for source_node, target_node, source_device_type, target_device_type, cable_length in connections.get(station, []):
+				G.add_node(source_node, deviceType=source_device_type)
+				G.add_node(target_node, deviceType=target_device_type)
+				G.add_edge(source_node, target_node, length=cable_length)  # add the connection to the graph
+				logger.debug(f"Added connection between '{source_node}' and '{target_node}' with a cable length of '{cable_length}'")
+
+		self.graph_connections = connections
+		self.graph_version = self.hardware.inventory_version
 		logger.debug(f"Returning graph data {type(G)}: "
 			f"total nodes: '{len(G.nodes)}', "
 			f"total edges: '{len(G.edges)}'"
@@ -247,10 +325,10 @@ class Nodes:
 		self.G = G
 		return G
 
-	# FIXME: scalance and module needs to be fixed they both get called JW sometimes
 	def getDeviceType(self, attribute):
 		"""
 		Returns the device type and color based on the given device name.
+		The rules are in 'core.classification.DEVICE_TYPE_RULES', the result is cached per attribute.
 
 		Parameters:
 		- attribute (str): The attribute of the device.
@@ -259,20 +337,7 @@ class Nodes:
 		- device_type (str): The type of the device.
 		- color (str): The color associated with the device type.
 		"""
-
-		types = [
-			('PLC', ['S71500'], 'red'),
-			('module', ['ET200SP', 'ET200ECO'], 'blue'), # give higher priority than drive, module type can contain SIEMENS and ET200SP
-			('scalance', ['SCALANCE'], 'green'),
-			('drive', ['SIEMENS', 'DFS', 'SEW'], 'yellow'),
-			('PNcoupler', ['PNPNCOUPLER'], 'orange'),
-			('other', [''], 'gray')
-		]
-
-		for deviceType, identifiers, color in types:
-			if any(identifier in attribute.upper() for identifier in identifiers):
-				return deviceType, color
-		return 'other', 'gray'
+		return self.classification.classify(attribute)
 
 
 	def display_graph_interactive(self, reload=False):
@@ -325,10 +390,12 @@ class Nodes:
 				)
 				edge_traces.append(hover_trace)
 
-			# Generate node traces
+			# Generate node traces, all the nodes are classified in one pass
 			node_traces = {}
-			for node, attrs in G.nodes(data=True):
-				device_type, color = self.getDeviceType(attrs.get('deviceType', ''))
+			nodes = list(G.nodes(data=True))
+			device_types = self.classification.classify_many([attrs.get('deviceType', '') for _, attrs in nodes])
+			for (node, attrs), device_type in zip(nodes, device_types):
+				color = DEVICE_TYPE_COLORS[device_type]
 				if device_type not in node_traces:
 					node_traces[device_type] = {
 						'x': [], 'y': [], 'text': [], 'hovertext': [], 'color': color
@@ -494,7 +561,7 @@ class Nodes:
 		)
 
 		search_result = f"Device '{deviceName}' not found in plc '{plcName}'"
-		device_df = pd.DataFrame()
+		device_df = TableBuilder(DEVICE_NODE_COLUMNS)
 
 		try:
 			plc_i_need = items[plcName]
@@ -506,15 +573,10 @@ class Nodes:
 					device_i_search = device_dict[deviceName][0]['nodes']
 					search_result = f"Device '{deviceName}' in plc '{plcName}' has been found with the following nodes:\n"
 					for node_name, node_address in device_i_search.items():
-						df_update = pd.DataFrame([{
-							'plc_name': plcName,
-							'device_name': deviceName,
-							'node_name': node_name,
-							'node_address': node_address
-							}])
-						device_df = pd.concat([device_df, df_update], ignore_index=True)
+						device_df.append(plc_name=plcName, device_name=deviceName, node_name=node_name, node_address=node_address)
 						search_result += f"\tNode '{node_name}' with address '{node_address}'\n"	
 
+			device_df = device_df.to_frame()
 			logger.debug(f"Returning search result {type(search_result)}, {search_result} of the node search")
 			self.device_df = device_df
 			return device_df, search_result
@@ -539,25 +601,24 @@ class Nodes:
 			f"reload: '{reload}'")
 		
 		search_result = f"Address '{address}' is not in use"
-		address_df = pd.DataFrame()
+		address_df = TableBuilder(DEVICE_NODE_COLUMNS)
 
 		for plc_name, plc_info in items.items(): # key-value pair in plc dictionary, returns list
 			for device in plc_info['devices']: # device is dictionary, plc_info['devices'] is list
 				for device_name, device_info in device.items():
 					nodes = device_info[0]['nodes']  # gives the dictionary with the nodes key
 					if address in nodes.values():  # checking if a value of a node is equal to the input address
-						df_update = pd.DataFrame([{
-							'plc_name': plc_name,
-							'device_name': device_name,
-							'node_name': [name for name, ip in nodes.items() if ip == address],
-							'node_address': [add for add in nodes.values()]
-							}])
-						address_df = pd.concat([address_df, df_update], ignore_index=True)
 						node_name = [name for name, ip in nodes.items() if ip == address]  # Vind de node_name
+						address_df.append(
+							plc_name=plc_name,
+							device_name=device_name,
+							node_name=node_name,
+							node_address=[add for add in nodes.values()]
+						)
 						search_result = f"Address '{address}' is already in use by '{device_name}' on port '{node_name}' connected to plc '{plc_name}'"
 		
 		logger.debug(f"Returning search result {type(search_result)} of the address search")
-		return address_df, search_result
+		return address_df.to_frame(), search_result
 
 
 	def export_data(self, filename, extension, tab, nodesUI):
@@ -0,0 +1,140 @@
+"""
+Bounded worker pool for the extraction of the core-modules.
+
+Most of the extraction time is spent waiting on Openness round-trips, the scheduler spreads independent work
+(stations, device groups, ...) over a configurable amount of worker threads. The results are always returned
+in the order of the input, so the output does not depend on the amount of workers.
+
+The default amount of workers is read from the 'OPENNESS_WORKERS' environment variable (1 if not set),
+which keeps the extraction sequential.
+
+Work that is scheduled from inside a worker (e.g. the bulk attribute reads of a PLC while the PLC's are extracted
+concurrently) runs on that worker, so nested fan-outs never exceed the bound of the pool.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+MAX_WORKERS = 32
+
+class Scheduler:
+	"""
+	Runs functions over a list of inputs on a bounded pool of worker threads.
+
+	Attributes:
+		workers (int): The degree of parallelism, 1 runs everything on the calling thread.
+		settings (dict): The settings of the scheduler.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.workers = self.check_workers(os.environ.get('OPENNESS_WORKERS', 1))
+		self.local = threading.local()
+		self.settings = {
+			'workers': self.workers
+		}
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully with settings: {self.settings}")
+
+
+	def check_workers(self, workers):
+		"""
+		Validates the amount of workers, it is clamped between 1 and MAX_WORKERS.
+
+		Args:
+			workers (int | str): The requested amount of workers.
+
+		Returns:
+			int: The amount of workers to use.
+		"""
+		try:
+			workers = int(workers)
+		except (TypeError, ValueError):
+			raise ValueError(f"Amount of workers '{workers}' is not a number")
+		return max(1, min(workers, MAX_WORKERS))
+
+
+	def map(self, function, inputs, workers=None):
+		"""
+		Calls the function for each input, spread over the worker pool.
+
+		Args:
+			function (callable): The function to call with a single input.
+			inputs (iterable): The inputs, e.g. the stations of the project.
+			workers (int, optional): Overrides the degree of parallelism for this call. Defaults to the scheduler setting.
+
+		Returns:
+			list: The results in the same order as the inputs.
+		"""
+		inputs = list(inputs)
+		workers = self.workers if workers is None else self.check_workers(workers)
+		workers = min(workers, len(inputs))
+
+		if workers <= 1 or getattr(self.local, 'in_worker', False):
+			return [function(item) for item in inputs]
+
+		def run(item):
+			self.local.in_worker = True
+			try:
+				return function(item)
+			finally:
+				self.local.in_worker = False
+
+		logger.debug(
+			f"Scheduling '{getattr(function, '__name__', function)}' over a pool of workers: "
+			f"inputs: '{len(inputs)}', "
+			f"workers: '{workers}'"
+		)
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='openness') as pool:
+			# Executor.map yields the results in input order and re-raises the first exception of a worker
+			return list(pool.map(run, inputs))
+
+
+	def map_plcs(self, function, plcs, workers=None):
+		"""
+		Runs the software work of each PLC (blocks, types, tags, ...) concurrently.
+
+		Args:
+			function (callable): The function to call with a single PLC.
+			plcs (list): The PLC devices, or the PLC names.
+			workers (int, optional): Overrides the degree of parallelism for this call. Defaults to the scheduler setting.
+
+		Returns:
+			dict: Maps the PLC name to the result of its work, in the order of the PLC's.
+		"""
+		plcs = list(plcs)
+		names = [getattr(plc, 'Name', plc) for plc in plcs]
+		logger.debug(f"Extracting the software of '{len(plcs)}' PLC's concurrently: '{getattr(function, '__name__', function)}'")
+		return dict(zip(names, self.map(function, plcs, workers=workers)))
+
+
+	def set_settings(self, settings):
+		"""
+		Sets the settings.
+
+		Args:
+			settings (dict): Dictionary containing the settings.
+		"""
+		logger.debug(f"Changing settings {self.settings} to {settings}")
+		self.workers = self.check_workers(settings.get('workers', self.workers))
+		self.settings = {
+			'workers': self.workers
+		}
+
+
+	def get_settings(self):
+		"""
+		Returns a string representation of the settings.
+
+		Returns:
+			str: A string representation of the settings.
+		"""
+		return str(self.settings)
@@ -0,0 +1,120 @@
+"""
+Shared resolver for the engineering services of the project objects (NetworkInterface, SoftwareContainer, ...).
+
+Every 'GetService' is a round-trip through the Openness bridge, the resolver caches the handle per object and
+per service type, also when the object does not expose the service (negative result), so each object is asked
+at most once per session. The cache is invalidated when the hardware is reloaded.
+The resolver is shared by the workers of the scheduler, the cache is guarded by a lock.
+"""
+
+import threading
+
+from core.backend import tia, hwf
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+class Services:
+	"""
+	Memoized resolver of engineering services.
+
+	Attributes:
+		cache (dict): Maps (engineering object, service type) to the service handle, None if the object does not expose it.
+		hits (int): Amount of lookups answered from the cache.
+		misses (int): Amount of lookups that needed a GetService call.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.cache = {}
+		self.hits = 0
+		self.misses = 0
+		self.lock = threading.Lock()
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_service(self, engineering_object, service_type):
+		"""
+		Retrieves the service of an engineering object, the GetService call is only made on the first lookup.
+
+		Args:
+			engineering_object (object): The object to get the service of (e.g. a device item).
+			service_type (type): The type of the service (e.g. hwf.NetworkInterface).
+
+		Returns:
+			object: The service handle, or None if the object does not expose the service.
+		"""
+		key = (engineering_object, service_type)
+		with self.lock:
+			if key in self.cache:
+				self.hits += 1
+				return self.cache[key]
+			self.misses += 1
+
+		# the round-trip is made outside the lock, so the workers do not wait on each other
+		try:
+			service = tia.IEngineeringServiceProvider(engineering_object).GetService[service_type]()
+		except Exception as e:
+			logger.debug(f"Could not resolve service '{getattr(service_type, '__name__', service_type)}' of '{engineering_object.Name}': {str(e)}")
+			service = None
+
+		if not isinstance(service, service_type):
+			service = None
+		with self.lock:
+			self.cache[key] = service
+		return service
+
+
+	def get_network_interface(self, engineering_object):
+		return self.get_service(engineering_object, hwf.NetworkInterface)
+
+
+	def get_software_container(self, engineering_object):
+		return self.get_service(engineering_object, hwf.SoftwareContainer)
+
+
+	def has_service(self, engineering_object, service_type):
+		return self.get_service(engineering_object, service_type) is not None
+
+
+	def invalidate(self, engineering_object=None):
+		"""
+		Clears the cached services, of one object or of all the objects.
+
+		Args:
+			engineering_object (object, optional): The object to forget, defaults to None which clears the whole cache.
+		"""
+		if engineering_object is None:
+			logger.debug(
+				f"Invalidating the service cache: "
+				f"cached entries: '{len(self.cache)}', "
+				f"hits: '{self.hits}', "
+				f"misses: '{self.misses}'"
+			)
+			with self.lock:
+				self.cache = {}
+				self.hits = 0
+				self.misses = 0
+			return
+
+		with self.lock:
+			for key in [key for key in self.cache if key[0] is engineering_object]:
+				del self.cache[key]
+
+
+	def invalidate_many(self, engineering_objects):
+		"""
+		Clears the cached services of a batch of objects, e.g. the device items of the changed stations.
+
+		Args:
+			engineering_objects (iterable): The objects to forget.
+		"""
+		engineering_objects = set(engineering_objects)
+		if not engineering_objects:
+			return
+		with self.lock:
+			self.cache = {key: service for key, service in self.cache.items() if key[0] not in engineering_objects}
@@ -3,17 +3,14 @@ Author: Quinten Bauwens
 Last updated: 05/08/2024
 """
 
-import clr
-import System
-# add the reference to the Siemens.Engineering.dll
-clr.AddReference("C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll") 
-import Siemens.Engineering.HW.Features as hwf
-import Siemens.Engineering as tia
-
+from core.attributes import TAG_ATTRIBUTES
+from core.backend import System
 from utils.loggerConfig import get_logger
 
 logger = get_logger(__name__)
 
+TAG_BATCH_SIZE = 1000
+
 class Software:
 	"""
 	Represents the extraction of software components in the system/plc by using the PLC-software container.
@@ -40,10 +37,19 @@ class Software:
 
 		self.software_container = {}
 		self.search_results = {}
+		# the caches are scoped per group (and per option), so the groups of different PLC's do not collide
+		self.software_blocks_dict = {}
+		self.software_blocks_list = {}
+		self.software_types = {}
+		self.tags = {}
 		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
 
 	def get_core_classes(self):
 		self.hardware = self.project.hardware
+		self.services = self.project.services
+		self.catalog = self.project.catalog
+		self.attributes = self.project.attributes
+		self.scheduler = self.project.scheduler
 
 	def get_core_functions(self):
 		logger.debug(f"Accessing 'get_plc_devices' from the hardware object '{self.project.hardware}'...")
@@ -73,7 +79,7 @@ class Software:
 			f"object type: '{self.PLC_list[0].GetType()}'"
 		)
 		for plc in self.PLC_list:
-			self.software_container[plc.Name] = tia.IEngineeringServiceProvider(plc).GetService[hwf.SoftwareContainer]().Software
+			self.software_container[plc.Name] = self.services.get_software_container(plc).Software
 
 		logger.debug(
 			f"Returning {type(self.software_container)} of software containers: "
@@ -96,13 +102,14 @@ class Software:
 			Exception: If there is an error retrieving the software blocks.
 		"""
 
-		if not reload:
-			if include_group and hasattr(self, 'software_blocks_dict'):
-				logger.debug(f"Returning the cached dict {type(self.software_blocks_dict)} of all the software blocks in the project: '{len(self.software_blocks_dict)}'...")
-				return self.software_blocks_dict
-			elif not include_group and hasattr(self, 'software_blocks_list'):
-				logger.debug(f"Returning the cached list {type(self.software_blocks_list)} of all the software blocks in the project: '{len(self.software_blocks_list)}'...")
-				return self.software_blocks_list
+		cache_key = (group, include_safety_blocks)
+		if initial_call and not reload:
+			if include_group and group in self.software_blocks_dict:
+				logger.debug(f"Returning the cached dict {type(self.software_blocks_dict[group])} of all the software blocks in group '{group.Name}': '{len(self.software_blocks_dict[group])}'...")
+				return self.software_blocks_dict[group]
+			elif not include_group and cache_key in self.software_blocks_list:
+				logger.debug(f"Returning the cached list {type(self.software_blocks_list[cache_key])} of all the software blocks in group '{group.Name}': '{len(self.software_blocks_list[cache_key])}'...")
+				return self.software_blocks_list[cache_key]
 		
 		logger.debug(
 			f"Retrieving all software blocks recursively from the project starting at group '{group.Name}': "
@@ -131,7 +138,7 @@ class Software:
 					f"amount of blocks: '{len(blocks)}', "
 					f"object type: '{blocks[0].GetType()}'"
 				)
-				self.software_blocks_list = blocks
+				self.software_blocks_list[cache_key] = blocks
 			return blocks
 
 		try:
@@ -157,14 +164,15 @@ class Software:
 				f"amount of blocks: '{len(blocks.values())}', "
 				f"object type: '{blocks[0].GetType() if type(blocks) == list else next(iter(blocks.keys())).GetType()}'"
 			)
-			self.software_blocks_dict = blocks
+			self.software_blocks_dict[group] = blocks
 		return blocks
 
 
 	def get_software_types(self, group, types=None, include_system_types=False, reload=False, initial_call=True) -> list:
-		if hasattr(self, 'software_types') and not reload:
-			logger.debug(f"Returning the cached list {type(self.software_types)} of all the software types in the project: '{len(self.software_types)}'...")
-			return self.software_types
+		cache_key = (group, include_system_types)
+		if initial_call and cache_key in self.software_types and not reload:
+			logger.debug(f"Returning the cached list {type(self.software_types[cache_key])} of all the software types in group '{group.Name}': '{len(self.software_types[cache_key])}'...")
+			return self.software_types[cache_key]
 		
 		logger.debug(
 			f"Retrieving all software types recursively from the project starting at group: '{group.Name}': " 
@@ -182,7 +190,7 @@ class Software:
 				self.get_software_types(sub_group, types, reload=reload, initial_call=False)
 		
 		if include_system_types:
-			self.get_software_types(group.SystemTypeGroups[0], types)
+			self.get_software_types(group.SystemTypeGroups[0], types, reload=reload, initial_call=False)
 		
 		if initial_call:
 			logger.debug(
@@ -190,13 +198,14 @@ class Software:
 				f"amount of types: '{len(types)}', "
 				f"object type: '{types[0].GetType()}'"
 			)
-			self.software_types = types
+			self.software_types[cache_key] = types
 		return types
 
-	# TODO: Doesnt include systemBlocks
 	def find_block(self, group, block_name, block_number=None, reload=False, initial_call=True) -> object:
 		"""
 		Retrieves a software block with the given name.
+		The root block group of a PLC is looked up in the block catalog (system blocks included),
+		other groups are searched recursively.
 
 		Parameters:
 		- block_name (str): The name of the software block to retrieve.
@@ -204,6 +213,14 @@ class Software:
 		Returns:
 		- block: The software block with the given name, or None if not found.
 		"""
+		if initial_call:
+			plc_name = self.catalog.get_group_plc(group)
+			if plc_name is not None:
+				# a reload only reads the blocks of this PLC again, not the catalog of the whole project
+				if reload:
+					self.catalog.get_plc_table(plc_name, reload=True)
+				return self.catalog.get_block(block_name, plc_name, number=block_number)
+
 		if block_name in self.search_results and not reload:
 			logger.debug(f"Returning the cached software block-object '{self.search_results[block_name].GetType()}': '{block_name}'...")
 			return self.search_results[block_name]
@@ -249,40 +266,40 @@ class Software:
 		Returns:
 			dict: A dictionary containing all the project tags. The keys are the table names and the values are sets of tags.
 		"""
-		if hasattr(self, 'tags') and not reload:
-			logger.debug(f"Returning the cached list {type(self.tags)} of all the tags in the project: '{len(self.tags)}'...")
-			return self.tags
+		if group in self.tags and not reload:
+			logger.debug(f"Returning the cached list {type(self.tags[group])} of all the tags in the project: '{len(self.tags[group])}'...")
+			return self.tags[group]
 		
 		logger.debug(
 			f"Retrieving all tags recursively from the project: "
 			f"reload: '{reload}'"
 		) if initial_call else None
 
-		tags = {}
-
-		def retrieve_tags_from_table(group):
-			for table in group.TagTables:
-				current_table = group.TagTables.IndexOf(table) + 1
+		def retrieve_tags_from_table(group, tags):
+			total_table = group.TagTables.Count
+			for current_table, table in enumerate(group.TagTables, start=1):
 				self.update_progress_bar(current_table, total_table)
 				if table not in tags:
 					tags[table] = set(table.Tags)
 				else:
 					tags[table].update(table.Tags)
 			for sub_group in group.Groups:
-				retrieve_tags_from_table(sub_group)
+				retrieve_tags_from_table(sub_group, tags)
+			return tags
 		
 		if group is None: 
-			# get tags from all groups
-			for plc in self.PLC_list:
-				group = self.software_container[plc.Name].TagTableGroup
-				total_table = group.TagTables.Count 
-				retrieve_tags_from_table(group)
+			# get tags from all groups, the PLC's are read concurrently and merged in the order of the PLC's
+			software_container = self.get_software_container(reload=reload)
+			plc_tags = self.scheduler.map_plcs(lambda plc_name: retrieve_tags_from_table(software_container[plc_name].TagTableGroup, {}), list(software_container.keys()))
+			tags = {}
+			for tables in plc_tags.values():
+				tags.update(tables)
 		else: 
 			# get tags from a specific group
-			retrieve_tags_from_table(group)
+			tags = retrieve_tags_from_table(group, {})
 		
 		if initial_call:
-			self.tags = tags
+			self.tags[group] = tags
 
 		table_object = next(iter(tags.keys()))
 		tag_object = next(iter(tags[table_object])) if tags[table_object] else None
@@ -296,6 +313,67 @@ class Software:
 		return tags
 
 
+	def get_tag_tables(self, group):
+		"""
+		Retrieves the tag tables of a tag table group and its subgroups (depth first), without reading the tags.
+
+		Returns:
+			list: The tag tables.
+		"""
+		tables = list(group.TagTables)
+		for sub_group in group.Groups:
+			tables.extend(self.get_tag_tables(sub_group))
+		return tables
+
+
+	def iter_project_tags(self, batch_size=TAG_BATCH_SIZE, reload=False):
+		"""
+		Streams the tags of all the PLC's as batches of plain rows, a table with more tags than the batch size is split over several batches.
+		Only the tags of one window of tables (a table per worker) are held at a time, the attributes of a batch are read with one bulk read per tag.
+
+		Args:
+			batch_size (int, optional): The maximum amount of tags in a batch. Defaults to TAG_BATCH_SIZE.
+
+		Yields:
+			tuple: The PLC name, the tag table name, the rows of the batch (a dict per tag with the TAG_ATTRIBUTES and 'Comment')
+			and the progress (0-100) after the batch.
+		"""
+		software_container = self.get_software_container(reload=reload)
+		tables = [
+			(plc_name, table)
+			for plc_name, software in software_container.items()
+			for table in self.get_tag_tables(software.TagTableGroup)
+		]
+		logger.debug(
+			f"Streaming the tags of all the tag tables in the project: "
+			f"tag tables: '{len(tables)}', "
+			f"batch size: '{batch_size}', "
+			f"reload: '{reload}'"
+		)
+
+		def read_table(entry):
+			_, table = entry
+			tags = list(table.Tags)
+			batches = []
+			for start in range(0, max(len(tags), 1), batch_size):
+				batch = tags[start:start + batch_size]
+				rows = self.attributes.read(batch, TAG_ATTRIBUTES)
+				for tag, row in zip(batch, rows):
+					row['Comment'] = ''.join(item.Text for item in tag.Comment.Items)
+				batches.append(rows)
+			return batches
+
+		# a window of tables (one per worker) is read concurrently, the batches are yielded in the order of the tables
+		window = self.scheduler.workers
+		for first in range(0, len(tables), window):
+			entries = tables[first:first + window]
+			for table_index, (plc_name, table), batches in zip(range(first, first + window), entries, self.scheduler.map(read_table, entries)):
+				table_name = table.Name
+				for batch_index, rows in enumerate(batches):
+					progress = (table_index + (batch_index + 1) / len(batches)) / len(tables) * 100
+					yield plc_name, table_name, rows, progress
+
+
 	def update_progress_bar(self, value, total):
 		"""
 		Updates the progress bar with the given value.
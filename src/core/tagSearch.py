@@ -0,0 +1,298 @@
+"""
+Indexed search over the tags of all the PLC's (the 'project tags' dataframe of 'File.show_tagTables').
+
+Three indexes are built once per extraction of the tags:
+	- name trigrams: a wildcard or regex query is narrowed down to the tags that contain all the trigrams of its
+	  literal parts, only those candidates are matched against the pattern
+	- comment tokens: the words of the comments, also searchable by prefix ('mot*')
+	- addresses: the bit ranges of the logical addresses per area, see 'addressSpace.IntervalIndex'
+
+Name and comment queries are case-insensitive.
+"""
+
+import re
+import fnmatch
+from bisect import bisect_left, bisect_right
+
+try:
+	from re import _parser as sre_parse
+except ImportError:
+	import sre_parse
+
+import numpy as np
+import pandas as pd
+
+from core.addressSpace import IntervalIndex, bit_ranges, parse_logical_addresses
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+WILDCARDS = r'\*|\?|\[[^\]]*\]'
+TOKEN_PATTERN = r'\w+'
+# %I12-20, I12..I20, %QB4-%QB8: a range of bytes
+ADDRESS_RANGE_PATTERN = r'^%?([IQM])[XBWD]?(\d+)\s*(?:-|\.\.)\s*(?:%?[IQM][XBWD]?)?(\d+)$'
+SEARCH_MODES = ('name', 'regex', 'comment', 'address')
+
+
+def trigrams(text):
+	return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def regex_literals(pattern):
+	"""
+	Returns the literal runs of a regex that every match has to contain (the literals at the top level of the pattern).
+	A pattern with an alternation at the top level has no required literals.
+	"""
+	try:
+		parsed = sre_parse.parse(pattern)
+	except re.error:
+		return []
+	literals, run = [], ''
+	for op, value in parsed:
+		if op == sre_parse.LITERAL:
+			run += chr(value)
+			continue
+		literals.append(run)
+		run = ''
+		if op == sre_parse.BRANCH:
+			return []
+	literals.append(run)
+	return [literal.lower() for literal in literals if literal]
+
+
+class TagSearch:
+	"""
+	Searches the tags of all the PLC's by name (wildcards or regex), comment and address.
+
+	Attributes:
+		tags (pandas.DataFrame): The indexed 'project tags' dataframe.
+		name_index (dict): Maps a trigram of the lowercase tag names to the sorted row positions.
+		token_index (dict): Maps a lowercase comment word to the sorted row positions.
+		address_index (dict): Maps an address area ('I', 'Q', 'M') to the IntervalIndex of the tag bits.
+	"""
+
+	def __init__(self, project):
+		logger.debug(f"Initializing '{__name__.split('.')[-1]}' instance")
+		self.project = project
+		self.myproject = project.myproject
+		self.myinterface = project.myinterface
+
+		self.source = None
+		self.tags = None
+		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
+
+
+	def get_core_classes(self):
+		self.file = self.project.file
+
+
+	def get_index(self, reload=False):
+		"""
+		Builds the indexes on the 'project tags' dataframe, again when the tags were extracted again.
+
+		Returns:
+			pandas.DataFrame: The indexed tags.
+		"""
+		source = self.file.show_tagTables(reload=reload)
+		if source is self.source and not reload:
+			return self.tags
+
+		# the positions in the indexes are the row positions
+		tags = source.reset_index(drop=True)
+		names = tags['Tag'].fillna('').astype(str).str.lower()
+		name_index = {}
+		for position, name in enumerate(names):
+			for trigram in trigrams(name):
+				name_index.setdefault(trigram, []).append(position)
+
+		token_index = {}
+		for position, comment in enumerate(tags['comment'].fillna('').astype(str).str.lower()):
+			for token in set(re.findall(TOKEN_PATTERN, comment)):
+				token_index.setdefault(token, []).append(position)
+
+		ranges = parse_logical_addresses(tags['LogAddr'])
+		ranges = ranges.dropna(subset=['Area', 'Start', 'End']).astype({'Start': 'int64', 'End': 'int64', 'Bit': 'int64'})
+		address_index = {
+			area: IntervalIndex(*bit_ranges(ranges.loc[labels]), labels)
+			for area, labels in ranges.groupby('Area').groups.items()
+		}
+
+		self.names = names
+		self.name_index = {trigram: np.array(positions, dtype='int64') for trigram, positions in name_index.items()}
+		self.token_index = {token: np.array(positions, dtype='int64') for token, positions in token_index.items()}
+		self.tokens = sorted(self.token_index)
+		self.address_index = address_index
+		self.source = source
+		self.tags = tags
+		logger.debug(
+			f"Built the tag search indexes: "
+			f"tags: '{len(tags)}', "
+			f"trigrams: '{len(self.name_index)}', "
+			f"comment words: '{len(self.token_index)}', "
+			f"address areas: {list(address_index.keys())}"
+		)
+		return self.tags
+
+
+	def get_name_candidates(self, literals):
+		"""
+		Returns the row positions of the tags whose name contains all the trigrams of the literals, None if the literals
+		are too short to narrow down the search (all tags are candidates).
+		"""
+		grams = set().union(*(trigrams(literal) for literal in literals)) if literals else set()
+		if not grams:
+			return None
+		postings = sorted((self.name_index.get(gram, np.empty(0, dtype='int64')) for gram in grams), key=len)
+		candidates = postings[0]
+		for posting in postings[1:]:
+			if not len(candidates):
+				break
+			candidates = np.intersect1d(candidates, posting, assume_unique=True)
+		return candidates
+
+
+	def match_names(self, regex, literals, anywhere=False):
+		candidates = self.get_name_candidates(literals)
+		names = self.names if candidates is None else self.names.iloc[candidates]
+		match = regex.search if anywhere else regex.match
+		matches = np.fromiter((match(name) is not None for name in names), dtype=bool, count=len(names))
+		return names.index.to_numpy()[matches]
+
+
+	def find_name(self, pattern):
+		"""
+		Finds tags by name, with the wildcards '*', '?' and '[...]'. A pattern without wildcards matches anywhere in the name.
+
+		Returns:
+			numpy.ndarray: The row positions of the matching tags.
+		"""
+		pattern = str(pattern).strip().lower()
+		if not re.search(WILDCARDS, pattern):
+			pattern = f"*{pattern}*"
+		literals = [literal for literal in re.split(WILDCARDS, pattern) if literal]
+		return self.match_names(re.compile(fnmatch.translate(pattern)), literals)
+
+
+	def find_regex(self, pattern):
+		"""
+		Finds tags with a name that matches the regex (anywhere in the name, case-insensitive).
+
+		Returns:
+			numpy.ndarray: The row positions of the matching tags.
+		"""
+		try:
+			regex = re.compile(pattern, re.IGNORECASE)
+		except re.error as e:
+			raise ValueError(f"Invalid regex '{pattern}': {str(e)}")
+		literals = regex_literals(pattern) if not regex.flags & re.VERBOSE else []
+		return self.match_names(regex, literals, anywhere=True)
+
+
+	def find_comment(self, text):
+		"""
+		Finds tags with all the words of the text in their comment, a word ending on '*' matches every word with that prefix.
+
+		Returns:
+			numpy.ndarray: The row positions of the matching tags.
+		"""
+		result = None
+		for word in re.findall(r'\w+\*?', str(text).lower()):
+			if word.endswith('*'):
+				prefix = word[:-1]
+				start = bisect_left(self.tokens, prefix)
+				end = bisect_right(self.tokens, prefix + '\U0010ffff', lo=start)
+				postings = [self.token_index[token] for token in self.tokens[start:end]]
+				positions = np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype='int64')
+			else:
+				positions = self.token_index.get(word, np.empty(0, dtype='int64'))
+			result = positions if result is None else np.intersect1d(result, positions, assume_unique=True)
+		return np.empty(0, dtype='int64') if result is None else result
+
+
+	def find_address(self, address):
+		"""
+		Finds the tags that use (a part of) an address or a byte range, e.g. '%I12.3', 'QW4' or 'I12-20'.
+
+		Returns:
+			numpy.ndarray: The row positions of the matching tags.
+		"""
+		address = str(address).strip().upper()
+		byte_range = re.match(ADDRESS_RANGE_PATTERN, address)
+		if byte_range:
+			area, start, end = byte_range.group(1), int(byte_range.group(2)), int(byte_range.group(3))
+			first_bit, last_bit = min(start, end) * 8, max(start, end) * 8 + 7
+		else:
+			parsed = parse_logical_addresses(pd.Series([address if address.startswith('%') else f"%{address}"]))
+			if parsed['Area'].isna().iat[0]:
+				raise ValueError(f"Address '{address}' is not an I, Q or M address")
+			area = parsed['Area'].iat[0]
+			parsed = parsed.astype({'Start': 'int64', 'End': 'int64', 'Bit': 'int64'})
+			first_bits, last_bits = bit_ranges(parsed)
+			first_bit, last_bit = int(first_bits.iat[0]), int(last_bits.iat[0])
+
+		index = self.address_index.get(area)
+		if index is None:
+			return np.empty(0, dtype='int64')
+		return np.sort(index.query(first_bit, last_bit))
+
+
+	def search(self, name=None, regex=None, comment=None, address=None, plc=None, limit=None, reload=False):
+		"""
+		Searches the tags of all the PLC's, the tags have to match all the given criteria.
+
+		Args:
+			name (str, optional): Wildcard pattern of the tag name, see 'find_name'.
+			regex (str, optional): Regex of the tag name, see 'find_regex'.
+			comment (str, optional): Words of the comment, see 'find_comment'.
+			address (str, optional): Address or byte range, see 'find_address'.
+			plc (str, optional): Only return the tags of this PLC.
+			limit (int, optional): The maximum amount of tags to return.
+
+		Returns:
+			pandas.DataFrame: The matching rows of the 'project tags' dataframe.
+		"""
+		tags = self.get_index(reload=reload)
+		criteria = [
+			(self.find_name, name),
+			(self.find_regex, regex),
+			(self.find_comment, comment),
+			(self.find_address, address),
+		]
+		positions = None
+		for find, query in criteria:
+			if query is None or str(query).strip() == '':
+				continue
+			found = find(query)
+			positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+
+		result = tags if positions is None else tags.iloc[positions]
+		if plc is not None:
+			result = result[result['plc'] == plc]
+		if limit is not None:
+			result = result.head(limit)
+		logger.debug(
+			f"Searched the tags: "
+			f"name: '{name}', "
+			f"regex: '{regex}', "
+			f"comment: '{comment}', "
+			f"address: '{address}', "
+			f"plc: '{plc}', "
+			f"found: '{len(result)}'"
+		)
+		return result
+
+
+	def search_mode(self, mode, query, plc=None, reload=False):
+		"""
+		Searches with a single criterium, e.g. the mode and the text of a search field.
+
+		Args:
+			mode (str): One of SEARCH_MODES: 'name', 'regex', 'comment' or 'address'.
+			query (str): The query text.
+
+		Returns:
+			pandas.DataFrame: The matching rows of the 'project tags' dataframe.
+		"""
+		if mode not in SEARCH_MODES:
+			raise ValueError(f"Search mode '{mode}' not supported, use one of {SEARCH_MODES}")
+		return self.search(plc=plc, reload=reload, **{mode: query})
@@ -4,17 +4,22 @@ Last updated: 09/07/2024
 """
 
 import threading
+import time
 import tkinter as tk
 import pandas as pd
 from tkinter import ttk, scrolledtext, messagebox
 from pandastable import Table
 
+from core.tagSearch import SEARCH_MODES
 from utils.tabUI import Tab
 from utils.dialogsUI import ExportDataDialog
 from utils.loggerConfig import get_logger
 
 logger = get_logger(__name__)
 
+# seconds between the updates of the tags table while the tag tables stream in
+TAG_UPDATE_INTERVAL = 0.5
+
 class TabSummary(Tab):
 	'''class to create the menu sub-items for the file head-item in the main menu'''
 
@@ -70,6 +75,8 @@ class FileUI:
 		self.btn_export_output = None
 		self.loading_thread = None
 		self.tab_summary = None
+		self.tag_batches = None # batches of the tag tables that are streaming in, None when not loading
+		self.tag_batches_shown = 0
 
 		self.initialize_file()
 		logger.debug(f"Initialized '{__name__.split('.')[-1]}' instance successfully")
@@ -176,6 +183,89 @@ class FileUI:
 		self.table_frame = ttk.Frame(self.section1)
 		self.table_frame.grid(row=0, column=0, sticky="nsew")
 
+		# section 3 for searching the tags of all the PLC's
+		section3 = ttk.Frame(self.frame)
+		section3.grid(row=0, padx=10, pady=10)
+
+		ttk.Label(section3, text="search tags").grid(row=0, column=0, pady=5, padx=5)
+
+		self.entry_tag_search = ttk.Entry(section3)
+		self.entry_tag_search.grid(row=0, column=1, pady=5, padx=5)
+		self.entry_tag_search.bind("<Return>", lambda event: self.search_tags())
+
+		self.combo_search_mode = ttk.Combobox(section3, values=SEARCH_MODES, state="readonly", width=10)
+		self.combo_search_mode.current(0)
+		self.combo_search_mode.grid(row=0, column=2, pady=5, padx=5)
+
+		self.btn_search_tags = ttk.Button(section3, text="Search", command=self.search_tags)
+		self.btn_search_tags.grid(row=0, column=3, pady=5, padx=5)
+		self.btn_clear_search = ttk.Button(section3, text="Clear", command=self.clear_tag_search)
+		self.btn_clear_search.grid(row=0, column=4, pady=5, padx=5)
+
+		section3.columnconfigure(1, weight=1)
+
+
+	def search_tags(self):
+		'''filters the tags table on the search field, the search runs on the indexes of 'TagSearch' '''
+		if not hasattr(self, 'pt') or self.tags_streaming():
+			return
+		query = self.entry_tag_search.get()
+		if not query.strip():
+			self.clear_tag_search()
+			return
+
+		mode = self.combo_search_mode.get()
+		try:
+			result = self.project.tagsearch.search_mode(mode, query)
+			self.pt.model.df = result.reset_index(drop=True)
+			self.pt.redraw()
+			message = f"Found '{len(result)}' tags with {mode} '{query}'"
+			logger.debug(message)
+			self.status_icon.change_icon_status("#00FF00", message)
+		except ValueError as e:
+			logger.warning(f"Invalid tag search: {str(e)}")
+			self.status_icon.change_icon_status("#FFFF00", str(e))
+		except Exception as e:
+			message = f"Failed to search the tags:"
+			logger.error(message, exc_info=True)
+			self.status_icon.change_icon_status("#FF0000", f'{message} {str(e)}')
+
+
+	def clear_tag_search(self):
+		if not hasattr(self, 'pt') or self.tags_streaming():
+			return
+		self.entry_tag_search.delete(0, tk.END)
+		self.pt.model.df = self.file.show_tagTables()
+		self.pt.redraw()
+
+
+	def tags_streaming(self):
+		'''checks whether the tag tables are still streaming in, the search needs all the tags'''
+		if self.tag_batches is None:
+			return False
+		self.status_icon.change_icon_status("#FFFF00", "The tag tables are still loading, search when all the tags are loaded")
+		return True
+
+
+	def show_tag_batch(self, tab, frame):
+		'''callback of 'File.show_tagTables': shows the first tag tables while the rest stream in'''
+		self.tag_batches.append(frame)
+		now = time.monotonic()
+		if now - self.tag_batches_shown < TAG_UPDATE_INTERVAL:
+			return
+		tags = pd.concat(self.tag_batches, ignore_index=True)
+		if not self.tag_batches_shown:
+			# the loading screen covers the table, the progress is shown in the status bar from here on
+			tab.loading_screen.hide_loading()
+			self.pt = Table(self.table_frame, dataframe=tags, showtoolbar=True, showstatusbar=True)
+			self.pt.grid(row=0, column=0, sticky="nsew")
+			self.pt.show()
+		else:
+			self.pt.model.df = tags
+		self.pt.redraw()
+		self.tag_batches_shown = now
+		self.status_icon.change_icon_status("#FFFF00", f"Loaded '{len(tags)}' tags, loading the remaining tag tables...")
+
 
 	def _start_thread(self, tab, reload=False):
 		logger.thread(f"Starting thread for '{tab.name}'...")
@@ -254,15 +344,26 @@ class FileUI:
 						logger.warning(content)
 						self.status_icon.change_icon_status("#FFFF00", content)
 				elif tab.name == "project tags":
-					content = self.file.show_tagTables(reload=reload)
+					self.tag_batches, self.tag_batches_shown = [], 0
+					try:
+						content = self.file.show_tagTables(reload=reload, on_batch=lambda frame: self.show_tag_batch(tab, frame))
+					finally:
+						streamed = self.tag_batches_shown
+						self.tag_batches = None
 					logger.debug(f"Inserting tags into table if there has been a dataframe retrieved: '{isinstance(content, pd.DataFrame)}'")
 					if isinstance(content, pd.DataFrame):
-						# create the table, allowing it to expand to fill all available space
 						self.enable_buttons()
-						self.pt = Table(self.table_frame, dataframe=content, showtoolbar=True, showstatusbar=True)
-						self.pt.grid(row=0, column=0, sticky="nsew")
-						self.pt.show()
+						if streamed:
+							# the table of the first tag tables gets all the tags
+							self.pt.model.df = content
+						else:
+							# create the table, allowing it to expand to fill all available space
+							self.pt = Table(self.table_frame, dataframe=content, showtoolbar=True, showstatusbar=True)
+							self.pt.grid(row=0, column=0, sticky="nsew")
+							self.pt.show()
 						self.pt.redraw() # redraw the table to ensure the table isnt empty
+						if self.entry_tag_search.get().strip():
+							self.search_tags() # keep the search filter after a refresh
 					else:
 						raise Exception(f"Failed to show content in '{tab.name}' due to retrieved content not being a dataframe: '{type(content)}'")
 				logger.debug(f"Content '{type(content)}' for tab '{tab.name}' has been set successfully")
@@ -337,6 +337,8 @@ class LibraryUI:
 
 		if tab.name == "content":
 			settings = [key for key in self.library.settings.keys() if key != 'warning_column']
+		elif tab.name == "validate project blocks":
+			settings = [key for key in self.library.settings.keys() if key != 'version_status']
 		default_values = [self.library.settings[key] for key in settings]
 		
 		try:
@@ -349,7 +351,12 @@ class LibraryUI:
 
 		if self.selected_settings:
 			logger.debug(f"Settings retrieved successfully after closing settings window: {self.selected_settings}")
-			self._start_thread(tab)
+			if self.library.get_view('library' if tab.name == "content" else 'used_lib_blocks') is None:
+				self._start_thread(tab)
+			else:
+				# the settings only select rows and columns of the extracted table, no thread or reload needed
+				self._load_content(tab)
+				self.on_thread_finished(tab)
 
 
 	def get_dataframe_info(self, tab):
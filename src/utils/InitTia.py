@@ -4,9 +4,9 @@ Author: Quinten Bauwens
 Last updated: 09/07/2024
 """
 
+import os
 from utils.loggerConfig import get_logger
 __package__ = "utils"
-import clr
 
 logger = get_logger(__name__)
 
@@ -23,12 +23,21 @@ def open_project(interface=False, project_path=None):
     Example:
         myproject, mytia = open_project(interface=True, project_path="C:/path/to/project.tia")
     """
+    from core import backend
+    if backend.get_backend_name() == 'fake':
+        # in-memory synthetic project, used to run and profile the app without TIA Portal
+        from core.fake.generator import generate_portal
+        project_name = os.path.splitext(os.path.basename((project_path or '').replace('\\', '/')))[0] or 'P000000A01'
+        logger.debug(f"Generating synthetic project '{project_name}' with the fake Openness backend")
+        return generate_portal(name=project_name)
+
     # Refference to the Openness library
     if interface:
         logger.debug(f"Opening TIA project with interface: '{project_path}'")
     else:
         logger.debug(f"Opening TIA project without interface: '{project_path}'")
     
+    import clr
     dll_path = "C:\\Program Files\\Siemens\\Automation\\Portal V15_1\\PublicAPI\\V15.1\\Siemens.Engineering.dll"
     clr.AddReference(dll_path)
 
@@ -0,0 +1,146 @@
+"""
+Dependency graph of the library type versions, with its transitive closure.
+
+The edges and the closure are stored in compressed sparse rows (CSR): the neighbours of node 'n' are
+'indices[indptr[n]:indptr[n + 1]]', sorted. The closure is computed once (in topological order, every node unions the
+closures of its direct neighbours), after that "what depends on X" and "what does X pull in" are array slices.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+
+def to_csr(nodes, sources, targets):
+	"""
+	Packs the edges in compressed sparse rows, duplicate edges and self loops are dropped.
+
+	Args:
+		nodes (int): The amount of nodes.
+		sources (numpy.ndarray): The source node of every edge.
+		targets (numpy.ndarray): The target node of every edge.
+
+	Returns:
+		tuple: The (indptr, indices) arrays, the targets of every source sorted.
+	"""
+	sources = np.asarray(sources, dtype='int64')
+	targets = np.asarray(targets, dtype='int64')
+	keep = sources != targets
+	edges = np.unique(np.stack([sources[keep], targets[keep]], axis=1), axis=0) if keep.any() else np.empty((0, 2), dtype='int64')
+	indptr = np.zeros(nodes + 1, dtype='int64')
+	np.cumsum(np.bincount(edges[:, 0], minlength=nodes), out=indptr[1:])
+	return indptr, edges[:, 1].copy()
+
+
+def transitive_closure(indptr, indices):
+	"""
+	Computes the nodes reachable from every node.
+	The nodes are handled in reverse topological order so each node unions the finished closures of its neighbours,
+	the nodes on a cycle (not expected in a library) fall back to a breadth first search.
+
+	Returns:
+		tuple: The (indptr, indices) arrays of the closure, a node is not in its own closure.
+	"""
+	nodes = len(indptr) - 1
+	neighbours = [indices[indptr[node]:indptr[node + 1]] for node in range(nodes)]
+
+	# Kahn's algorithm on the reversed edges: a node is ready when all the nodes it reaches are done
+	remaining = np.diff(indptr)
+	predecessors = [[] for _ in range(nodes)]
+	for node in range(nodes):
+		for neighbour in neighbours[node]:
+			predecessors[neighbour].append(node)
+	ready = deque(node for node in range(nodes) if remaining[node] == 0)
+
+	closures = [None] * nodes
+	while ready:
+		node = ready.popleft()
+		closure = set(neighbours[node].tolist())
+		for neighbour in neighbours[node]:
+			closure.update(closures[neighbour])
+		closures[node] = closure
+		for predecessor in predecessors[node]:
+			remaining[predecessor] -= 1
+			if remaining[predecessor] == 0:
+				ready.append(predecessor)
+
+	cyclic = [node for node in range(nodes) if closures[node] is None]
+	for node in cyclic:
+		closure, queue = set(), deque([node])
+		while queue:
+			for neighbour in neighbours[queue.popleft()].tolist():
+				if neighbour not in closure:
+					closure.add(neighbour)
+					queue.append(neighbour)
+		closure.discard(node)
+		closures[node] = closure
+	if cyclic:
+		logger.warning(f"Dependency graph has '{len(cyclic)}' nodes on a cycle")
+
+	lengths = np.fromiter((len(closure) for closure in closures), dtype='int64', count=nodes)
+	closure_indptr = np.zeros(nodes + 1, dtype='int64')
+	np.cumsum(lengths, out=closure_indptr[1:])
+	closure_indices = np.fromiter((node for closure in closures for node in sorted(closure)), dtype='int64', count=int(lengths.sum()))
+	return closure_indptr, closure_indices
+
+
+class DependencyGraph:
+	"""
+	Directed graph of the nodes 0 to 'nodes - 1', an edge points from a node to a node it depends on.
+
+	Args:
+		nodes (int): The amount of nodes.
+		sources (sequence): The node of every edge that depends on the target.
+		targets (sequence): The node of every edge that is depended on.
+
+	Attributes:
+		dependencies (tuple): CSR (indptr, indices) of the direct dependencies of every node.
+		dependents (tuple): CSR (indptr, indices) of the direct dependents of every node.
+	"""
+
+	def __init__(self, nodes, sources, targets):
+		self.nodes = nodes
+		self.dependencies = to_csr(nodes, sources, targets)
+		self.dependents = to_csr(nodes, targets, sources)
+		self.closures = {}
+		logger.debug(
+			f"Built dependency graph: "
+			f"nodes: '{nodes}', "
+			f"edges: '{len(self.dependencies[1])}'"
+		)
+
+
+	def get_closure(self, direction):
+		"""
+		Returns the CSR (indptr, indices) of the transitive closure in a direction, computed on the first query.
+
+		Args:
+			direction (str): 'dependencies' or 'dependents'.
+		"""
+		if direction not in ('dependencies', 'dependents'):
+			raise ValueError(f"Direction '{direction}' not supported, use 'dependencies' or 'dependents'")
+		if direction not in self.closures:
+			self.closures[direction] = transitive_closure(*getattr(self, direction))
+			logger.debug(f"Computed the transitive {direction} of '{self.nodes}' nodes: '{len(self.closures[direction][1])}' pairs")
+		return self.closures[direction]
+
+
+	def query(self, nodes, direction, transitive=True):
+		"""
+		Returns the nodes that depend on (direction 'dependents') or are pulled in by (direction 'dependencies') any of the nodes.
+
+		Args:
+			nodes (sequence): The nodes to start from.
+			direction (str): 'dependencies' or 'dependents'.
+			transitive (bool, optional): Follow the edges over more than one step. Defaults to True.
+
+		Returns:
+			numpy.ndarray: The sorted nodes, without the start nodes unless they are reached from another start node.
+		"""
+		indptr, indices = self.get_closure(direction) if transitive else getattr(self, direction)
+		slices = [indices[indptr[node]:indptr[node + 1]] for node in nodes]
+		return np.unique(np.concatenate(slices)) if slices else np.empty(0, dtype='int64')
@@ -0,0 +1,145 @@
+"""
+Cache of the block exports, keyed by the identity of the block and its modification stamp.
+
+An export is stored under a content key of the project, PLC, block type, number and ModifiedDate: as long as the block
+is not modified the same file (and the model read from it) is reused, without exporting the block again. A modified
+block gets a new key, its older exports are removed when the new one is stored.
+
+The files are evicted by age (not used for 'max_age' seconds) and by size (the least recently used first, until the
+directory holds at most 'max_bytes'). The last use of a file is its modification time.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+EXPORT_EXTENSION = '.xlm'
+MAX_EXPORT_BYTES = 256 * 1024 * 1024
+MAX_EXPORT_AGE = 30 * 24 * 3600
+MAX_MODELS = 32
+
+
+def digest(*values):
+	return hashlib.sha1('|'.join(str(value) for value in values).encode('utf-8')).hexdigest()[:12]
+
+
+class ExportCache:
+	"""
+	Stores the block exports in a directory and keeps the models read from them in memory.
+
+	Args:
+		directory (str): The directory of the exports, made if it does not exist.
+		max_bytes (int, optional): The maximum total size of the exports. Defaults to MAX_EXPORT_BYTES.
+		max_age (float, optional): The seconds an export is kept after its last use. Defaults to MAX_EXPORT_AGE.
+		max_models (int, optional): The amount of models kept in memory. Defaults to MAX_MODELS.
+
+	Attributes:
+		models (OrderedDict): Maps the path of an export to its model, from the least to the most recently used.
+	"""
+
+	def __init__(self, directory, max_bytes=MAX_EXPORT_BYTES, max_age=MAX_EXPORT_AGE, max_models=MAX_MODELS):
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.max_age = max_age
+		self.max_models = max_models
+		self.models = OrderedDict()
+		os.makedirs(directory, exist_ok=True)
+
+
+	def get_key(self, project, plc, block_type, number, modified_date):
+		"""
+		Returns the content key of an export, e.g. 'FB2204-<identity>-<stamp>'.
+		"""
+		return f"{block_type}{number}-{digest(project, plc, block_type, number)}-{digest(modified_date)}"
+
+
+	def get_path(self, key):
+		return os.path.join(self.directory, key + EXPORT_EXTENSION)
+
+
+	def lookup(self, key):
+		"""
+		Returns the path of the export with the key and marks it as used, None if it is not stored (or expired).
+		"""
+		path = self.get_path(key)
+		try:
+			if time.time() - os.path.getmtime(path) > self.max_age:
+				logger.debug(f"Export '{key}' expired")
+				return None
+			os.utime(path)
+		except OSError:
+			return None
+		logger.debug(f"Reusing export '{key}': '{path}'")
+		return path
+
+
+	def store(self, key):
+		"""
+		Registers a new export (written to 'get_path(key)'), removes the older exports of the same block and evicts.
+		"""
+		identity = key.rsplit('-', 1)[0] + '-'
+		for entry in os.scandir(self.directory):
+			if entry.name.startswith(identity) and entry.name != key + EXPORT_EXTENSION:
+				self.remove(entry.path)
+				logger.debug(f"Removed outdated export '{entry.name}'")
+		self.evict()
+
+
+	def remove(self, path):
+		self.models.pop(path, None)
+		try:
+			os.remove(path)
+		except OSError as e:
+			logger.warning(f"Failed to remove export '{path}': {str(e)}")
+
+
+	def evict(self):
+		"""
+		Removes the exports that were not used for 'max_age' seconds, then the least recently used ones until the
+		exports take at most 'max_bytes'.
+
+		Returns:
+			int: The amount of removed exports.
+		"""
+		now = time.time()
+		entries = []
+		for entry in os.scandir(self.directory):
+			if entry.is_file() and entry.name.endswith(EXPORT_EXTENSION):
+				stat = entry.stat()
+				entries.append((stat.st_mtime, stat.st_size, entry.path))
+		entries.sort()
+
+		removed = 0
+		total = sum(size for _, size, _ in entries)
+		for used, size, path in entries:
+			if now - used <= self.max_age and total <= self.max_bytes:
+				continue
+			self.remove(path)
+			total -= size
+			removed += 1
+		logger.debug(
+			f"Evicted exports: "
+			f"removed: '{removed}', "
+			f"kept: '{len(entries) - removed}', "
+			f"size: '{total}' bytes"
+		)
+		return removed
+
+
+	def get_model(self, path, reader):
+		"""
+		Returns the model of an export, read with 'reader(path)' when it is not in memory.
+		"""
+		model = self.models.get(path)
+		if model is None:
+			model = reader(path)
+			self.models[path] = model
+			while len(self.models) > self.max_models:
+				self.models.popitem(last=False)
+		self.models.move_to_end(path)
+		return model
@@ -0,0 +1,254 @@
+"""
+Streaming reader of SimaticML block exports (the XML of 'PlcBlock.Export').
+
+The export is read in one pass with 'ElementTree.iterparse' into a compact model: the block with its networks, and per
+network the accesses (variables and constants), the parts (instructions) and the wires between them. The elements are
+cleared as soon as they are read so the memory stays bounded by the biggest network, not by the size of the export.
+
+The elements are matched on their local name: the namespaces of the network sources (e.g. '.../FlgNet/v3') differ per
+TIA version and are kept on the network, not needed to read it.
+"""
+
+import xml.etree.ElementTree as ET
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+# elements of which the content is not part of the model, cleared when they end
+SKIPPED_ELEMENTS = ('DocumentInfo', 'Interface', 'MultilingualText')
+
+
+def local_name(tag):
+	return tag.rpartition('}')[2]
+
+
+class Access:
+	"""
+	A variable or constant used in a network.
+
+	Attributes:
+		uid (str): The UId of the access in its network.
+		scope (str): e.g. 'GlobalVariable', 'LocalVariable' or 'LiteralConstant'.
+		components (list): The names of the symbol, e.g. ['H_SystemVarS7-1500', 'H_LibraryVersion'].
+		constant_type (str): The type of a constant, None for a variable.
+		constant_value (str): The value of a constant, None for a variable.
+	"""
+	__slots__ = ('uid', 'scope', 'components', 'constant_type', 'constant_value')
+
+	def __init__(self, uid, scope, components, constant_type=None, constant_value=None):
+		self.uid = uid
+		self.scope = scope
+		self.components = components
+		self.constant_type = constant_type
+		self.constant_value = constant_value
+
+	@property
+	def name(self):
+		return '.'.join(self.components)
+
+	def __repr__(self):
+		return f"<Access {self.uid} {self.scope} '{self.name if self.components else self.constant_value}'>"
+
+
+class Part:
+	"""
+	An instruction in a network, e.g. 'Move'.
+	"""
+	__slots__ = ('uid', 'name', 'disabled_eno')
+
+	def __init__(self, uid, name, disabled_eno=False):
+		self.uid = uid
+		self.name = name
+		self.disabled_eno = disabled_eno
+
+	def __repr__(self):
+		return f"<Part {self.uid} '{self.name}'>"
+
+
+class Wire:
+	"""
+	A wire between accesses and ports of parts.
+
+	Attributes:
+		connections (list): A (kind, UId, port name) tuple per end, e.g. ('IdentCon', '23', None) or ('NameCon', '27', 'out1').
+	"""
+	__slots__ = ('uid', 'connections')
+
+	def __init__(self, uid, connections):
+		self.uid = uid
+		self.connections = connections
+
+
+class Network:
+	"""
+	A network (compile unit) of a block.
+
+	Attributes:
+		accesses (dict): Maps the UId to the Access.
+		parts (dict): Maps the UId to the Part.
+		wires (list): The wires.
+		access_ports (dict): Maps the UId of an access to the (part UId, port name) ports it is wired to.
+		port_accesses (dict): Maps a (part UId, port name) port to the UId of the access wired to it.
+	"""
+	__slots__ = ('id', 'language', 'namespace', 'accesses', 'parts', 'wires', 'access_ports', 'port_accesses')
+
+	def __init__(self, id):
+		self.id = id
+		self.language = None
+		self.namespace = None
+		self.accesses = {}
+		self.parts = {}
+		self.wires = []
+		self.access_ports = {}
+		self.port_accesses = {}
+
+
+	def add_wire(self, wire):
+		self.wires.append(wire)
+		accesses = [uid for kind, uid, _ in wire.connections if kind == 'IdentCon']
+		ports = [(uid, port) for kind, uid, port in wire.connections if kind == 'NameCon']
+		for access in accesses:
+			self.access_ports.setdefault(access, []).extend(ports)
+		for port in ports:
+			if accesses:
+				self.port_accesses.setdefault(port, accesses[0])
+
+
+	def find_access(self, name):
+		"""
+		Returns the first access of a variable by name (its last component or the full dotted name), None if not used.
+		"""
+		for access in self.accesses.values():
+			if access.components and (access.components[-1] == name or access.name == name):
+				return access
+		return None
+
+
+	def get_wired_value(self, part_uid, port):
+		"""
+		Returns the constant wired to a port of a part, None if a variable or nothing is wired to it.
+		"""
+		access = self.accesses.get(self.port_accesses.get((part_uid, port)))
+		return access.constant_value if access is not None else None
+
+
+class SimaticBlock:
+	"""
+	The model of an exported block.
+
+	Attributes:
+		block_type (str): e.g. 'FB', 'FC', 'OB' or 'GlobalDB' (from the 'SW.Blocks.*' element).
+		attributes (dict): The plain attributes of the block, e.g. 'Name', 'Number' and 'ProgrammingLanguage'.
+		networks (list): The networks in the order of the block.
+	"""
+	__slots__ = ('block_type', 'attributes', 'networks')
+
+	def __init__(self):
+		self.block_type = None
+		self.attributes = {}
+		self.networks = []
+
+
+	@property
+	def name(self):
+		return self.attributes.get('Name')
+
+
+	def find_parameter(self, name):
+		"""
+		Returns the networks that use a variable, with the access of the variable.
+
+		Returns:
+			list: A (network, access) tuple per network that uses the variable.
+		"""
+		found = []
+		for network in self.networks:
+			access = network.find_access(name)
+			if access is not None:
+				found.append((network, access))
+		return found
+
+
+def read_element(element):
+	"""
+	Reads an ended 'Access', 'Part', 'Call' (a Part named after the called block) or 'Wire' element of a network source.
+	"""
+	name = local_name(element.tag)
+	if name == 'Access':
+		components, constant = [], {}
+		for child in element.iter():
+			child_name = local_name(child.tag)
+			if child_name == 'Component':
+				components.append(child.get('Name'))
+			elif child_name in ('ConstantType', 'ConstantValue'):
+				constant[child_name] = child.text
+		return Access(element.get('UId'), element.get('Scope'), components, constant.get('ConstantType'), constant.get('ConstantValue'))
+	if name == 'Part':
+		return Part(element.get('UId'), element.get('Name'), element.get('DisabledENO') == 'true')
+	if name == 'Call':
+		call_info = next((child for child in element if local_name(child.tag) == 'CallInfo'), None)
+		return Part(element.get('UId'), call_info.get('Name') if call_info is not None else None)
+	if name == 'Wire':
+		return Wire(element.get('UId'), [(local_name(child.tag), child.get('UId'), child.get('Name')) for child in element])
+	return None
+
+
+def read_simaticml(path):
+	"""
+	Reads a SimaticML block export in one streaming pass.
+
+	Args:
+		path (str): The path of the exported block.
+
+	Returns:
+		SimaticBlock: The block with its networks.
+	"""
+	block = SimaticBlock()
+	network = None
+	# local names of the open elements, from the document to the current element
+	open_elements = []
+
+	for event, element in ET.iterparse(path, events=('start', 'end')):
+		name = local_name(element.tag)
+		if event == 'start':
+			if name == 'SW.Blocks.CompileUnit':
+				network = Network(element.get('ID'))
+			elif name.startswith('SW.Blocks.') and block.block_type is None:
+				block.block_type = name.split('.')[-1]
+			elif name == 'FlgNet' and network is not None:
+				network.namespace = element.tag[1:].partition('}')[0] if element.tag.startswith('{') else None
+			open_elements.append(name)
+			continue
+
+		open_elements.pop()
+		parent = open_elements[-1] if open_elements else None
+		if network is not None and parent in ('Parts', 'Wires'):
+			item = read_element(element)
+			if isinstance(item, Access):
+				network.accesses[item.uid] = item
+			elif isinstance(item, Part):
+				network.parts[item.uid] = item
+			elif isinstance(item, Wire):
+				network.add_wire(item)
+			element.clear()
+		elif name == 'SW.Blocks.CompileUnit':
+			block.networks.append(network)
+			network = None
+			element.clear()
+		elif name in SKIPPED_ELEMENTS:
+			element.clear()
+		elif parent == 'AttributeList' and len(open_elements) == 3 and network is None:
+			# Document / SW.Blocks.* / AttributeList / <attribute>
+			block.attributes[name] = element.text
+		elif parent == 'AttributeList' and name == 'ProgrammingLanguage' and network is not None:
+			network.language = element.text
+
+	logger.debug(
+		f"Read SimaticML export '{path}': "
+		f"block: '{block.block_type} {block.name}', "
+		f"networks: '{len(block.networks)}', "
+		f"parts: '{sum(len(network.parts) for network in block.networks)}', "
+		f"wires: '{sum(len(network.wires) for network in block.networks)}'"
+	)
+	return block
@@ -0,0 +1,93 @@
+"""
+Columnar row accumulation for the tables of the core modules.
+
+Appending a one-row DataFrame with 'pd.concat' copies the whole table on every row (quadratic in the amount of rows),
+the builder appends the values of a row to a list per column and makes the DataFrame once at the end.
+"""
+
+import pandas as pd
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class TableBuilder:
+	"""
+	Accumulates rows in a buffer per column of a declared schema.
+
+	Args:
+		schema (list | dict): The column names, or a dict that maps the column names to their dtype
+			(None lets pandas infer the dtype).
+		default (any, optional): The value of the columns a row does not give. Defaults to None.
+
+	Attributes:
+		dtypes (dict): Maps each column name to its dtype, in the order of the columns.
+		buffers (dict): Maps each column name to the list of its values.
+	"""
+
+	def __init__(self, schema, default=None):
+		self.dtypes = dict(schema) if isinstance(schema, dict) else dict.fromkeys(schema)
+		self.buffers = {column: [] for column in self.dtypes}
+		self.default = default
+		self.rows = 0
+
+
+	def __len__(self):
+		return self.rows
+
+
+	@property
+	def columns(self):
+		return list(self.dtypes)
+
+
+	def append(self, row=None, **values):
+		"""
+		Appends a row, given as a dict and/or as keyword arguments.
+
+		Raises:
+			KeyError: The row has a column that is not in the schema.
+		"""
+		if row:
+			values = {**row, **values}
+		unknown = values.keys() - self.buffers.keys()
+		if unknown:
+			raise KeyError(f"Columns {sorted(unknown)} are not in the schema {self.columns}")
+		for column, buffer in self.buffers.items():
+			buffer.append(values.get(column, self.default))
+		self.rows += 1
+
+
+	def extend(self, columns):
+		"""
+		Appends a batch of rows given per column, all the sequences need the same length.
+
+		Args:
+			columns (dict): Maps the column names to a sequence of values, missing columns get the default value.
+		"""
+		unknown = columns.keys() - self.buffers.keys()
+		if unknown:
+			raise KeyError(f"Columns {sorted(unknown)} are not in the schema {self.columns}")
+		lengths = {len(values) for values in columns.values()}
+		if len(lengths) > 1:
+			raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+		amount = lengths.pop() if lengths else 0
+		for column, buffer in self.buffers.items():
+			buffer.extend(columns[column] if column in columns else [self.default] * amount)
+		self.rows += amount
+
+
+	def to_frame(self):
+		"""
+		Makes the DataFrame of the accumulated rows, the columns in the order of the schema and with their dtype.
+
+		Returns:
+			pandas.DataFrame: The table, with a range index.
+		"""
+		table = pd.DataFrame({
+			column: pd.Series(self.buffers[column], dtype=dtype) if dtype is not None else self.buffers[column]
+			for column, dtype in self.dtypes.items()
+		}, columns=self.columns)
+		logger.debug(f"Materialized table of '{self.rows}' rows: columns: {self.columns}")
+		return table
@@ -1,5 +1,8 @@
 import operator
+import pandas as pd
+
 from utils.loggerConfig import get_logger
+from utils.versionIndex import compare_versions
 
 logger = get_logger(__name__)
 
@@ -16,30 +19,6 @@ comparison_operators = {
 	'version_not_equal': operator.ne
 }
 
-def compare_versions(version1: str, version2: str, operator: operator = operator.eq) -> bool:
-	"""
-	Function created to extract the version numbers from the version strings and compare them.
-	The function splits the version strings by '.' and converts the resulting list of strings to a list of integers.
-	Then, it compares the given version number in the condition of DesignTable with the selected operater against the version numbers in the table.
-	Finally, it returns the result of the comparison, default return is 'True' if the condition is met.
-
-	Parameters:
-	version1 (str): The first version string stand for the version number in the table.
-	version2 (str): The second version string stands for the static version number in the condition.
-	operator (operator): The comparison operator to use. Default is 'eq' (equal).
-	"""
-	if version1 == 'NaN':
-		return False
-	v1 = (int, version1.replace('.', ''))
-	v2 = (int, version2.replace('.', ''))  # Treat the given version as a single integer in a list
-
-	# Compare element by element
-	for a, b in zip(v1, v2):
-		if a != b:
-			return operator(a, b)
-	return operator(len(v1), len(v2))
-
-
 class DesignTable():
 	"""
 	Represents a table design with color conditions.
@@ -130,38 +109,19 @@ class DesignTable():
 				if not comp_func:
 					raise ValueError(f"Invalid comparison operator: {comparison_operator}")
 
+				# the condition is evaluated once for the whole column, the versions through the version index
+				if comparison_operator.startswith('version'):
+					condition_met = compare_versions(self.df[column], value, comp_func)
+				else:
+					condition_met = comp_func(self.df[column], value)
+				condition_met = pd.Series(condition_met.fillna(False).to_numpy(dtype=bool), index=self.pt.model.df.index)
+
 				if apply_on == 'row':
-					for row_idx in range(len(self.df)):
-						if comparison_operator.startswith('version'): 
-							condition_met = compare_versions(str(self.df.iloc[row_idx][column]), value, comp_func)
-						else:
-							condition_met = comp_func(self.df.iloc[row_idx][column], value)
-
-						if condition_met:
-							for col_idx in range(len(self.df.columns)):
-								col_name = self.df.columns[col_idx]
-								self.pt.setColorByMask(
-									col_name, 
-									self.pt.model.df.index == row_idx, 
-									color
-								)
+					for col_name in self.df.columns:
+						self.pt.setColorByMask(col_name, condition_met, color)
 				if apply_on == 'col':
-					for col_idx in range(len(self.df.columns)):
-						if comparison_operator.startswith('version'): 
-							condition_met = compare_versions(self.df.iloc[row_idx][column], value)
-						else:
-							condition_met = comp_func(self.df.iloc[row_idx][column], value)
-
-						if condition_met:
-							col_name = self.df.columns[col_idx]
-							if col_name == column:
-								for row_idx in range(len(self.df)):
-									if not comp_func(self.df.iloc[row_idx][column], value):
-										self.pt.setColorByMask(
-											col_name, 
-											self.pt.model.df.index == row_idx, 
-											color
-										)
+					# the cells of the column that do not meet the condition
+					self.pt.setColorByMask(column, ~condition_met, color)
 				logger.debug(f"Applied color condition: {condition} to the table '{self.pt}'")
 		except Exception:
 			logger.error(f"Error while applying color conditions to the table '{self.pt}'", exc_info=True)
@@ -0,0 +1,158 @@
+"""
+Sparse usage matrix of the library types: type x PLC x version -> amount of library instances.
+
+Only the used cells are stored, as coordinate arrays sorted by (type, PLC, version) with an offset per type, and a
+permutation sorted by (PLC, type, version) with an offset per PLC: one type across all the PLC's and one PLC across all
+the types are slices of those arrays.
+
+The matrix is updated with the instances per object, only the cells of the objects that changed since the previous
+update are counted again.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.loggerConfig import get_logger
+from utils.versionIndex import version_keys
+
+logger = get_logger(__name__)
+
+USAGE_COLUMNS = ['Type', 'PLC', 'Version', 'Instances', 'Outdated']
+
+
+class UsageMatrix:
+	"""
+	Counts the library instances per (type, PLC, version).
+
+	Attributes:
+		entries (dict): Maps an object identity to its cell (type, version, PLC) and whether it is outdated.
+		cells (dict): Maps a cell (type, version, PLC) to the amount of instances and of outdated instances.
+		types (numpy.ndarray): The sorted type names, also the unused types of the library.
+		plcs (numpy.ndarray): The sorted PLC names.
+	"""
+
+	def __init__(self):
+		self.entries = {}
+		self.cells = {}
+		self.types = np.empty(0, dtype=object)
+		self.plcs = np.empty(0, dtype=object)
+		self.build()
+
+
+	def __len__(self):
+		return len(self.counts)
+
+
+	def update(self, entries, types=()):
+		"""
+		Updates the matrix to the instances of the objects, the cells of the added, removed and changed objects are counted again.
+
+		Args:
+			entries (dict): Maps an object identity (e.g. (PLC, type, name, number)) to a (type, version, PLC, outdated) tuple.
+			types (sequence, optional): All the type names of the library, the unused types are kept as empty rows.
+
+		Returns:
+			int: The amount of objects that changed.
+		"""
+		changes = [(key, entry, None) for key, entry in self.entries.items() if key not in entries]
+		changes += [(key, self.entries.get(key), entry) for key, entry in entries.items() if self.entries.get(key) != entry]
+		for key, old, new in changes:
+			if old is not None:
+				cell = self.cells[old[:3]]
+				cell[0] -= 1
+				cell[1] -= bool(old[3])
+				if cell[0] == 0:
+					del self.cells[old[:3]]
+			if new is not None:
+				cell = self.cells.setdefault(new[:3], [0, 0])
+				cell[0] += 1
+				cell[1] += bool(new[3])
+		self.entries = dict(entries)
+
+		all_types = set(types) | {cell[0] for cell in self.cells}
+		if changes or all_types != set(self.types):
+			self.types = np.array(sorted(all_types), dtype=object)
+			self.build()
+		logger.debug(
+			f"Updated usage matrix: "
+			f"objects: '{len(self.entries)}', "
+			f"changed objects: '{len(changes)}', "
+			f"cells: '{len(self.cells)}'"
+		)
+		return len(changes)
+
+
+	def build(self):
+		"""
+		Packs the cells in the sorted coordinate arrays and the offsets per type and per PLC.
+		"""
+		cells = list(self.cells.items())
+		type_names = pd.Series([cell[0] for cell, _ in cells], dtype=object)
+		versions = pd.Series([cell[1] for cell, _ in cells], dtype=object)
+		plc_names = pd.Series([cell[2] for cell, _ in cells], dtype=object)
+		self.plcs = np.array(sorted(set(plc_names)), dtype=object)
+
+		self.type_codes = np.searchsorted(self.types, type_names.to_numpy()).astype('int64') if cells else np.empty(0, dtype='int64')
+		self.plc_codes = np.searchsorted(self.plcs, plc_names.to_numpy()).astype('int64') if cells else np.empty(0, dtype='int64')
+		version_order = version_keys(versions).to_numpy() if cells else np.empty(0, dtype='int64')
+		order = np.lexsort((version_order, self.plc_codes, self.type_codes))
+
+		self.type_codes = self.type_codes[order]
+		self.plc_codes = self.plc_codes[order]
+		self.versions = versions.to_numpy()[order] if cells else np.empty(0, dtype=object)
+		self.counts = np.array([counts[0] for _, counts in cells], dtype='int64')[order] if cells else np.empty(0, dtype='int64')
+		self.outdated = np.array([counts[1] for _, counts in cells], dtype='int64')[order] if cells else np.empty(0, dtype='int64')
+		self.type_offsets = np.searchsorted(self.type_codes, np.arange(len(self.types) + 1))
+
+		# the cells by PLC, as a permutation of the cells by type (stable, so the types and versions stay sorted per PLC)
+		self.plc_order = np.argsort(self.plc_codes, kind='stable')
+		self.plc_offsets = np.searchsorted(self.plc_codes[self.plc_order], np.arange(len(self.plcs) + 1))
+
+
+	def get_cells(self, positions):
+		return pd.DataFrame({
+			'Type': self.types[self.type_codes[positions]],
+			'PLC': self.plcs[self.plc_codes[positions]],
+			'Version': self.versions[positions],
+			'Instances': self.counts[positions],
+			'Outdated': self.outdated[positions],
+		}, columns=USAGE_COLUMNS)
+
+
+	def get_type(self, type_name):
+		"""
+		Returns the usage of one type across all the PLC's, a row per (PLC, version).
+		"""
+		code = np.searchsorted(self.types, type_name)
+		if code >= len(self.types) or self.types[code] != type_name:
+			return self.get_cells(np.empty(0, dtype='int64'))
+		return self.get_cells(np.arange(self.type_offsets[code], self.type_offsets[code + 1]))
+
+
+	def get_plc(self, plc_name):
+		"""
+		Returns the usage of all the types in one PLC, a row per (type, version).
+		"""
+		code = np.searchsorted(self.plcs, plc_name)
+		if code >= len(self.plcs) or self.plcs[code] != plc_name:
+			return self.get_cells(np.empty(0, dtype='int64'))
+		return self.get_cells(self.plc_order[self.plc_offsets[code]:self.plc_offsets[code + 1]])
+
+
+	def to_frame(self):
+		"""
+		Returns all the used cells, a row per (type, PLC, version).
+		"""
+		return self.get_cells(np.arange(len(self.counts)))
+
+
+	def to_pivot(self):
+		"""
+		Returns the matrix as a table to export: a row per type and a column per PLC, with the versions and their amount
+		of instances in a cell, e.g. '1.0.2 (3), 1.0.1 (1)'.
+		"""
+		table = pd.DataFrame('', index=pd.Index(self.types, name='Type'), columns=self.plcs, dtype=object)
+		for type_code, plc_code, version, count in zip(self.type_codes, self.plc_codes, self.versions, self.counts):
+			cell = table.iat[type_code, plc_code]
+			table.iat[type_code, plc_code] = f"{cell}, {version} ({count})" if cell else f"{version} ({count})"
+		return table.reset_index()
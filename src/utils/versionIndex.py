@@ -0,0 +1,153 @@
+"""
+Version index of the library types.
+
+Every version string is parsed once into integer parts ('1.0.2', 'V1.2' -> [1, 0, 2, 0], [1, 2, 0, 0]) and packed into
+one comparable integer key, comparisons and the latest version per type are vectorised operations on those keys.
+
+A version without dots (e.g. the system library version '155040' of 'LVccLibVersion') has its digits compared with the
+digits of the other versions, the way the system library numbers its versions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.loggerConfig import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_PATTERN = r'^\s*[Vv]?\s*(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:\.(\d+))?\s*$'
+VERSION_PARTS = 4
+PART_BASE = 10000
+
+
+def parse_versions(versions):
+	"""
+	Parses version strings into their integer parts, missing parts count as 0.
+
+	Args:
+		versions (pandas.Series): The version strings.
+
+	Returns:
+		pandas.DataFrame: A column per part (0 to VERSION_PARTS - 1), -1 in all the parts of an unreadable version.
+	"""
+	parts = versions.astype(object).where(versions.notna(), '').astype(str).str.extract(VERSION_PATTERN)
+	parts = parts.apply(pd.to_numeric, errors='coerce')
+	unreadable = parts[0].isna()
+	parts = parts.fillna(0).astype('int64')
+	parts[unreadable] = -1
+	return parts
+
+
+def version_keys(versions):
+	"""
+	Packs the versions in one comparable integer per version.
+
+	Args:
+		versions (pandas.Series | str): The version strings.
+
+	Returns:
+		pandas.Series | int: The keys, -1 for an unreadable version.
+	"""
+	if not isinstance(versions, pd.Series):
+		return int(version_keys(pd.Series([versions])).iat[0])
+
+	parts = parse_versions(versions)
+	keys = pd.Series(0, index=versions.index, dtype='int64')
+	for part in range(VERSION_PARTS):
+		keys = keys * PART_BASE + parts[part].clip(upper=PART_BASE - 1)
+	return keys.where(parts[0] >= 0, -1)
+
+
+def digit_keys(versions):
+	"""
+	Returns the digits of the versions as one integer ('1.0.2' -> 102), -1 for a version without digits.
+	"""
+	digits = versions.astype(object).where(versions.notna(), '').astype(str).str.replace(r'\D', '', regex=True)
+	return pd.to_numeric(digits.where(digits != '', '-1')).astype('int64')
+
+
+def compare_versions(versions, version, operator):
+	"""
+	Compares versions against one version, e.g. the version of the system library.
+
+	Args:
+		versions (pandas.Series | str): The versions to compare.
+		version (str): The version to compare against.
+		operator (function): The comparison, e.g. operator.gt for the versions newer than 'version'.
+
+	Returns:
+		pandas.Series | bool: True where the comparison holds, False for the unreadable versions.
+	"""
+	if not isinstance(versions, pd.Series):
+		return bool(compare_versions(pd.Series([versions]), version, operator).iat[0])
+
+	if version is None:
+		return pd.Series(False, index=versions.index)
+	if '.' not in str(version).strip('Vv '):
+		keys, key = digit_keys(versions), int(digit_keys(pd.Series([version])).iat[0])
+	else:
+		keys, key = version_keys(versions), version_keys(str(version))
+	if key < 0:
+		return pd.Series(False, index=versions.index)
+	return operator(keys, key) & (keys >= 0)
+
+
+class VersionIndex:
+	"""
+	Sorted versions per library type, answers the latest version and the outdated versions of the types.
+
+	Args:
+		names (pandas.Series): The library type names.
+		versions (pandas.Series): The version of each name.
+
+	Attributes:
+		latest (pandas.Series): Maps a type name to its latest version.
+		latest_keys (pandas.Series): Maps a type name to the key of its latest version.
+	"""
+
+	def __init__(self, names, versions):
+		table = pd.DataFrame({
+			'Name': names.to_numpy(),
+			'Version': versions.to_numpy(),
+		})
+		table['Key'] = version_keys(table['Version'])
+		table = table.drop_duplicates(['Name', 'Key']).sort_values(['Name', 'Key'], kind='stable')
+
+		self.sorted_versions = {
+			name: (group['Key'].to_numpy(), list(group['Version']))
+			for name, group in table.groupby('Name', sort=False)
+		}
+		last = table.drop_duplicates('Name', keep='last').set_index('Name')
+		self.latest = last['Version']
+		self.latest_keys = last['Key']
+		logger.debug(
+			f"Built version index: "
+			f"types: '{len(self.sorted_versions)}', "
+			f"versions: '{len(table)}'"
+		)
+
+
+	def get_versions(self, name):
+		"""
+		Returns the versions of a type from old to new.
+		"""
+		return self.sorted_versions.get(name, (np.empty(0, dtype='int64'), []))[1]
+
+
+	def get_latest(self, names):
+		"""
+		Returns the latest version of each type name, NaN for an unknown type.
+		"""
+		return pd.Series(self.latest.reindex(names).to_numpy(), index=names.index)
+
+
+	def is_outdated(self, names, versions):
+		"""
+		Checks which versions are older than the latest version of their type, False for an unknown type or version.
+
+		Returns:
+			pandas.Series: A boolean per version.
+		"""
+		keys = version_keys(versions)
+		latest = pd.Series(self.latest_keys.reindex(names).to_numpy(), index=versions.index)
+		return (keys >= 0) & latest.notna() & (keys < latest.fillna(-1))